@@ -1,8 +1,21 @@
-from django.contrib import admin
+from django import forms
+from django.contrib import admin, messages
+from django.contrib.admin.helpers import ActionForm
 
+from . import moderation
 from .models import Post, Location, Category, Comment
 
 
+class PostActionForm(ActionForm):
+    """Admin action form with the target category of the move action."""
+
+    category = forms.ModelChoiceField(
+        queryset=Category.objects.all(),
+        required=False,
+        label='Категория'
+    )
+
+
 class PostAdmin(admin.ModelAdmin):
     """
     ModelAdmin of model Post.
@@ -25,6 +38,9 @@ class PostAdmin(admin.ModelAdmin):
         fields that can be filtered by in the right sidebar of
         the change list page in the admin
 
+    actions: tuple
+        bulk actions that run as batched UPDATE/DELETE statements
+
     """
 
     list_display = (
@@ -41,6 +57,52 @@ class PostAdmin(admin.ModelAdmin):
     )
     search_fields = ('title',)
     list_filter = ('author', 'category', 'location')
+    action_form = PostActionForm
+    actions = (
+        'publish_posts', 'unpublish_posts', 'move_posts', 'delete_posts'
+    )
+
+    @admin.action(
+        description='Опубликовать выбранные публикации',
+        permissions=('change',)
+    )
+    def publish_posts(self, request, queryset):
+        count = moderation.publish_posts(queryset)
+        self.message_user(request, f'Опубликовано публикаций: {count}.')
+
+    @admin.action(
+        description='Снять с публикации выбранные публикации',
+        permissions=('change',)
+    )
+    def unpublish_posts(self, request, queryset):
+        count = moderation.unpublish_posts(queryset)
+        self.message_user(request, f'Снято с публикации: {count}.')
+
+    @admin.action(
+        description='Перенести выбранные публикации в категорию',
+        permissions=('change',)
+    )
+    def move_posts(self, request, queryset):
+        category = Category.objects.filter(
+            pk=request.POST.get('category') or None
+        ).first()
+        if category is None:
+            self.message_user(
+                request, 'Выберите категорию для переноса.', messages.ERROR
+            )
+            return
+        count = moderation.move_posts(queryset, category)
+        self.message_user(
+            request, f'Перенесено в «{category.title}»: {count}.'
+        )
+
+    @admin.action(
+        description='Удалить выбранные публикации без подтверждения',
+        permissions=('delete',)
+    )
+    def delete_posts(self, request, queryset):
+        count = moderation.delete_posts(queryset)
+        self.message_user(request, f'Удалено публикаций: {count}.')
 
 
 class LocationAdmin(admin.ModelAdmin):
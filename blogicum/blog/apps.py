@@ -1,7 +1,23 @@
 from django.apps import AppConfig
+from django.conf import settings
+from django.core.signals import request_started
+from django.db.backends.signals import connection_created
 
 
 class BlogConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'blog'
     verbose_name = 'Блог'
+
+    def ready(self):
+        from blogicum.db import apply_sqlite_pragmas, check_connections_health
+
+        from . import receivers  # noqa: F401
+
+        request_started.connect(check_connections_health)
+        connection_created.connect(apply_sqlite_pragmas)
+        if settings.METRICS or settings.PROFILER:
+            from blogicum import metrics
+
+            connection_created.connect(metrics.instrument_connection)
+            metrics.instrument_templates()
@@ -0,0 +1,121 @@
+import datetime as dt
+
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+from django.utils.functional import cached_property
+
+from blog.models import ArchivedComment, ArchivedPost, Comment, Post
+from blog.moderation import batched_pks, delete_batch
+from blog.signals import posts_bulk_changed
+
+BATCH_SIZE = 500
+
+ARCHIVE = 'archive'
+
+POST_FIELDS = (
+    'id', 'title', 'text', 'pub_date', 'author_id', 'location_id',
+    'category_id', 'image', 'is_published', 'created_at',
+)
+
+COMMENT_FIELDS = ('id', 'text', 'post_id', 'created_at', 'author_id')
+
+
+def get_cutoff(days: int = None) -> dt.datetime:
+    """Returns the pub_date before which posts are archived."""
+
+    if days is None:
+        days = settings.ARCHIVE_AFTER_DAYS
+    return timezone.now() - dt.timedelta(days=days)
+
+
+def copy_fields(instance, model, fields):
+    return model(**{field: getattr(instance, field) for field in fields})
+
+
+def archive_batch(pks) -> list:
+    """
+    Moves the posts with the pks and their comments into the archive
+    tables in one transaction, returns the pks of the moved posts.
+    """
+
+    with transaction.atomic():
+        posts = list(Post.objects.filter(pk__in=pks).select_for_update())
+        ArchivedPost.objects.bulk_create(
+            [copy_fields(post, ArchivedPost, POST_FIELDS) for post in posts]
+        )
+        ArchivedComment.objects.bulk_create(
+            (
+                copy_fields(comment, ArchivedComment, COMMENT_FIELDS)
+                for comment in Comment.objects.filter(
+                    post_id__in=pks
+                ).iterator()
+            ),
+            batch_size=BATCH_SIZE
+        )
+        delete_batch(pks)
+    return [post.pk for post in posts]
+
+
+def archive_posts(
+    cutoff: dt.datetime, batch_size: int = BATCH_SIZE, limit: int = None
+) -> int:
+    """
+    Moves the posts published before the cutoff with their comments
+    into the archive tables, a transaction per batch, so an interrupted
+    run keeps the batches it finished and the next run goes on.
+    Moves limit posts at most, sends posts_bulk_changed once,
+    returns the number of moved posts.
+    """
+
+    queryset = Post.objects.filter(pub_date__lt=cutoff)
+    archived = []
+    for batch in batched_pks(queryset, batch_size):
+        if limit is not None:
+            batch = batch[:limit - len(archived)]
+        archived.extend(archive_batch(batch))
+        if limit is not None and len(archived) >= limit:
+            break
+    if archived:
+        posts_bulk_changed.send(sender=Post, pks=archived, action=ARCHIVE)
+    return len(archived)
+
+
+class LiveAndArchived:
+    """
+    The live posts followed by the archived ones, counted and sliced
+    like one queryset, so Paginator pages through both. Archived posts
+    are older than the live ones, the order by pub_date is kept.
+    The archive is only read by pages past the live posts.
+    counts, the known (live, archived) numbers of posts, spare
+    counting them.
+    """
+
+    model = Post
+    ordered = True
+
+    def __init__(self, live, archived, counts=None):
+        self.live = live
+        self.archived = archived
+        self.counts = counts
+
+    @cached_property
+    def live_count(self) -> int:
+        if self.counts is not None:
+            return self.counts[0]
+        return self.live.count()
+
+    def count(self) -> int:
+        if self.counts is not None:
+            return sum(self.counts)
+        return self.live_count + self.archived.count()
+
+    def __getitem__(self, index: slice):
+        start, stop = index.start or 0, index.stop
+        posts = list(self.live[start:stop]) if start < self.live_count else []
+        if stop is None or stop > self.live_count:
+            posts.extend(self.archived[
+                max(start - self.live_count, 0):
+                None if stop is None else stop - self.live_count
+            ])
+        return posts
@@ -0,0 +1,229 @@
+import datetime as dt
+import json
+import os
+import resource
+import subprocess
+import threading
+import time
+from importlib import import_module
+from pathlib import Path
+
+from django.conf import settings
+from django.db import connection
+from django.db.models import Count
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from blog.models import Comment, Post
+from blogicum import metrics
+
+RESULTS_DIR = settings.BASE_DIR.parent / 'benchmarks'
+
+PERCENTILES = (50, 90, 99)
+
+URL_MODULES = ('blog.urls', 'pages.urls')
+
+
+def percentile(samples, q: int) -> float:
+    """Returns the q-th percentile of samples (nearest rank)."""
+
+    ordered = sorted(samples)
+    if not ordered:
+        return 0.0
+    rank = max(0, min(len(ordered) - 1, round(q / 100 * len(ordered)) - 1))
+    return ordered[rank]
+
+
+def summarize(latencies) -> dict:
+    """Returns mean and percentiles of latencies in milliseconds."""
+
+    summary = {
+        f'p{q}_ms': round(percentile(latencies, q) * 1000, 3)
+        for q in PERCENTILES
+    }
+    summary['mean_ms'] = round(
+        sum(latencies) / max(len(latencies), 1) * 1000, 3
+    )
+    return summary
+
+
+def git_revision() -> str:
+    """Returns the short hash of the checked out commit or 'unknown'."""
+
+    try:
+        return subprocess.run(
+            ('git', 'rev-parse', '--short', 'HEAD'),
+            cwd=settings.BASE_DIR, capture_output=True, text=True,
+            check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return 'unknown'
+
+
+def save_results(kind: str, results, output_dir: Path = RESULTS_DIR) -> Path:
+    """
+    Stores results of a benchmark as JSON named after the benchmark kind,
+    the time and the git revision, returns the path of the file.
+    """
+
+    revision = git_revision()
+    now = dt.datetime.now(tz=dt.timezone.utc)
+    output_dir = Path(output_dir)
+    output_dir.mkdir(parents=True, exist_ok=True)
+    path = output_dir / f'{kind}-{now:%Y%m%dT%H%M%S}-{revision}.json'
+    path.write_text(json.dumps(
+        {
+            'kind': kind,
+            'revision': revision,
+            'created_at': now.isoformat(),
+            'results': results,
+        },
+        ensure_ascii=False, indent=2
+    ))
+    return path
+
+
+def load_results(path) -> dict:
+    """Returns the results of a stored benchmark by their name."""
+
+    data = json.loads(Path(path).read_text())
+    return {result['name']: result for result in data['results']}
+
+
+def rss_kib() -> int:
+    """Returns the resident memory of the process in KiB."""
+
+    try:
+        with open('/proc/self/statm') as statm:
+            pages = int(statm.read().split()[1])
+        return pages * os.sysconf('SC_PAGE_SIZE') // 1024
+    except OSError:
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+
+class PeakMemory:
+    """
+    Context manager that samples the resident memory of the process
+    in a background thread, peak_kib is the highest sample.
+    """
+
+    def __init__(self, interval: float = 0.01):
+        self.interval = interval
+        self.peak_kib = 0
+        self._stop = threading.Event()
+
+    def _sample(self):
+        while not self._stop.is_set():
+            self.peak_kib = max(self.peak_kib, rss_kib())
+            self._stop.wait(self.interval)
+
+    def __enter__(self):
+        self.peak_kib = rss_kib()
+        self._thread = threading.Thread(target=self._sample, daemon=True)
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self._stop.set()
+        self._thread.join()
+        self.peak_kib = max(self.peak_kib, rss_kib())
+
+
+def get_sample_kwargs() -> dict:
+    """
+    Returns URL kwargs that point at a representative published post:
+    the most commented one, its category, author and a comment
+    of the author if there is one.
+    """
+
+    post = (
+        Post.objects.get_published()
+        .annotate(comment_count=Count('comments'))
+        .order_by('-comment_count').first()
+    )
+    if post is None:
+        return {}
+    comments = Comment.objects.filter(post=post)
+    comment = (
+        comments.filter(author=post.author).first() or comments.first()
+    )
+    return {
+        'post_pk': post.pk,
+        'category_slug': post.category.slug,
+        'username': post.author.username,
+        'comment_pk': comment.pk if comment else 0,
+        'model_name': 'posts',
+    }
+
+
+def get_urls(sample_kwargs: dict):
+    """
+    Returns (name, url) pairs for every named URL of
+    blog.urls and pages.urls, filled in with sample_kwargs.
+    """
+
+    urls = []
+    for module_name in URL_MODULES:
+        module = import_module(module_name)
+        for pattern in module.urlpatterns:
+            name = f'{module.app_name}:{pattern.name}'
+            kwargs = {
+                key: sample_kwargs[key]
+                for key in pattern.pattern.converters
+                if key in sample_kwargs
+            }
+            if len(kwargs) != len(pattern.pattern.converters):
+                continue
+            urls.append((name, reverse(name, kwargs=kwargs)))
+    return urls
+
+
+def measure(client, url: str, repeat: int, warmup: int = 1) -> dict:
+    """
+    Requests the url repeat times with the client, returns
+    the latency summary, the query count, the response size and
+    the render time per template and include of a request.
+    """
+
+    for _ in range(warmup):
+        client.get(url)
+    latencies = []
+    queries = 0
+    totals = metrics.RequestStats()
+    for _ in range(repeat):
+        stats = metrics.RequestStats()
+        token = metrics.current_stats.set(stats)
+        try:
+            with CaptureQueriesContext(connection) as captured:
+                started = time.perf_counter()
+                response = client.get(url)
+                content = (
+                    b''.join(response.streaming_content)
+                    if response.streaming else response.content
+                )
+                latencies.append(time.perf_counter() - started)
+        finally:
+            metrics.current_stats.reset(token)
+        totals.add(stats)
+        queries = len(captured.captured_queries)
+    return {
+        'url': url,
+        'status': response.status_code,
+        'queries': queries,
+        'bytes': len(content),
+        **summarize(latencies),
+        'template_ms': round(totals.template_time * 1000 / repeat, 3),
+        'templates': metrics.summarize_templates(totals, repeat),
+    }
+
+
+def compare(old: dict, new: dict, key: str = 'p50_ms'):
+    """Yields (name, old value, new value, change in %) by result name."""
+
+    for name, result in new.items():
+        if name not in old:
+            continue
+        before = old[name][key]
+        after = result[key]
+        change = (after - before) / before * 100 if before else 0.0
+        yield name, before, after, round(change, 1)
@@ -0,0 +1,224 @@
+import atexit
+import datetime as dt
+import logging
+import math
+import threading
+import time
+from collections import deque
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.db import DatabaseError, close_old_connections, transaction
+from django.utils import timezone
+
+from .models import Comment, Post
+from .signals import comments_bulk_created
+
+User = get_user_model()
+
+logger = logging.getLogger(__name__)
+
+PENDING_SESSION_KEY = '_pending_comments'
+
+# Queued comments of the session are shown to their author for this
+# long at most, in case the process was stopped before writing them.
+PENDING_MAX_AGE = 300
+
+
+def write_comments(comments) -> int:
+    """
+    Creates the comments with bulk_create in one transaction,
+    skipping the ones whose post or author was deleted since.
+    Returns the number of created comments.
+    """
+
+    post_ids = set(
+        Post.objects.filter(
+            pk__in={comment.post_id for comment in comments}
+        ).values_list('pk', flat=True)
+    )
+    author_ids = set(
+        User.objects.filter(
+            pk__in={comment.author_id for comment in comments}
+        ).values_list('pk', flat=True)
+    )
+    comments = [
+        comment for comment in comments
+        if comment.post_id in post_ids and comment.author_id in author_ids
+    ]
+    if not comments:
+        return 0
+    with transaction.atomic():
+        Comment.objects.bulk_create(comments)
+    comments_bulk_created.send(
+        sender=Comment,
+        post_ids=sorted({comment.post_id for comment in comments})
+    )
+    return len(comments)
+
+
+class CommentBuffer:
+    """
+    Process-local queue of comments written to the database with
+    bulk_create in batches of batch_size: by the request that fills
+    a batch, and by a background thread every interval seconds
+    (never if interval is 0). Comments still queued when the process
+    is killed are lost.
+    """
+
+    def __init__(self, batch_size: int, interval: float):
+        self.batch_size = batch_size
+        self.interval = interval
+        self.comments = deque()
+        self.lock = threading.Lock()
+        self.thread = None
+
+    def start(self):
+        if self.interval > 0 and self.thread is None:
+            self.thread = threading.Thread(
+                target=self.run, name='comment-buffer', daemon=True
+            )
+            self.thread.start()
+
+    def append(self, comment: Comment):
+        self.comments.append(comment)
+        if len(self.comments) >= self.batch_size:
+            self.write_batch()
+
+    def take(self) -> list:
+        batch = []
+        while self.comments and len(batch) < self.batch_size:
+            batch.append(self.comments.popleft())
+        return batch
+
+    def write_batch(self) -> int:
+        """
+        Writes one batch, returns the number of created comments.
+        On a database error the batch is queued again for the next flush.
+        """
+
+        with self.lock:
+            batch = self.take()
+            if not batch:
+                return 0
+            try:
+                return write_comments(batch)
+            except DatabaseError:
+                logger.exception(
+                    'Writing %s queued comments failed', len(batch)
+                )
+                self.comments.extendleft(reversed(batch))
+                return 0
+
+    def flush(self) -> int:
+        """Writes all queued comments, returns the number created."""
+
+        written = 0
+        for _ in range(math.ceil(len(self.comments) / self.batch_size)):
+            written += self.write_batch()
+        return written
+
+    def run(self):
+        while True:
+            time.sleep(self.interval)
+            try:
+                self.flush()
+            finally:
+                close_old_connections()
+
+
+_buffer = None
+
+
+def get_buffer() -> CommentBuffer:
+    """Returns the process-wide buffer, started on first use."""
+
+    global _buffer
+    if _buffer is None:
+        _buffer = CommentBuffer(
+            settings.COMMENT_BUFFER_SIZE, settings.COMMENT_BUFFER_INTERVAL
+        )
+        _buffer.start()
+        atexit.register(_buffer.flush)
+    return _buffer
+
+
+def reset():
+    """Drops the process-wide buffer with its queued comments."""
+
+    global _buffer
+    _buffer = None
+
+
+def enqueue(request, comment: Comment):
+    """
+    Queues the comment and remembers it in the session of the author,
+    so the author sees it on the post page before it is written.
+    """
+
+    comment.created_at = timezone.now()
+    get_buffer().append(comment)
+    pending = request.session.get(PENDING_SESSION_KEY, [])
+    pending.append({
+        'post': comment.post_id,
+        'text': comment.text,
+        'queued_at': comment.created_at.timestamp(),
+    })
+    request.session[PENDING_SESSION_KEY] = pending
+
+
+def add_pending(request, post: Post, comments):
+    """
+    Returns the comments of the post with the queued comments of the
+    session appended, the queryset itself if the session has none.
+    Queued comments found among the written ones, or of a post that
+    has been archived since, are dropped from the session.
+    """
+
+    if not request.user.is_authenticated:
+        return comments
+    pending = request.session.get(PENDING_SESSION_KEY)
+    if not pending or all(entry['post'] != post.pk for entry in pending):
+        return comments
+    if post.is_archived:
+        # Written or lost before the post was archived, a Comment
+        # of an archived post cannot be built.
+        request.session[PENDING_SESSION_KEY] = [
+            entry for entry in pending if entry['post'] != post.pk
+        ]
+        return comments
+
+    comments = list(comments)
+    written = [
+        comment for comment in comments
+        if comment.author_id == request.user.pk
+    ]
+    expired = time.time() - PENDING_MAX_AGE
+    kept = []
+    for entry in pending:
+        if entry['queued_at'] < expired:
+            continue
+        if entry['post'] != post.pk:
+            kept.append(entry)
+            continue
+        match = next(
+            (
+                comment for comment in written
+                if comment.text == entry['text']
+                and comment.created_at.timestamp() >= entry['queued_at']
+            ),
+            None
+        )
+        if match is not None:
+            written.remove(match)
+            continue
+        kept.append(entry)
+        comments.append(Comment(
+            post=post, author=request.user, text=entry['text'],
+            created_at=dt.datetime.fromtimestamp(
+                entry['queued_at'], tz=dt.timezone.utc
+            )
+        ))
+    if kept != pending:
+        request.session[PENDING_SESSION_KEY] = kept
+    return comments
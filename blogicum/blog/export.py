@@ -0,0 +1,90 @@
+import csv
+import json
+
+from django.core.serializers.json import DjangoJSONEncoder
+
+from blog.models import Category, Comment, Location, Post
+
+CHUNK_SIZE = 2000
+
+CSV = 'csv'
+
+JSONL = 'jsonl'
+
+FORMATS = (CSV, JSONL)
+
+EXPORT_MODELS = {
+    'posts': Post,
+    'comments': Comment,
+    'categories': Category,
+    'locations': Location,
+}
+
+
+class Echo:
+    """Pseudo-buffer that returns the written value instead of storing it."""
+
+    def write(self, value):
+        return value
+
+
+def get_columns(model) -> list:
+    """Returns the names of the columns of the model table."""
+
+    return [field.attname for field in model._meta.concrete_fields]
+
+
+def iter_rows(model, after_pk: int = 0, chunk_size: int = CHUNK_SIZE):
+    """
+    Yields the rows of the model as dicts ordered by primary key,
+    starting after after_pk.
+    Every chunk is a separate keyset query (pk > last seen pk),
+    so memory does not depend on the size of the table and
+    an interrupted export can be resumed from the last exported pk.
+    """
+
+    columns = get_columns(model)
+    queryset = model.objects.order_by('pk').values(*columns)
+    last_pk = after_pk
+    while True:
+        chunk = list(queryset.filter(pk__gt=last_pk)[:chunk_size])
+        if not chunk:
+            return
+        yield from chunk
+        last_pk = chunk[-1]['id']
+
+
+def get_formatter(model, export_format: str):
+    """Returns a function that serializes a row of the model to a line."""
+
+    if export_format == JSONL:
+        return lambda row: json.dumps(
+            row, cls=DjangoJSONEncoder, ensure_ascii=False
+        ) + '\n'
+    writer = csv.DictWriter(Echo(), fieldnames=get_columns(model))
+    return writer.writerow
+
+
+def get_header(model, export_format: str) -> str:
+    """Returns the header line of the export, empty for JSONL."""
+
+    if export_format == JSONL:
+        return ''
+    columns = get_columns(model)
+    return get_formatter(model, CSV)(dict(zip(columns, columns)))
+
+
+def iter_lines(
+    model, export_format: str, after_pk: int = 0,
+    chunk_size: int = CHUNK_SIZE
+):
+    """
+    Yields the rows of the model serialized as CSV or JSONL lines,
+    the CSV header is written only for an export from the beginning.
+    """
+
+    if not after_pk and export_format == CSV:
+        yield get_header(model, export_format)
+    formatter = get_formatter(model, export_format)
+    for row in iter_rows(model, after_pk, chunk_size):
+        yield formatter(row)
@@ -0,0 +1,117 @@
+from django.db import transaction
+from django.db.models import F, OuterRef
+from django.db.models.functions import Greatest
+from django.utils import timezone
+from django.utils.text import Truncator
+
+from blog.models import Comment, FeedEntry, Post
+from blog.moderation import batched_pks
+from blog.utils import count_of
+
+BATCH_SIZE = 500
+
+# Words of the post text kept in a card, the card shows 10 of them.
+EXCERPT_WORDS = 30
+
+
+def get_comment_count(post_field: str = 'pk'):
+    """Subquery counting the comments of the post in post_field."""
+
+    return count_of(Comment.objects.filter(post=OuterRef(post_field)))
+
+
+def get_visible_posts():
+    """Returns the posts shown in the feed once their pub_date comes."""
+
+    return Post.objects.filter(
+        is_published=True, category__is_published=True
+    )
+
+
+def build_entry(post) -> FeedEntry:
+    """Returns the card of a post fetched by refresh_posts."""
+
+    location = post.location
+    return FeedEntry(
+        post_id=post.pk,
+        pub_date=post.pub_date,
+        title=post.title,
+        excerpt=Truncator(post.text).words(EXCERPT_WORDS),
+        image=post.image.name or '',
+        author_id=post.author_id,
+        author_username=post.author.get_username(),
+        category_id=post.category_id,
+        category_slug=post.category.slug,
+        category_title=post.category.title,
+        location_id=post.location_id,
+        location_name=(
+            location.name if location and location.is_published else None
+        ),
+        comment_count=post.comment_count,
+    )
+
+
+def refresh_posts(pks):
+    """
+    Rebuilds the cards of the posts with the pks: creates the cards of
+    the visible ones, removes the others. One transaction per batch.
+    """
+
+    pks = list(pks)
+    for start in range(0, len(pks), BATCH_SIZE):
+        batch = pks[start:start + BATCH_SIZE]
+        posts = get_visible_posts().filter(pk__in=batch).select_related(
+            'author', 'category', 'location'
+        ).annotate(comment_count=get_comment_count())
+        with transaction.atomic(savepoint=False):
+            FeedEntry.objects.filter(post_id__in=batch).delete()
+            FeedEntry.objects.bulk_create(
+                [build_entry(post) for post in posts]
+            )
+
+
+def rebuild():
+    """Rebuilds the cards of all posts, returns the number of cards."""
+
+    FeedEntry.objects.all().delete()
+    for batch in batched_pks(get_visible_posts(), BATCH_SIZE):
+        refresh_posts(batch)
+    return FeedEntry.objects.count()
+
+
+def add_comments(post_id, count: int):
+    FeedEntry.objects.filter(post_id=post_id).update(
+        comment_count=Greatest(F('comment_count') + count, 0)
+    )
+
+
+def recount_comments(post_ids):
+    FeedEntry.objects.filter(post_id__in=post_ids).update(
+        comment_count=get_comment_count('post')
+    )
+
+
+def get_entries():
+    """Returns the cards of the feed, newest first."""
+
+    return FeedEntry.objects.filter(pub_date__lte=timezone.now())
+
+
+class FeedPosts:
+    """
+    Cards of a FeedEntry queryset counted and sliced like a queryset
+    of posts, so Paginator pages through them and yields the posts
+    built from the cards.
+    """
+
+    model = Post
+    ordered = True
+
+    def __init__(self, entries):
+        self.entries = entries
+
+    def count(self) -> int:
+        return self.entries.count()
+
+    def __getitem__(self, index: slice):
+        return [entry.as_post() for entry in self.entries[index]]
@@ -0,0 +1,321 @@
+import csv
+import json
+from itertools import islice
+
+from django.contrib.auth import get_user_model
+from django.db import transaction
+from django.utils.dateparse import parse_datetime
+
+from blog import membership
+from blog.models import Category, Comment, Location, Post
+from blog.signals import posts_bulk_changed
+
+User = get_user_model()
+
+BATCH_SIZE = 1000
+
+IMPORT = 'import'
+
+POSTS = 'posts'
+
+COMMENTS = 'comments'
+
+TRUE_VALUES = ('1', 'true', 'yes', 'on')
+
+
+class InvalidRecord(ValueError):
+    """A record that cannot be imported, names the record and its field."""
+
+
+def read_records(file, file_format: str):
+    """
+    Yields the records of a JSONL or CSV file as dicts, raises
+    InvalidRecord with the number of a record that is not an object.
+    """
+
+    if file_format == 'csv':
+        yield from csv.DictReader(file)
+        return
+    number = 0
+    for line in file:
+        if not line.strip():
+            continue
+        number += 1
+        try:
+            record = json.loads(line)
+        except ValueError as error:
+            raise InvalidRecord(f'Record {number}: {error}.') from error
+        if not isinstance(record, dict):
+            raise InvalidRecord(f'Record {number}: not a JSON object.')
+        yield record
+
+
+def iter_batches(records, batch_size: int = BATCH_SIZE):
+    """Yields lists of batch_size records or less."""
+
+    records = iter(records)
+    while True:
+        batch = list(islice(records, batch_size))
+        if not batch:
+            return
+        yield batch
+
+
+def parse_bool(value, default: bool = True) -> bool:
+    """Parses a JSON or CSV boolean, empty values are default."""
+
+    if value is None or value == '':
+        return default
+    if isinstance(value, bool):
+        return value
+    return str(value).strip().lower() in TRUE_VALUES
+
+
+def parse_pk(value):
+    """Parses an optional primary key of a record."""
+
+    if value is None or value == '':
+        return None
+    return int(value)
+
+
+def get_value(record, field: str):
+    """Returns the required field of the record."""
+
+    value = record.get(field)
+    if value is None or value == '':
+        raise InvalidRecord(f'{field} is missing')
+    return value
+
+
+def get_pk(record, field: str):
+    """Returns the primary key in the field of the record."""
+
+    try:
+        return parse_pk(record.get(field))
+    except (TypeError, ValueError):
+        raise InvalidRecord(f'{field} {record[field]!r} is not an id')
+
+
+def get_datetime(record, field: str):
+    """Returns the ISO 8601 date and time in the field of the record."""
+
+    value = get_value(record, field)
+    try:
+        parsed = parse_datetime(str(value))
+    except ValueError:
+        parsed = None
+    if parsed is None:
+        raise InvalidRecord(f'{field} {value!r} is not a date and time')
+    return parsed
+
+
+class LookupCache:
+    """
+    In-memory map of natural keys (username, slug, name) to primary keys.
+    Unknown keys of a whole batch are resolved with one query and,
+    if create_missing is true, created with one bulk_create.
+    """
+
+    membership_kind = None
+
+    def __init__(self, model, field: str, create_missing: bool = False):
+        self.model = model
+        self.field = field
+        self.create_missing = create_missing
+        self.cache = {}
+
+    def make(self, key):
+        """Returns a new unsaved object for the missing key."""
+
+        return self.model(**{self.field: key})
+
+    def resolve(self, keys):
+        """Loads the primary keys of all keys that are not cached yet."""
+
+        missing = {key for key in keys if key and key not in self.cache}
+        if not missing:
+            return
+        self.cache.update(
+            self.model.objects.filter(
+                **{f'{self.field}__in': missing}
+            ).values_list(self.field, 'pk')
+        )
+        missing -= self.cache.keys()
+        if missing and self.create_missing:
+            self.model.objects.bulk_create(
+                [self.make(key) for key in missing]
+            )
+            if self.membership_kind:
+                membership.added(self.membership_kind, missing)
+            self.cache.update(
+                self.model.objects.filter(
+                    **{f'{self.field}__in': missing}
+                ).values_list(self.field, 'pk')
+            )
+
+    def get(self, key):
+        """Returns the primary key of the resolved key or None."""
+
+        return self.cache.get(key) if key else None
+
+    def get_pk(self, record, field: str, required: bool = False):
+        """
+        Returns the primary key of the natural key in the field
+        of the record, None for an empty optional field.
+        """
+
+        key = get_value(record, field) if required else record.get(field)
+        if not key:
+            return None
+        pk = self.get(key)
+        if pk is None:
+            raise InvalidRecord(
+                f'{field} {key!r} does not exist, '
+                'unknown ones are created with --create-missing'
+            )
+        return pk
+
+
+class UserLookupCache(LookupCache):
+    membership_kind = membership.USER
+
+    def make(self, key):
+        user = User(username=key)
+        user.set_unusable_password()
+        return user
+
+
+class CategoryLookupCache(LookupCache):
+    membership_kind = membership.CATEGORY
+
+    def make(self, key):
+        return Category(slug=key, title=key, description=key)
+
+
+class Importer:
+    """
+    Creates posts or comments from records with bulk_create,
+    one transaction per batch.
+
+    Post records: id (optional), title, text, pub_date,
+    author (username), category (slug), location (name),
+    is_published, image.
+    Comment records: id (optional), post (post id), author (username),
+    text.
+    Unknown authors, categories and locations are created if
+    create_missing is true, otherwise the record is invalid.
+    """
+
+    def __init__(self, kind: str = POSTS, create_missing: bool = False,
+                 position: int = 0):
+        self.kind = kind
+        # Number of the records of the file before the next batch.
+        self.position = position
+        self.post_ids = set()
+        self.users = UserLookupCache(User, 'username', create_missing)
+        self.categories = CategoryLookupCache(
+            Category, 'slug', create_missing
+        )
+        self.locations = LookupCache(Location, 'name', create_missing)
+        self.changed_posts = set()
+
+    def build_post(self, record):
+        return Post(
+            id=get_pk(record, 'id'),
+            title=get_value(record, 'title'),
+            text=get_value(record, 'text'),
+            pub_date=get_datetime(record, 'pub_date'),
+            author_id=self.users.get_pk(record, 'author', required=True),
+            category_id=self.categories.get_pk(record, 'category'),
+            location_id=self.locations.get_pk(record, 'location'),
+            is_published=parse_bool(record.get('is_published')),
+            image=record.get('image') or '',
+        )
+
+    def build_comment(self, record):
+        post_id = get_pk(record, 'post')
+        if post_id is None:
+            raise InvalidRecord('post is missing')
+        if post_id not in self.post_ids:
+            raise InvalidRecord(f'post {post_id} does not exist')
+        return Comment(
+            id=get_pk(record, 'id'),
+            post_id=post_id,
+            author_id=self.users.get_pk(record, 'author', required=True),
+            text=get_value(record, 'text'),
+        )
+
+    def build_batch(self, batch, build) -> list:
+        """
+        Builds the objects of the records, raises InvalidRecord
+        with the number of the first invalid record in the file.
+        """
+
+        objs = []
+        for number, record in enumerate(batch, start=self.position + 1):
+            try:
+                objs.append(build(record))
+            except InvalidRecord as error:
+                raise InvalidRecord(f'Record {number}: {error}.') from error
+        return objs
+
+    def import_batch(self, batch) -> int:
+        """
+        Creates the objects of the batch in one transaction. The batch
+        is validated first, an invalid record raises InvalidRecord
+        before any object of the batch is created.
+        """
+
+        self.users.resolve(record.get('author') for record in batch)
+        if self.kind == COMMENTS:
+            model = Comment
+            self.post_ids = set(
+                Post.objects.filter(pk__in={
+                    record['post'] for record in batch
+                    if str(record.get('post') or '').isdigit()
+                }).values_list('pk', flat=True)
+            )
+            objs = self.build_batch(batch, self.build_comment)
+        else:
+            model = Post
+            self.categories.resolve(
+                record.get('category') for record in batch
+            )
+            self.locations.resolve(
+                record.get('location') for record in batch
+            )
+            objs = self.build_batch(batch, self.build_post)
+        self.position += len(batch)
+
+        with transaction.atomic():
+            if model is Comment:
+                Comment.objects.bulk_create(objs, batch_size=len(objs))
+                self.changed_posts.update(obj.post_id for obj in objs)
+                return len(objs)
+            last_pk = (
+                Post.objects.order_by('-pk')
+                .values_list('pk', flat=True).first() or 0
+            )
+            Post.objects.bulk_create(objs, batch_size=len(objs))
+            if all(obj.pk for obj in objs):
+                self.changed_posts.update(obj.pk for obj in objs)
+            else:
+                # The database backend does not return the ids of
+                # bulk inserted rows, they follow the last one.
+                self.changed_posts.update(
+                    Post.objects.filter(pk__gt=last_pk)
+                    .values_list('pk', flat=True)
+                )
+        return len(objs)
+
+    def finish(self):
+        """
+        Sends posts_bulk_changed once for all imported posts,
+        so derived data is rebuilt in bulk.
+        """
+
+        if self.changed_posts:
+            posts_bulk_changed.send(
+                sender=Post, pks=sorted(self.changed_posts), action=IMPORT
+            )
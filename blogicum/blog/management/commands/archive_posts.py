@@ -0,0 +1,37 @@
+from django.core.management.base import BaseCommand
+
+from blog import archive
+
+
+class Command(BaseCommand):
+    """
+    Moves posts published before the cutoff, with their comments,
+    to the archive tables in batches of one transaction each.
+    Every run picks up the posts that got old since the last one,
+    --limit bounds the work of a run.
+    """
+
+    help = 'Incremental archiving of old posts and their comments.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--days', type=int, default=None,
+            help='archive posts published more than DAYS days ago '
+                 '(default: settings.ARCHIVE_AFTER_DAYS)'
+        )
+        parser.add_argument(
+            '--batch-size', type=int, default=archive.BATCH_SIZE
+        )
+        parser.add_argument(
+            '--limit', type=int, default=None,
+            help='archive at most LIMIT posts in this run'
+        )
+
+    def handle(self, *args, **options):
+        cutoff = archive.get_cutoff(options['days'])
+        count = archive.archive_posts(
+            cutoff, options['batch_size'], options['limit']
+        )
+        self.stdout.write(
+            f'archive: {count} posts published before {cutoff:%Y-%m-%d}.'
+        )
@@ -0,0 +1,137 @@
+import asyncio
+import importlib
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test import AsyncClient, Client, override_settings
+from django.urls import clear_url_caches, reverse
+
+from blog import benchmark
+from blogicum import gateway
+
+WSGI = 'wsgi'
+
+ASGI = 'asgi'
+
+URLCONFS = ('blog.urls', 'pages.urls')
+
+
+def reload_urlconf():
+    """Rebuilds the URLconf, so settings.ASYNC_VIEWS is applied."""
+
+    for name in (*URLCONFS, settings.ROOT_URLCONF):
+        if name in sys.modules:
+            importlib.reload(sys.modules[name])
+    clear_url_caches()
+
+
+class Command(BaseCommand):
+    """
+    Compares the feed, post and about pages served by WSGI worker
+    threads with the async views served by the ASGI handler.
+    Both modes get the same number of threads (--workers): WSGI runs
+    one request per thread, ASGI keeps --concurrency requests in flight
+    and runs their ORM work on an ORM gateway of --workers threads.
+    Reports throughput, latency and the peak resident memory.
+    """
+
+    help = 'Benchmark WSGI worker threads against ASGI async views.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--workers', type=int, default=8)
+        parser.add_argument('--concurrency', type=int, default=64)
+        parser.add_argument('--requests', type=int, default=500)
+        parser.add_argument(
+            '--output-dir', default=str(benchmark.RESULTS_DIR)
+        )
+
+    def handle(self, *args, **options):
+        sample_kwargs = benchmark.get_sample_kwargs()
+        if not sample_kwargs:
+            raise CommandError(
+                'No published posts, run generate_data first.'
+            )
+        self.urls = [
+            reverse('blog:index'),
+            reverse(
+                'blog:post_detail',
+                kwargs={'post_pk': sample_kwargs['post_pk']}
+            ),
+            reverse('pages:about'),
+        ]
+
+        results = []
+        for mode in (WSGI, ASGI):
+            with override_settings(
+                ASYNC_VIEWS=mode == ASGI,
+                ORM_GATEWAY_WORKERS=options['workers'],
+                ALLOWED_HOSTS=[*settings.ALLOWED_HOSTS, 'testserver']
+            ):
+                reload_urlconf()
+                gateway.reset_gateway()
+                with benchmark.PeakMemory() as memory:
+                    started = time.perf_counter()
+                    if mode == WSGI:
+                        latencies = self.run_wsgi(options)
+                    else:
+                        latencies = asyncio.run(self.run_asgi(options))
+                    elapsed = time.perf_counter() - started
+                gateway.reset_gateway()
+            result = {
+                'name': mode,
+                'requests': len(latencies),
+                'requests_per_second': round(len(latencies) / elapsed, 1),
+                'peak_memory_kib': memory.peak_kib,
+                **benchmark.summarize(latencies),
+            }
+            results.append(result)
+            self.stdout.write(
+                f'{mode} rps={result["requests_per_second"]:.1f} '
+                f'p50={result["p50_ms"]:.2f}ms p99={result["p99_ms"]:.2f}ms '
+                f'peak={result["peak_memory_kib"]}KiB'
+            )
+        reload_urlconf()
+
+        path = benchmark.save_results('asgi', results, options['output_dir'])
+        self.stdout.write(f'Results saved to {path}')
+
+    def run_wsgi(self, options):
+        """Serves the requests with a pool of WSGI worker threads."""
+
+        local = threading.local()
+
+        def request(index):
+            if not hasattr(local, 'client'):
+                local.client = Client()
+            started = time.perf_counter()
+            local.client.get(self.urls[index % len(self.urls)])
+            return time.perf_counter() - started
+
+        def close(_):
+            connection.close()
+
+        with ThreadPoolExecutor(options['workers']) as pool:
+            latencies = list(pool.map(request, range(options['requests'])))
+            list(pool.map(close, range(options['workers'])))
+        return latencies
+
+    async def run_asgi(self, options):
+        """Keeps --concurrency requests in flight on the ASGI handler."""
+
+        client = AsyncClient()
+        semaphore = asyncio.Semaphore(options['concurrency'])
+
+        async def request(index):
+            async with semaphore:
+                started = time.perf_counter()
+                await client.get(self.urls[index % len(self.urls)])
+                return time.perf_counter() - started
+
+        return await asyncio.gather(
+            *(request(index) for index in range(options['requests']))
+        )
@@ -0,0 +1,124 @@
+import time
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.test import Client, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from blog import benchmark
+from blogicum import ratelimit
+
+User = get_user_model()
+
+# Limits no run reaches, every request is allowed.
+UNLIMITED = {'user': '1000000000/s', 'ip': '1000000000/s'}
+
+# Limits exhausted by the first request.
+EXHAUSTED = {'user': '1/d', 'ip': '1/d'}
+
+
+class Command(BaseCommand):
+    """
+    Measures the overhead of the rate limiter: a token taken from
+    a bucket of the RATE_LIMIT_CACHE_ALIAS cache, allowed and rejected,
+    and comment POSTs without the limiter, allowed by it and answered
+    with 429. Comments are posted in a transaction rolled back
+    at the end, the database is left as it was.
+    """
+
+    help = 'Benchmark the overhead of the rate limiter.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--repeat', type=int, default=2000)
+        parser.add_argument('--requests', type=int, default=200)
+        parser.add_argument(
+            '--output-dir', default=str(benchmark.RESULTS_DIR)
+        )
+
+    def handle(self, *args, **options):
+        sample_kwargs = benchmark.get_sample_kwargs()
+        if not sample_kwargs:
+            raise CommandError(
+                'No published posts, run generate_data first.'
+            )
+        user = User.objects.get(username=sample_kwargs['username'])
+        url = reverse(
+            'blog:add_comment', kwargs={'post_pk': sample_kwargs['post_pk']}
+        )
+
+        results = [
+            self.measure_consume('consume_allowed', 10 ** 9, options),
+            self.measure_consume('consume_rejected', 1, options),
+        ]
+        with transaction.atomic():
+            for name, limits in (
+                ('comment_unlimited', None),
+                ('comment_allowed', UNLIMITED),
+                ('comment_rejected', EXHAUSTED),
+            ):
+                results.append(
+                    self.measure_post(name, limits, user, url, options)
+                )
+            transaction.set_rollback(True)
+
+        for result in results:
+            self.stdout.write(
+                f'{result["name"]:<18} status={result.get("status", "-")} '
+                f'queries={result.get("queries", 0)} '
+                f'p50={result["p50_ms"]:.3f}ms p99={result["p99_ms"]:.3f}ms'
+            )
+        path = benchmark.save_results(
+            'ratelimit', results, options['output_dir']
+        )
+        self.stdout.write(f'Results saved to {path}')
+
+    def measure_consume(self, name, capacity, options) -> dict:
+        """Takes tokens from one bucket, capacity 1 rejects all but one."""
+
+        key = f'ratelimit:benchmark:{name}:{time.time()}'
+        latencies = []
+        for _ in range(options['repeat']):
+            started = time.perf_counter()
+            ratelimit.consume(key, capacity, 86400)
+            latencies.append(time.perf_counter() - started)
+        ratelimit.get_cache().delete_many([key, f'{key}:clamp'])
+        return {
+            'name': name,
+            'calls': len(latencies),
+            **benchmark.summarize(latencies),
+        }
+
+    def measure_post(self, name, limits, user, url, options) -> dict:
+        """
+        Posts comments with the limits in place of the comment limits
+        of settings.RATE_LIMITS, None turns the limiter off.
+        """
+
+        rate_limits = {} if limits is None else {'comment': limits}
+        client = Client(HTTP_HOST=settings.ALLOWED_HOSTS[0])
+        client.force_login(user)
+        latencies = []
+        with override_settings(RATE_LIMITS=rate_limits):
+            ratelimit.get_cache().delete_many([
+                f'ratelimit:comment:{kind}:{identity}'
+                for kind, identity in (
+                    (ratelimit.IP, '127.0.0.1'), (ratelimit.USER, user.pk)
+                )
+            ])
+            client.post(url, {'text': 'Комментарий для замера'})
+            for _ in range(options['requests']):
+                with CaptureQueriesContext(connection) as captured:
+                    started = time.perf_counter()
+                    response = client.post(
+                        url, {'text': 'Комментарий для замера'}
+                    )
+                    latencies.append(time.perf_counter() - started)
+        return {
+            'name': name,
+            'status': response.status_code,
+            'queries': len(captured.captured_queries),
+            **benchmark.summarize(latencies),
+        }
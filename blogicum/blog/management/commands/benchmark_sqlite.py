@@ -0,0 +1,174 @@
+import shutil
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, connections
+from django.test import Client, override_settings
+from django.urls import reverse
+
+from blog import benchmark
+
+User = get_user_model()
+
+DEFAULT = 'default'
+
+TUNED = 'tuned'
+
+# Pragmas that restore the SQLite defaults: rollback journal, full sync.
+DEFAULT_PRAGMAS = {'journal_mode': 'DELETE', 'synchronous': 'FULL'}
+
+
+class Command(BaseCommand):
+    """
+    Measures read throughput of the feed and post pages while
+    CommentCreateView writes are in flight, once with the SQLite
+    defaults (rollback journal) and once with the tuned pragmas
+    (WAL) of settings.SQLITE_PRAGMAS.
+    Every mode runs on its own copy of the current SQLite database.
+    """
+
+    help = 'Benchmark concurrent reads and comment writes on SQLite.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--readers', type=int, default=4)
+        parser.add_argument('--writers', type=int, default=2)
+        parser.add_argument(
+            '--duration', type=float, default=10.0, help='seconds per mode'
+        )
+        parser.add_argument(
+            '--output-dir', default=str(benchmark.RESULTS_DIR)
+        )
+
+    def handle(self, *args, **options):
+        database = connections.databases[DEFAULT]
+        if connection.vendor != 'sqlite':
+            raise CommandError('The default database is not SQLite.')
+        sample_kwargs = benchmark.get_sample_kwargs()
+        if not sample_kwargs:
+            raise CommandError(
+                'No published posts, run generate_data first.'
+            )
+        user = User.objects.get(username=sample_kwargs['username'])
+        source = Path(database['NAME'])
+        original = {
+            'NAME': database['NAME'], 'PRAGMAS': database.get('PRAGMAS')
+        }
+
+        results = []
+        try:
+            for mode, pragmas in (
+                (DEFAULT, DEFAULT_PRAGMAS), (TUNED, settings.SQLITE_PRAGMAS)
+            ):
+                with tempfile.TemporaryDirectory() as directory:
+                    copy = Path(directory) / source.name
+                    shutil.copyfile(source, copy)
+                    connection.close()
+                    database.update(NAME=str(copy), PRAGMAS=pragmas)
+                    # The writers post far over the comment rate limit.
+                    with override_settings(RATE_LIMITS={}):
+                        result = self.run_mode(user, sample_kwargs, options)
+                    connection.close()
+                result['name'] = mode
+                results.append(result)
+                self.stdout.write(
+                    f'{mode:<8} reads/s={result["reads_per_second"]:.1f} '
+                    f'p50={result["p50_ms"]:.2f}ms '
+                    f'p99={result["p99_ms"]:.2f}ms '
+                    f'writes={result["writes"]} '
+                    f'errors={result["errors"]}'
+                )
+        finally:
+            connection.close()
+            database.update(original)
+
+        path = benchmark.save_results(
+            'sqlite', results, options['output_dir']
+        )
+        self.stdout.write(f'Results saved to {path}')
+
+    def run_mode(self, user, sample_kwargs, options) -> dict:
+        """Runs readers and writers for the duration, returns the stats."""
+
+        post_kwargs = {'post_pk': sample_kwargs['post_pk']}
+        self.read_urls = (
+            reverse('blog:index'),
+            reverse('blog:post_detail', kwargs=post_kwargs),
+        )
+        self.comment_url = reverse('blog:add_comment', kwargs=post_kwargs)
+        self.stop = threading.Event()
+        self.lock = threading.Lock()
+        self.latencies = []
+        self.counters = {'writes': 0, 'errors': 0}
+
+        threads = [
+            threading.Thread(target=self.reader)
+            for _ in range(options['readers'])
+        ] + [
+            threading.Thread(target=self.writer, args=(user,))
+            for _ in range(options['writers'])
+        ]
+        for thread in threads:
+            thread.start()
+        time.sleep(options['duration'])
+        self.stop.set()
+        for thread in threads:
+            thread.join()
+
+        return {
+            'reads': len(self.latencies),
+            'reads_per_second': round(
+                len(self.latencies) / options['duration'], 1
+            ),
+            **self.counters,
+            **benchmark.summarize(self.latencies),
+        }
+
+    def count(self, name):
+        with self.lock:
+            self.counters[name] += 1
+
+    def get_client(self):
+        return Client(
+            HTTP_HOST=settings.ALLOWED_HOSTS[0],
+            raise_request_exception=False
+        )
+
+    def reader(self):
+        """Requests the read URLs in turn until the run stops."""
+
+        client = self.get_client()
+        index = 0
+        try:
+            while not self.stop.is_set():
+                url = self.read_urls[index % len(self.read_urls)]
+                index += 1
+                started = time.perf_counter()
+                response = client.get(url)
+                if response.status_code != 200:
+                    self.count('errors')
+                    continue
+                with self.lock:
+                    self.latencies.append(time.perf_counter() - started)
+        finally:
+            connection.close()
+
+    def writer(self, user):
+        """Posts comments through CommentCreateView until the run stops."""
+
+        client = self.get_client()
+        client.force_login(user)
+        try:
+            while not self.stop.is_set():
+                response = client.post(
+                    self.comment_url, {'text': 'Комментарий под нагрузкой'}
+                )
+                self.count(
+                    'writes' if response.status_code == 302 else 'errors'
+                )
+        finally:
+            connection.close()
@@ -0,0 +1,93 @@
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.test import Client
+
+from blog import benchmark
+
+User = get_user_model()
+
+
+class Command(BaseCommand):
+    """
+    Measures latency percentiles, query counts and response sizes of
+    every URL of blog.urls and pages.urls on the current database
+    (populate it with generate_data first), stores the results as JSON
+    and optionally compares them with a previous run.
+    """
+
+    help = 'Benchmark the blog and pages views.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--repeat', type=int, default=20)
+        parser.add_argument('--warmup', type=int, default=2)
+        parser.add_argument(
+            '--username',
+            help='log in as the user, the sample post author by default'
+        )
+        parser.add_argument(
+            '--anonymous', action='store_true',
+            help='request the pages without logging in'
+        )
+        parser.add_argument(
+            '--output-dir', default=str(benchmark.RESULTS_DIR)
+        )
+        parser.add_argument(
+            '--compare', help='results file of a previous run'
+        )
+        parser.add_argument(
+            '--templates', action='store_true',
+            help='print the render time of every template and include'
+        )
+
+    def handle(self, *args, **options):
+        sample_kwargs = benchmark.get_sample_kwargs()
+        if not sample_kwargs:
+            raise CommandError(
+                'No published posts, run generate_data first.'
+            )
+        client = Client(HTTP_HOST=settings.ALLOWED_HOSTS[0])
+        if not options['anonymous']:
+            username = options['username'] or sample_kwargs['username']
+            client.force_login(User.objects.get(username=username))
+
+        results = []
+        for name, url in benchmark.get_urls(sample_kwargs):
+            result = benchmark.measure(
+                client, url, options['repeat'], options['warmup']
+            )
+            result['name'] = name
+            results.append(result)
+            self.stdout.write(
+                f'{name:<22} {result["status"]} '
+                f'p50={result["p50_ms"]:.2f}ms '
+                f'p90={result["p90_ms"]:.2f}ms '
+                f'p99={result["p99_ms"]:.2f}ms '
+                f'queries={result["queries"]} bytes={result["bytes"]}'
+            )
+            if options['templates']:
+                self.write_templates(result['templates'])
+        path = benchmark.save_results(
+            'views', results, options['output_dir']
+        )
+        self.stdout.write(f'Results saved to {path}')
+
+        if options['compare']:
+            old = benchmark.load_results(options['compare'])
+            new = {result['name']: result for result in results}
+            for name, before, after, change in benchmark.compare(old, new):
+                self.stdout.write(
+                    f'{name:<22} {before:.2f}ms -> {after:.2f}ms '
+                    f'({change:+.1f}%)'
+                )
+
+    def write_templates(self, timings):
+        """Writes the template timings of a URL, slowest first."""
+
+        for timing in timings:
+            parent = timing['parent'] or '-'
+            self.stdout.write(
+                f'    {timing["template"]:<32} in {parent:<28} '
+                f'renders={timing["renders"]:g} '
+                f'total={timing["ms"]:.2f}ms self={timing["self_ms"]:.2f}ms'
+            )
@@ -0,0 +1,77 @@
+from functools import partial
+from pathlib import Path
+
+from django.core.management.base import BaseCommand, CommandError
+
+from blog import export
+
+
+class Command(BaseCommand):
+    """
+    Streams a table of the blog to a CSV or JSONL file chunk by chunk.
+    With --checkpoint the last exported pk is saved after every chunk,
+    a restarted export continues from it and appends to the output.
+    """
+
+    help = 'Export posts, comments, categories or locations.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('model', choices=tuple(export.EXPORT_MODELS))
+        parser.add_argument(
+            '--format', choices=export.FORMATS, default=export.CSV
+        )
+        parser.add_argument(
+            '--output', help='output file, stdout if not set'
+        )
+        parser.add_argument(
+            '--checkpoint', help='file that stores the last exported pk'
+        )
+        parser.add_argument(
+            '--after', type=int, default=0,
+            help='export only rows with a greater pk'
+        )
+        parser.add_argument(
+            '--chunk-size', type=int, default=export.CHUNK_SIZE
+        )
+
+    def handle(self, *args, **options):
+        model = export.EXPORT_MODELS[options['model']]
+        export_format = options['format']
+        chunk_size = options['chunk_size']
+        checkpoint = (
+            Path(options['checkpoint']) if options['checkpoint'] else None
+        )
+        after_pk = options['after']
+        if checkpoint and checkpoint.exists():
+            after_pk = int(checkpoint.read_text() or 0)
+        if checkpoint and not options['output']:
+            raise CommandError('--checkpoint requires --output.')
+
+        output = None
+        if options['output']:
+            output = open(
+                options['output'], 'a' if after_pk else 'w',
+                encoding='utf-8', newline=''
+            )
+            write = output.write
+        else:
+            write = partial(self.stdout.write, ending='')
+
+        exported = 0
+        try:
+            if not after_pk:
+                write(export.get_header(model, export_format))
+            formatter = export.get_formatter(model, export_format)
+            for row in export.iter_rows(model, after_pk, chunk_size):
+                write(formatter(row))
+                exported += 1
+                if checkpoint and exported % chunk_size == 0:
+                    output.flush()
+                    checkpoint.write_text(str(row['id']))
+            if checkpoint and exported:
+                output.flush()
+                checkpoint.write_text(str(row['id']))
+        finally:
+            if output is not None:
+                output.close()
+        self.stderr.write(f'Exported {exported} rows.')
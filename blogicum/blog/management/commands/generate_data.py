@@ -0,0 +1,177 @@
+import datetime as dt
+import random
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.utils import timezone
+
+from blog import membership
+from blog.importer import IMPORT
+from blog.models import Category, Comment, Location, Post
+from blog.signals import posts_bulk_changed
+
+User = get_user_model()
+
+BATCH_SIZE = 1000
+
+PASSWORD = 'benchmark-password'
+
+WORDS = (
+    'путешествие город море горы утро вечер история друг книга музыка '
+    'кино дорога дом лето зима осень весна кофе работа проект идея '
+    'мечта фото прогулка парк река лес небо солнце дождь снег поезд '
+    'самолёт выставка концерт рецепт ужин завтрак спорт бег велосипед'
+).split()
+
+
+class Command(BaseCommand):
+    """
+    Populates the database with synthetic users, categories, locations,
+    posts and comments for load testing.
+
+    Distributions: post authors and commented posts follow a Zipf-like
+    law (a few prolific authors and popular posts), pub_date is spread
+    over the last year with a share of delayed posts, and a share of
+    posts, categories and locations is unpublished.
+    """
+
+    help = 'Generate synthetic data for benchmarks.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=100)
+        parser.add_argument('--categories', type=int, default=10)
+        parser.add_argument('--locations', type=int, default=20)
+        parser.add_argument('--posts', type=int, default=5000)
+        parser.add_argument('--comments', type=int, default=20000)
+        parser.add_argument(
+            '--unpublished', type=float, default=0.05,
+            help='share of unpublished objects'
+        )
+        parser.add_argument(
+            '--future', type=float, default=0.02,
+            help='share of delayed posts'
+        )
+        parser.add_argument('--seed', type=int, default=0)
+
+    def words(self, low, high):
+        return ' '.join(
+            self.random.choices(WORDS, k=self.random.randint(low, high))
+        )
+
+    def zipf_weights(self, n):
+        return [1 / rank for rank in range(1, n + 1)]
+
+    def is_published(self):
+        return self.random.random() >= self.unpublished
+
+    @transaction.atomic
+    def handle(self, *args, **options):
+        self.random = random.Random(options['seed'])
+        self.unpublished = options['unpublished']
+        now = timezone.now()
+        prefix = f'gen{int(now.timestamp())}'
+
+        password = make_password(PASSWORD)
+        User.objects.bulk_create(
+            (
+                User(username=f'{prefix}_user{i}', password=password)
+                for i in range(options['users'])
+            ),
+            batch_size=BATCH_SIZE
+        )
+        user_ids = list(
+            User.objects.filter(username__startswith=f'{prefix}_user')
+            .values_list('pk', flat=True)
+        )
+        Category.objects.bulk_create(
+            Category(
+                title=self.words(1, 3).capitalize(),
+                description=self.words(5, 15),
+                slug=f'{prefix}-category{i}',
+                is_published=self.is_published(),
+            )
+            for i in range(options['categories'])
+        )
+        category_ids = list(
+            Category.objects.filter(slug__startswith=f'{prefix}-category')
+            .values_list('pk', flat=True)
+        )
+        location_names = [
+            f'{self.words(1, 2).capitalize()} {i}'
+            for i in range(options['locations'])
+        ]
+        Location.objects.bulk_create(
+            Location(name=name, is_published=self.is_published())
+            for name in location_names
+        )
+        location_ids = list(
+            Location.objects.filter(name__in=location_names)
+            .values_list('pk', flat=True)
+        )
+
+        authors = self.random.choices(
+            user_ids, self.zipf_weights(len(user_ids)), k=options['posts']
+        )
+        last_post = Post.objects.order_by('-pk').values_list('pk', flat=True)
+        first_post_id = (last_post.first() or 0) + 1
+        posts = []
+        for author_id in authors:
+            if self.random.random() < options['future']:
+                delta = dt.timedelta(days=self.random.uniform(1, 30))
+            else:
+                delta = -dt.timedelta(days=self.random.expovariate(1 / 90))
+            posts.append(Post(
+                title=self.words(2, 8).capitalize(),
+                text=self.words(30, 400),
+                pub_date=now + delta,
+                author_id=author_id,
+                category_id=self.random.choice(category_ids),
+                location_id=(
+                    self.random.choice(location_ids)
+                    if self.random.random() < 0.7 else None
+                ),
+                is_published=self.is_published(),
+            ))
+        Post.objects.bulk_create(posts, batch_size=BATCH_SIZE)
+        post_ids = list(
+            Post.objects.filter(pk__gte=first_post_id)
+            .values_list('pk', flat=True)
+        )
+
+        self.random.shuffle(post_ids)
+        commented = self.random.choices(
+            post_ids, self.zipf_weights(len(post_ids)),
+            k=options['comments'] if post_ids else 0
+        )
+        Comment.objects.bulk_create(
+            (
+                Comment(
+                    post_id=post_id,
+                    author_id=self.random.choice(user_ids),
+                    text=self.words(3, 40),
+                )
+                for post_id in commented
+            ),
+            batch_size=BATCH_SIZE
+        )
+        # bulk_create sends no post_save, the filters are told here.
+        membership.added(
+            membership.USER,
+            [f'{prefix}_user{i}' for i in range(options['users'])]
+        )
+        membership.added(
+            membership.CATEGORY,
+            [f'{prefix}-category{i}' for i in range(options['categories'])]
+        )
+        if post_ids:
+            posts_bulk_changed.send(
+                sender=Post, pks=sorted(post_ids), action=IMPORT
+            )
+        self.stdout.write(
+            f'Created {len(user_ids)} users, {len(category_ids)} '
+            f'categories, {len(location_ids)} locations, {len(post_ids)} '
+            f'posts and {options["comments"]} comments '
+            f'(password of the users: {PASSWORD}).'
+        )
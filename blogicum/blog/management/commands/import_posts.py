@@ -0,0 +1,81 @@
+import time
+from itertools import islice
+from pathlib import Path
+
+from django.core.management.base import BaseCommand, CommandError
+
+from blog import importer
+
+
+class Command(BaseCommand):
+    """
+    Streams posts or comments from a JSONL or CSV file into the database
+    with bulk_create, one transaction per batch.
+    With --checkpoint the number of imported records is saved after
+    every committed batch, a restarted import skips them.
+    """
+
+    help = 'Bulk import of posts or comments.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('path')
+        parser.add_argument(
+            '--kind', choices=(importer.POSTS, importer.COMMENTS),
+            default=importer.POSTS
+        )
+        parser.add_argument(
+            '--format', choices=('jsonl', 'csv'), default=None,
+            help='file format, guessed from the extension if not set'
+        )
+        parser.add_argument(
+            '--batch-size', type=int, default=importer.BATCH_SIZE
+        )
+        parser.add_argument(
+            '--checkpoint', help='file that stores the imported count'
+        )
+        parser.add_argument(
+            '--create-missing', action='store_true',
+            help='create unknown authors, categories and locations'
+        )
+
+    def handle(self, *args, **options):
+        path = Path(options['path'])
+        file_format = options['format'] or (
+            'csv' if path.suffix == '.csv' else 'jsonl'
+        )
+        checkpoint = (
+            Path(options['checkpoint']) if options['checkpoint'] else None
+        )
+        done = 0
+        if checkpoint and checkpoint.exists():
+            done = int(checkpoint.read_text() or 0)
+
+        posts_importer = importer.Importer(
+            options['kind'], options['create_missing'], done
+        )
+        started = time.monotonic()
+        imported = 0
+        # The batches before a failed one are committed and
+        # checkpointed, their derived data is built in any case.
+        try:
+            with open(path, encoding='utf-8', newline='') as file:
+                records = islice(
+                    importer.read_records(file, file_format), done, None
+                )
+                for batch in importer.iter_batches(
+                    records, options['batch_size']
+                ):
+                    imported += posts_importer.import_batch(batch)
+                    if checkpoint:
+                        checkpoint.write_text(str(done + imported))
+                    rate = imported / max(
+                        time.monotonic() - started, 1e-6
+                    )
+                    self.stderr.write(
+                        f'{done + imported} records imported ({rate:.0f}/s)'
+                    )
+        except importer.InvalidRecord as error:
+            raise CommandError(str(error))
+        finally:
+            posts_importer.finish()
+        self.stdout.write(f'Imported {imported} {options["kind"]}.')
@@ -0,0 +1,61 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from blog import moderation
+from blog.models import Category, Post
+
+
+class Command(BaseCommand):
+    """
+    Publishes, unpublishes, moves to a category or deletes posts
+    in batches of single UPDATE/DELETE statements.
+    """
+
+    help = 'Bulk moderation of posts.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'action',
+            choices=(
+                moderation.PUBLISH, moderation.UNPUBLISH,
+                moderation.MOVE, moderation.DELETE
+            )
+        )
+        parser.add_argument('--ids', nargs='+', type=int, default=None)
+        parser.add_argument('--author', help='username of the author')
+        parser.add_argument('--category', help='slug of the current category')
+        parser.add_argument(
+            '--to-category', help='slug of the target category for move'
+        )
+        parser.add_argument(
+            '--before', help='only posts published before the ISO date'
+        )
+        parser.add_argument(
+            '--batch-size', type=int, default=moderation.BATCH_SIZE
+        )
+
+    def handle(self, *args, **options):
+        queryset = Post.objects.all()
+        if options['ids']:
+            queryset = queryset.filter(pk__in=options['ids'])
+        if options['author']:
+            queryset = queryset.filter(author__username=options['author'])
+        if options['category']:
+            queryset = queryset.filter(category__slug=options['category'])
+        if options['before']:
+            queryset = queryset.filter(pub_date__lt=options['before'])
+
+        action = options['action']
+        batch_size = options['batch_size']
+        if action == moderation.PUBLISH:
+            count = moderation.publish_posts(queryset, batch_size)
+        elif action == moderation.UNPUBLISH:
+            count = moderation.unpublish_posts(queryset, batch_size)
+        elif action == moderation.MOVE:
+            try:
+                category = Category.objects.get(slug=options['to_category'])
+            except Category.DoesNotExist:
+                raise CommandError('--to-category must be an existing slug.')
+            count = moderation.move_posts(queryset, category, batch_size)
+        else:
+            count = moderation.delete_posts(queryset, batch_size)
+        self.stdout.write(f'{action}: {count} posts.')
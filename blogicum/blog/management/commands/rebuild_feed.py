@@ -0,0 +1,16 @@
+from django.core.management.base import BaseCommand
+
+from blog import feed
+
+
+class Command(BaseCommand):
+    """
+    Rebuilds the cards of the feed table from the posts, e.g. after
+    changes made outside of the ORM signals.
+    """
+
+    help = 'Rebuild the materialized feed table.'
+
+    def handle(self, *args, **options):
+        count = feed.rebuild()
+        self.stdout.write(f'feed: {count} cards.')
@@ -0,0 +1,16 @@
+from django.core.management.base import BaseCommand
+
+from blog import stats
+
+
+class Command(BaseCommand):
+    """
+    Recounts the stats of all authors from their posts and comments,
+    e.g. after changes made outside of the ORM signals.
+    """
+
+    help = 'Recount the post and comment stats of the authors.'
+
+    def handle(self, *args, **options):
+        count = stats.rebuild()
+        self.stdout.write(f'stats: {count} authors.')
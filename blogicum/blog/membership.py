@@ -0,0 +1,211 @@
+import itertools
+import threading
+import time
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import caches
+from django.db import transaction
+
+from blogicum.routers import PRIMARY
+
+from .models import ArchivedPost, Category, Post
+
+User = get_user_model()
+
+POST = 'post'
+
+CATEGORY = 'category'
+
+USER = 'user'
+
+# Seconds between checks of the shared version of a filter.
+VERSION_CHECK_INTERVAL = 1.0
+
+
+def get_cache():
+    return caches[settings.NEGATIVE_CACHE_ALIAS]
+
+
+def get_version_key(kind: str) -> str:
+    return f'membership:version:{kind}'
+
+
+def bump_version(kind: str):
+    """Makes every process rebuild its filter of the kind."""
+
+    cache = get_cache()
+    key = get_version_key(kind)
+    cache.add(key, 0, None)
+    try:
+        cache.incr(key)
+    except ValueError:
+        cache.set(key, 1, None)
+
+
+class KeySet:
+    """
+    Exact in-memory set of the keys of a model, built on first use.
+    A key that is not in the set does not exist, unless another process
+    created it: creations bump a version in the shared cache, and the
+    set is rebuilt when the version changes or after
+    settings.MEMBERSHIP_MAX_AGE seconds.
+    """
+
+    def __init__(self, kind: str, load):
+        self.kind = kind
+        self.load = load
+        self.lock = threading.Lock()
+        self.built_at = None
+        self.checked_at = 0.0
+        self.version = None
+
+    def build(self, keys):
+        self.keys = set(keys)
+
+    def contains(self, key) -> bool:
+        return key in self.keys
+
+    def is_stale(self) -> bool:
+        if self.built_at is None:
+            return True
+        now = time.monotonic()
+        if now - self.built_at > settings.MEMBERSHIP_MAX_AGE:
+            return True
+        if now - self.checked_at < VERSION_CHECK_INTERVAL:
+            return False
+        self.checked_at = now
+        return get_cache().get(get_version_key(self.kind)) != self.version
+
+    def refresh(self):
+        """Rebuilds the set if it is stale."""
+
+        if not self.is_stale():
+            return
+        started = time.monotonic()
+        with self.lock:
+            if self.built_at is not None and self.built_at >= started:
+                # Rebuilt by another thread while waiting for the lock.
+                return
+            version = get_cache().get(get_version_key(self.kind))
+            self.build(self.load())
+            self.version = version
+            self.built_at = self.checked_at = time.monotonic()
+
+    def may_exist(self, key) -> bool:
+        """Returns False only if the key definitely does not exist."""
+
+        if not settings.MEMBERSHIP_FILTERS:
+            return True
+        self.refresh()
+        return self.contains(key)
+
+    def add(self, key):
+        if self.built_at is not None:
+            self.keys.add(key)
+
+    def discard(self, key):
+        if self.built_at is not None:
+            self.keys.discard(key)
+
+    def reset(self):
+        self.built_at = None
+
+
+class IdBitmap(KeySet):
+    """
+    Bitmap of existing ids up to the largest id seen at build time.
+    Auto-incremented ids are dense, so one bit per id is smaller than
+    a bloom filter and has no false positives. Ids above the largest
+    one may have been created by another process since the build, they
+    are never reported as missing.
+    """
+
+    def build(self, keys):
+        keys = list(keys)
+        max_id = max(keys, default=0)
+        bits = bytearray(max_id // 8 + 1)
+        for key in keys:
+            bits[key >> 3] |= 1 << (key & 7)
+        # One assignment, so readers in other threads never see the new
+        # max_id with the old, shorter bits.
+        self.bitmap = max_id, bits
+
+    def contains(self, key) -> bool:
+        max_id, bits = self.bitmap
+        if key > max_id:
+            return True
+        return bool(bits[key >> 3] & (1 << (key & 7)))
+
+    def add(self, key):
+        if self.built_at is None:
+            return
+        max_id, bits = self.bitmap
+        if key <= max_id:
+            bits[key >> 3] |= 1 << (key & 7)
+
+    def discard(self, key):
+        if self.built_at is None:
+            return
+        max_id, bits = self.bitmap
+        if key <= max_id:
+            bits[key >> 3] &= ~(1 << (key & 7)) & 0xFF
+
+
+def load(model, field: str = 'pk'):
+    """
+    Returns a loader of the keys of the model. Keys are read from
+    the primary, a lagging replica would miss the newest objects
+    and the filter would report them missing until the next rebuild.
+    """
+
+    return lambda: model.objects.using(PRIMARY).values_list(
+        field, flat=True
+    ).iterator()
+
+
+filters = {
+    # Archived posts are still shown by their ids.
+    POST: IdBitmap(
+        POST,
+        lambda: itertools.chain(load(Post)(), load(ArchivedPost)())
+    ),
+    CATEGORY: KeySet(CATEGORY, load(Category, 'slug')),
+    USER: KeySet(USER, load(User, User.USERNAME_FIELD)),
+}
+
+
+def may_exist(kind: str, key) -> bool:
+    """Returns False only if the object definitely does not exist."""
+
+    return filters[kind].may_exist(key)
+
+
+def added(kind: str, keys, shared: bool = True):
+    """
+    Adds created keys to the filter of this process and, if shared,
+    makes the other processes rebuild theirs once the keys are committed.
+    """
+
+    for key in keys:
+        filters[kind].add(key)
+    if shared:
+        transaction.on_commit(lambda: bump_version(kind))
+
+
+def removed(kind: str, keys):
+    """
+    Removes deleted keys from the filter of this process, the other
+    processes keep them until their rebuild, which is only a wasted
+    query and not a wrong answer.
+    """
+
+    for key in keys:
+        filters[kind].discard(key)
+
+
+def reset():
+    """Drops all filters, they are rebuilt on next use."""
+
+    for membership_filter in filters.values():
+        membership_filter.reset()
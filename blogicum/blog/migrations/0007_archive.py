@@ -0,0 +1,52 @@
+# Generated by Django 3.2.16 on 2026-10-19 09:08
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('blog', '0006_auto_20230821_2042'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ArchivedPost',
+            fields=[
+                ('id', models.BigIntegerField(primary_key=True, serialize=False)),
+                ('title', models.CharField(max_length=256, verbose_name='Заголовок')),
+                ('text', models.TextField(verbose_name='Текст')),
+                ('pub_date', models.DateTimeField(verbose_name='Дата и время публикации')),
+                ('image', models.ImageField(blank=True, upload_to='posts_images/', verbose_name='Фото')),
+                ('is_published', models.BooleanField(verbose_name='Опубликовано')),
+                ('created_at', models.DateTimeField(verbose_name='Добавлено')),
+                ('archived_at', models.DateTimeField(auto_now_add=True, verbose_name='Перенесено в архив')),
+                ('author', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='archived_posts', to=settings.AUTH_USER_MODEL, verbose_name='Автор публикации')),
+                ('category', models.ForeignKey(null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='archived_posts', to='blog.category', verbose_name='Категория')),
+                ('location', models.ForeignKey(null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='archived_posts', to='blog.location', verbose_name='Местоположение')),
+            ],
+            options={
+                'verbose_name': 'архивная публикация',
+                'verbose_name_plural': 'Архив публикаций',
+                'ordering': ('-pub_date',),
+            },
+        ),
+        migrations.CreateModel(
+            name='ArchivedComment',
+            fields=[
+                ('id', models.BigIntegerField(primary_key=True, serialize=False)),
+                ('text', models.TextField(verbose_name='Текст комментария')),
+                ('created_at', models.DateTimeField()),
+                ('author', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='archived_comments', to=settings.AUTH_USER_MODEL)),
+                ('post', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='comments', to='blog.archivedpost')),
+            ],
+            options={
+                'verbose_name': 'архивный комментарий',
+                'verbose_name_plural': 'архивные комментарии',
+                'ordering': ('created_at',),
+            },
+        ),
+    ]
@@ -0,0 +1,86 @@
+# Generated by Django 3.2.16 on 2026-10-19 09:13
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+from django.utils.text import Truncator
+
+
+def fill_feed(apps, schema_editor):
+    """Creates the cards of the visible posts, see blog.feed."""
+
+    Post = apps.get_model('blog', 'Post')
+    FeedEntry = apps.get_model('blog', 'FeedEntry')
+    posts = Post.objects.filter(
+        is_published=True, category__is_published=True
+    ).select_related('author', 'category', 'location').annotate(
+        comment_count=models.Count('comments')
+    )
+    FeedEntry.objects.bulk_create(
+        (
+            FeedEntry(
+                post_id=post.pk,
+                pub_date=post.pub_date,
+                title=post.title,
+                excerpt=Truncator(post.text).words(30),
+                image=post.image.name or '',
+                author_id=post.author_id,
+                author_username=post.author.username,
+                category_id=post.category_id,
+                category_slug=post.category.slug,
+                category_title=post.category.title,
+                location_id=post.location_id,
+                location_name=(
+                    post.location.name
+                    if post.location and post.location.is_published
+                    else None
+                ),
+                comment_count=post.comment_count,
+            )
+            for post in posts.iterator()
+        ),
+        batch_size=500
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('blog', '0007_archive'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='FeedEntry',
+            fields=[
+                ('post', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='feed_entry', serialize=False, to='blog.post')),
+                ('pub_date', models.DateTimeField()),
+                ('title', models.CharField(max_length=256)),
+                ('excerpt', models.TextField()),
+                ('image', models.CharField(blank=True, max_length=100)),
+                ('author_username', models.CharField(max_length=150)),
+                ('category_slug', models.SlugField(db_index=False)),
+                ('category_title', models.CharField(max_length=256)),
+                ('location_name', models.CharField(max_length=256, null=True)),
+                ('comment_count', models.PositiveIntegerField(default=0)),
+                ('author', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to=settings.AUTH_USER_MODEL)),
+                ('category', models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, related_name='+', to='blog.category')),
+                ('location', models.ForeignKey(null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='blog.location')),
+            ],
+            options={
+                'verbose_name': 'запись ленты',
+                'verbose_name_plural': 'лента',
+                'ordering': ('-pub_date',),
+            },
+        ),
+        migrations.AddIndex(
+            model_name='feedentry',
+            index=models.Index(fields=['-pub_date'], name='feed_pub_date_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='feedentry',
+            index=models.Index(fields=['category', '-pub_date'], name='feed_category_idx'),
+        ),
+        migrations.RunPython(fill_feed, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,67 @@
+# Generated by Django 3.2.16 on 2026-10-19 09:22
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+def fill_stats(apps, schema_editor):
+    """Counts the posts and comments of every author, see blog.stats."""
+
+    AuthorStats = apps.get_model('blog', 'AuthorStats')
+    published = models.Q(is_published=True, category__is_published=True)
+    stats = {}
+    for model_name, prefix in (
+        ('Post', ''), ('ArchivedPost', 'archived_')
+    ):
+        posts = apps.get_model('blog', model_name).objects.order_by(
+        ).values('author').annotate(
+            total=models.Count('pk'),
+            published=models.Count('pk', filter=published),
+            latest=models.Max('pub_date', filter=published),
+        )
+        for row in posts:
+            author_stats = stats.setdefault(
+                row['author'], AuthorStats(author_id=row['author'])
+            )
+            setattr(author_stats, f'{prefix}post_count', row['total'])
+            setattr(
+                author_stats, f'{prefix}published_post_count',
+                row['published']
+            )
+            if author_stats.last_post_date is None:
+                author_stats.last_post_date = row['latest']
+    for model_name in ('Comment', 'ArchivedComment'):
+        comments = apps.get_model('blog', model_name).objects.order_by(
+        ).values('post__author').annotate(total=models.Count('pk'))
+        for row in comments:
+            stats[row['post__author']].comment_count += row['total']
+    AuthorStats.objects.bulk_create(stats.values(), batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('blog', '0008_feedentry'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AuthorStats',
+            fields=[
+                ('author', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='stats', serialize=False, to='auth.user')),
+                ('post_count', models.PositiveIntegerField(default=0)),
+                ('published_post_count', models.PositiveIntegerField(default=0)),
+                ('archived_post_count', models.PositiveIntegerField(default=0)),
+                ('archived_published_post_count', models.PositiveIntegerField(default=0)),
+                ('comment_count', models.PositiveIntegerField(default=0)),
+                ('last_post_date', models.DateTimeField(null=True)),
+            ],
+            options={
+                'verbose_name': 'статистика автора',
+                'verbose_name_plural': 'статистика авторов',
+            },
+        ),
+        migrations.RunPython(fill_stats, migrations.RunPython.noop),
+    ]
@@ -112,6 +112,7 @@ class Post(CreatedAtModel):
     """
 
     objects = PostManager()
+    is_archived = False
     title = models.CharField(
         max_length=256,
         verbose_name='Заголовок'
@@ -190,3 +191,194 @@ class Comment(models.Model):
             self.text,
             max_words=MAX_WORDS_FOR_TEXT
         )
+
+
+class ArchivedPost(models.Model):
+    """
+    Stores a post moved out of :model:'blog.Post' by blog.archive
+    with the id, the dates and the relations it had.
+    """
+
+    objects = PostManager()
+    is_archived = True
+    id = models.BigIntegerField(primary_key=True)
+    title = models.CharField(max_length=256, verbose_name='Заголовок')
+    text = models.TextField(verbose_name='Текст')
+    pub_date = models.DateTimeField(
+        verbose_name='Дата и время публикации'
+    )
+    author = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        verbose_name='Автор публикации',
+        related_name='archived_posts'
+    )
+    location = models.ForeignKey(
+        Location,
+        on_delete=models.SET_NULL,
+        null=True,
+        verbose_name='Местоположение',
+        related_name='archived_posts'
+    )
+    category = models.ForeignKey(
+        Category,
+        on_delete=models.SET_NULL,
+        null=True,
+        verbose_name='Категория',
+        related_name='archived_posts'
+    )
+    image = models.ImageField(
+        verbose_name='Фото', upload_to='posts_images/', blank=True
+    )
+    is_published = models.BooleanField(verbose_name='Опубликовано')
+    created_at = models.DateTimeField(verbose_name='Добавлено')
+    archived_at = models.DateTimeField(
+        auto_now_add=True, verbose_name='Перенесено в архив'
+    )
+
+    class Meta:
+        verbose_name = 'архивная публикация'
+        verbose_name_plural = 'Архив публикаций'
+        ordering = ('-pub_date',)
+
+    def __str__(self):
+        return get_short_string(self.title, max_words=MAX_WORDS_FOR_TITLE)
+
+
+class ArchivedComment(models.Model):
+    """
+    Stores a comment of an archived post,
+    related to :model:'blog.ArchivedPost' and :model:'auth.User'.
+    """
+
+    id = models.BigIntegerField(primary_key=True)
+    text = models.TextField(verbose_name='Текст комментария')
+    post = models.ForeignKey(
+        ArchivedPost,
+        on_delete=models.CASCADE,
+        related_name='comments',
+    )
+    created_at = models.DateTimeField()
+    author = models.ForeignKey(
+        User, on_delete=models.CASCADE, related_name='archived_comments'
+    )
+
+    class Meta:
+        verbose_name = 'архивный комментарий'
+        verbose_name_plural = 'архивные комментарии'
+        ordering = ('created_at',)
+
+    def __str__(self):
+        return get_short_string(
+            self.text,
+            max_words=MAX_WORDS_FOR_TEXT
+        )
+
+
+class FeedEntry(models.Model):
+    """
+    Stores the card of a visible post (published, in a published
+    category) with the fields of its relations, maintained by
+    blog.feed, so the feed pages read a single table.
+    Posts published in the future are stored as well, the feed shows
+    them once their pub_date has come.
+    """
+
+    post = models.OneToOneField(
+        Post,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name='feed_entry'
+    )
+    pub_date = models.DateTimeField()
+    title = models.CharField(max_length=256)
+    excerpt = models.TextField()
+    image = models.CharField(max_length=100, blank=True)
+    author = models.ForeignKey(
+        User, on_delete=models.CASCADE, related_name='+'
+    )
+    author_username = models.CharField(max_length=150)
+    category = models.ForeignKey(
+        Category, on_delete=models.CASCADE, related_name='+',
+        db_index=False
+    )
+    category_slug = models.SlugField(db_index=False)
+    category_title = models.CharField(max_length=256)
+    location = models.ForeignKey(
+        Location, on_delete=models.SET_NULL, null=True, related_name='+'
+    )
+    # None if the location is not published.
+    location_name = models.CharField(max_length=256, null=True)
+    comment_count = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        verbose_name = 'запись ленты'
+        verbose_name_plural = 'лента'
+        ordering = ('-pub_date',)
+        indexes = (
+            models.Index(fields=('-pub_date',), name='feed_pub_date_idx'),
+            models.Index(
+                fields=('category', '-pub_date'), name='feed_category_idx'
+            ),
+        )
+
+    def __str__(self):
+        return get_short_string(self.title, max_words=MAX_WORDS_FOR_TITLE)
+
+    def as_post(self) -> Post:
+        """Returns the post of the card with its relations, no query."""
+
+        post = Post(
+            id=self.post_id,
+            title=self.title,
+            text=self.excerpt,
+            pub_date=self.pub_date,
+            image=self.image,
+            is_published=True,
+            author=User(id=self.author_id, username=self.author_username),
+            category=Category(
+                id=self.category_id,
+                slug=self.category_slug,
+                title=self.category_title,
+                is_published=True
+            ),
+            location=Location(
+                id=self.location_id,
+                name=self.location_name or '',
+                is_published=self.location_name is not None
+            ) if self.location_id else None,
+        )
+        post.comment_count = self.comment_count
+        post._state.adding = False
+        post._state.db = self._state.db
+        return post
+
+
+class AuthorStats(models.Model):
+    """
+    Stores the counts of the posts of an author and of the comments
+    to them, live and archived, maintained by blog.stats, so profile
+    pages show them and page through the posts without counting.
+    """
+
+    author = models.OneToOneField(
+        User,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name='stats'
+    )
+    post_count = models.PositiveIntegerField(default=0)
+    # Published posts of published categories, scheduled ones included.
+    published_post_count = models.PositiveIntegerField(default=0)
+    archived_post_count = models.PositiveIntegerField(default=0)
+    archived_published_post_count = models.PositiveIntegerField(default=0)
+    comment_count = models.PositiveIntegerField(default=0)
+    # pub_date of the latest published post, may be in the future.
+    last_post_date = models.DateTimeField(null=True)
+
+    class Meta:
+        verbose_name = 'статистика автора'
+        verbose_name_plural = 'статистика авторов'
+
+    def __str__(self):
+        return str(self.author_id)
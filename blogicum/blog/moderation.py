@@ -0,0 +1,108 @@
+from contextvars import ContextVar
+
+from blog.models import Post
+from blog.signals import posts_batch_deleted, posts_bulk_changed
+
+BATCH_SIZE = 1000
+
+# Ids of the posts being deleted. The post_delete receivers of their
+# cascaded comments skip the per-row counters, the counters are
+# recounted once for the post or the batch.
+deleting_posts = ContextVar('deleting_posts', default=frozenset())
+
+PUBLISH = 'publish'
+
+UNPUBLISH = 'unpublish'
+
+MOVE = 'move'
+
+DELETE = 'delete'
+
+
+def batched_pks(queryset, batch_size: int = BATCH_SIZE):
+    """
+    Takes in a QuerySet and int optional argument batch_size,
+    yields lists of primary keys of the queryset, batch_size or less each.
+    """
+
+    pks = queryset.order_by('pk').values_list('pk', flat=True)
+    last_pk = None
+    while True:
+        page = pks if last_pk is None else pks.filter(pk__gt=last_pk)
+        batch = list(page[:batch_size])
+        if not batch:
+            return
+        yield batch
+        last_pk = batch[-1]
+
+
+def _bulk_update(queryset, action, batch_size, **values):
+    """
+    Runs a single UPDATE per batch of posts of the queryset,
+    sends posts_bulk_changed once when all batches are done,
+    returns the number of updated posts.
+    """
+
+    changed = []
+    for batch in batched_pks(queryset, batch_size):
+        Post.objects.filter(pk__in=batch).update(**values)
+        changed.extend(batch)
+    if changed:
+        posts_bulk_changed.send(sender=Post, pks=changed, action=action)
+    return len(changed)
+
+
+def publish_posts(queryset, batch_size: int = BATCH_SIZE) -> int:
+    """Publishes all posts of the queryset."""
+
+    return _bulk_update(queryset, PUBLISH, batch_size, is_published=True)
+
+
+def unpublish_posts(queryset, batch_size: int = BATCH_SIZE) -> int:
+    """Hides all posts of the queryset."""
+
+    return _bulk_update(queryset, UNPUBLISH, batch_size, is_published=False)
+
+
+def move_posts(queryset, category, batch_size: int = BATCH_SIZE) -> int:
+    """Moves all posts of the queryset to the category."""
+
+    return _bulk_update(queryset, MOVE, batch_size, category=category)
+
+
+def is_deleting(post_id) -> bool:
+    return post_id in deleting_posts.get()
+
+
+def delete_batch(pks):
+    """
+    Deletes the posts with the pks and their comments, then sends
+    posts_batch_deleted with the ids of their authors, so receivers
+    recount once instead of once per deleted row.
+    """
+
+    posts = Post.objects.filter(pk__in=pks)
+    author_ids = set(
+        posts.order_by().values_list('author_id', flat=True)
+    )
+    token = deleting_posts.set(deleting_posts.get() | set(pks))
+    try:
+        posts.delete()
+    finally:
+        deleting_posts.reset(token)
+    posts_batch_deleted.send(sender=Post, pks=list(pks), author_ids=author_ids)
+
+
+def delete_posts(queryset, batch_size: int = BATCH_SIZE) -> int:
+    """
+    Deletes all posts of the queryset together with their comments,
+    batch by batch, returns the number of deleted posts.
+    """
+
+    deleted = []
+    for batch in batched_pks(queryset, batch_size):
+        delete_batch(batch)
+        deleted.extend(batch)
+    if deleted:
+        posts_bulk_changed.send(sender=Post, pks=deleted, action=DELETE)
+    return len(deleted)
@@ -0,0 +1,32 @@
+from django.conf import settings
+from django.core.cache import caches
+
+POST = 'post'
+
+
+def get_cache():
+    return caches[settings.NEGATIVE_CACHE_ALIAS]
+
+
+def get_key(kind: str, value) -> str:
+    return f'missing:{kind}:{value}'
+
+
+def is_missing(kind: str, value) -> bool:
+    """Returns True if the lookup recently found nothing."""
+
+    return bool(get_cache().get(get_key(kind, value)))
+
+
+def remember_missing(kind: str, value):
+    """Records a lookup that found nothing for NEGATIVE_CACHE_TIMEOUT."""
+
+    get_cache().set(
+        get_key(kind, value), True, settings.NEGATIVE_CACHE_TIMEOUT
+    )
+
+
+def forget_missing(kind: str, values):
+    """Drops the records of the values, e.g. after they were created."""
+
+    get_cache().delete_many([get_key(kind, value) for value in values])
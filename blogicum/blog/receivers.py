@@ -0,0 +1,264 @@
+from django.contrib.auth import get_user_model
+from django.db.models.signals import (
+    post_delete, post_save, pre_delete, pre_save
+)
+from django.dispatch import receiver
+
+from blogicum import edge
+from blogicum.auth import forget_user
+
+from . import (
+    feed, membership, moderation, negative_cache, stats, visibility
+)
+from .models import Category, Comment, FeedEntry, Location, Post
+from .archive import ARCHIVE
+from .importer import IMPORT
+from .signals import (
+    comments_bulk_created, posts_batch_deleted, posts_bulk_changed
+)
+from .surrogate import AUTHOR, CATEGORY, LOCATION, POST, get_post_keys
+
+User = get_user_model()
+
+DELETED_ALONE = '_deleted_alone'
+
+
+@receiver(post_save, sender=Post)
+def forget_missing_post(sender, instance, created, **kwargs):
+    """A created post must not be answered from the negative cache."""
+
+    if created:
+        negative_cache.forget_missing(negative_cache.POST, [instance.pk])
+        # New ids are above the bitmaps of the other processes.
+        membership.added(membership.POST, [instance.pk], shared=False)
+
+
+@receiver(posts_bulk_changed, sender=Post)
+def forget_missing_posts(sender, pks, action, **kwargs):
+    negative_cache.forget_missing(negative_cache.POST, pks)
+    if action in (IMPORT, ARCHIVE):
+        # Imported posts may keep ids below the bitmaps of other processes,
+        # archived posts were removed from them with their live rows.
+        membership.added(membership.POST, pks)
+
+
+@receiver(post_delete, sender=Post)
+def remove_post(sender, instance, **kwargs):
+    membership.removed(membership.POST, [instance.pk])
+
+
+@receiver(post_save, sender=Category)
+def add_category(sender, instance, **kwargs):
+    membership.added(membership.CATEGORY, [instance.slug])
+
+
+@receiver(post_delete, sender=Category)
+def remove_category(sender, instance, **kwargs):
+    membership.removed(membership.CATEGORY, [instance.slug])
+
+
+@receiver(pre_save, sender=User)
+def remember_username(sender, instance, update_fields=None, raw=False,
+                      **kwargs):
+    # Saves of other fields, e.g. last_login on every login, keep it.
+    instance._saved_username = None
+    if raw or instance._state.adding or (
+        update_fields and User.USERNAME_FIELD not in update_fields
+    ):
+        return
+    instance._saved_username = User.objects.filter(
+        pk=instance.pk
+    ).values_list(User.USERNAME_FIELD, flat=True).first()
+
+
+@receiver(post_save, sender=User)
+def add_user(sender, instance, created, **kwargs):
+    forget_user(instance.pk)
+    saved_username = getattr(instance, '_saved_username', None)
+    if created or (
+        saved_username and saved_username != instance.get_username()
+    ):
+        # Other processes rebuild their filters only for new usernames.
+        membership.added(membership.USER, [instance.get_username()])
+        if saved_username:
+            membership.removed(membership.USER, [saved_username])
+
+
+@receiver(post_delete, sender=User)
+def remove_user(sender, instance, **kwargs):
+    membership.removed(membership.USER, [instance.get_username()])
+    forget_user(instance.pk)
+
+
+@receiver(post_save, sender=Post)
+@receiver(post_delete, sender=Post)
+def purge_post(sender, instance, **kwargs):
+    edge.purge([edge.FEED, *get_post_keys(instance)])
+
+
+@receiver(posts_bulk_changed, sender=Post)
+def purge_posts(sender, pks, **kwargs):
+    # Categories and authors of the posts are unknown here.
+    edge.purge([edge.LISTS, *(edge.get_key(POST, pk) for pk in pks)])
+
+
+@receiver(post_save, sender=Comment)
+@receiver(post_delete, sender=Comment)
+def purge_comment_post(sender, instance, **kwargs):
+    edge.purge([edge.get_key(POST, instance.post_id)])
+
+
+@receiver(comments_bulk_created, sender=Comment)
+def purge_comment_posts(sender, post_ids, **kwargs):
+    edge.purge(edge.get_key(POST, pk) for pk in post_ids)
+
+
+@receiver(post_save, sender=Category)
+@receiver(post_delete, sender=Category)
+def purge_category(sender, instance, **kwargs):
+    # Publishing a category changes every list of posts.
+    edge.purge([edge.LISTS, edge.get_key(CATEGORY, instance.pk)])
+
+
+@receiver(post_save, sender=Location)
+@receiver(post_delete, sender=Location)
+def purge_location(sender, instance, **kwargs):
+    edge.purge([edge.get_key(LOCATION, instance.pk)])
+
+
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+def purge_author(sender, instance, update_fields=None, **kwargs):
+    if update_fields and set(update_fields) == {'last_login'}:
+        return
+    edge.purge([edge.get_key(AUTHOR, instance.pk)])
+
+
+@receiver(post_save, sender=Post)
+def refresh_feed_entry(sender, instance, **kwargs):
+    feed.refresh_posts([instance.pk])
+
+
+@receiver(posts_bulk_changed, sender=Post)
+def refresh_feed_entries(sender, pks, **kwargs):
+    feed.refresh_posts(pks)
+
+
+@receiver(pre_delete, sender=Post)
+def mark_deleted_post(sender, instance, **kwargs):
+    # A post deleted on its own or by a cascade, not by delete_batch.
+    if not moderation.is_deleting(instance.pk):
+        setattr(instance, DELETED_ALONE, True)
+        moderation.deleting_posts.set(
+            moderation.deleting_posts.get() | {instance.pk}
+        )
+
+
+@receiver(post_delete, sender=Post)
+def unmark_deleted_post(sender, instance, **kwargs):
+    if getattr(instance, DELETED_ALONE, False):
+        moderation.deleting_posts.set(
+            moderation.deleting_posts.get() - {instance.pk}
+        )
+
+
+@receiver(post_save, sender=Comment)
+def count_feed_comment(sender, instance, created, **kwargs):
+    if created:
+        feed.add_comments(instance.post_id, 1)
+
+
+@receiver(post_delete, sender=Comment)
+def uncount_feed_comment(sender, instance, **kwargs):
+    # The entry of a deleted post is deleted with it.
+    if not moderation.is_deleting(instance.post_id):
+        feed.add_comments(instance.post_id, -1)
+
+
+@receiver(comments_bulk_created, sender=Comment)
+def recount_feed_comments(sender, post_ids, **kwargs):
+    feed.recount_comments(post_ids)
+
+
+@receiver(pre_save, sender=Category)
+@receiver(pre_save, sender=Location)
+def remember_visibility(sender, instance, raw=False, **kwargs):
+    if not raw:
+        visibility.remember_state(sender, instance)
+
+
+@receiver(post_save, sender=Category)
+@receiver(post_save, sender=Location)
+def propagate_visibility(sender, instance, raw=False, **kwargs):
+    # Posts are refreshed only when the fields they show changed.
+    if raw:
+        return
+    fields = visibility.get_changed_fields(sender, instance)
+    if fields:
+        visibility.schedule(sender, instance.pk, fields)
+
+
+@receiver(pre_delete, sender=Location)
+def remove_location_feed(sender, instance, **kwargs):
+    # SET_NULL has cleared location_id by the time of post_delete.
+    FeedEntry.objects.filter(location=instance).update(location_name=None)
+
+
+@receiver(post_save, sender=User)
+def rename_feed_author(sender, instance, created, update_fields=None,
+                       **kwargs):
+    if update_fields and set(update_fields) == {'last_login'}:
+        return
+    if not created:
+        FeedEntry.objects.filter(author=instance).update(
+            author_username=instance.get_username()
+        )
+
+
+@receiver(pre_save, sender=Post)
+def remember_author_stats(sender, instance, raw=False, **kwargs):
+    if not raw:
+        stats.remember_state(instance)
+
+
+@receiver(post_save, sender=Post)
+def count_author_post(sender, instance, created, raw=False, **kwargs):
+    if not raw:
+        stats.post_saved(instance, created)
+
+
+@receiver(post_delete, sender=Post)
+def uncount_author_post(sender, instance, **kwargs):
+    # Posts deleted by delete_batch are recounted with their batch.
+    if getattr(instance, DELETED_ALONE, False):
+        # The author may be being deleted, their stats are not created.
+        stats.recount([instance.author_id], create=False)
+
+
+@receiver(posts_batch_deleted, sender=Post)
+def uncount_authors_posts(sender, author_ids, **kwargs):
+    stats.recount(author_ids, create=False)
+
+
+@receiver(posts_bulk_changed, sender=Post)
+def recount_authors_stats(sender, pks, **kwargs):
+    # Deleted and archived posts were recounted by posts_batch_deleted.
+    stats.recount_posts(pks)
+
+
+@receiver(post_save, sender=Comment)
+def count_author_comment(sender, instance, created, **kwargs):
+    if created:
+        stats.add_comments(instance.post_id, 1)
+
+
+@receiver(post_delete, sender=Comment)
+def uncount_author_comment(sender, instance, **kwargs):
+    # Comments deleted with their post are recounted with the post.
+    if not moderation.is_deleting(instance.post_id):
+        stats.add_comments(instance.post_id, -1)
+
+
+@receiver(comments_bulk_created, sender=Comment)
+def recount_commented_authors(sender, post_ids, **kwargs):
+    stats.recount_posts(post_ids)
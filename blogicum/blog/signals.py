@@ -0,0 +1,19 @@
+from django.dispatch import Signal
+
+# Sent once after a bulk operation on posts (moderation, import,
+# archiving), instead of the per-object post_save/post_delete signals,
+# and for every batch of posts of a category or location whose
+# visibility changed (blog.visibility).
+# Receivers get the keyword arguments pks (list of affected post ids)
+# and action (str).
+posts_bulk_changed = Signal()
+
+# Sent after queued comments are created with bulk_create, see
+# blog.comment_buffer. Receivers get post_ids (list of commented posts).
+comments_bulk_created = Signal()
+
+# Sent after every batch of posts deleted by blog.moderation.delete_batch
+# (moderation, archiving), whose rows skipped their per-row counters.
+# Receivers get pks (list of deleted post ids) and author_ids (set of
+# the ids of their authors).
+posts_batch_deleted = Signal()
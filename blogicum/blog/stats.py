@@ -0,0 +1,218 @@
+from django.db.models import F, Func, OuterRef, Q, Subquery, Value
+from django.db.models.functions import Coalesce, Greatest
+from django.utils import timezone
+
+from blog.models import (
+    ArchivedComment, ArchivedPost, AuthorStats, Category, Comment, Post
+)
+from blog.utils import count_of
+
+BATCH_SIZE = 500
+
+# Posts shown on the profile to other users, once their pub_date comes.
+PUBLISHED = Q(is_published=True, category__is_published=True)
+
+STATE_ATTRIBUTE = '_stats_state'
+
+
+def latest_of(queryset):
+    """Subquery of the latest pub_date of the queryset of the author."""
+
+    return Subquery(queryset.values(latest=Func('pub_date', function='MAX')))
+
+
+def get_last_post_date():
+    """Expression recounting AuthorStats.last_post_date in place."""
+
+    return Coalesce(
+        latest_of(Post.objects.filter(PUBLISHED, author=OuterRef('author'))),
+        latest_of(
+            ArchivedPost.objects.filter(PUBLISHED, author=OuterRef('author'))
+        )
+    )
+
+
+def get_stats_values() -> dict:
+    """Expressions recounting every field of AuthorStats in place."""
+
+    posts = Post.objects.filter(author=OuterRef('author'))
+    archived = ArchivedPost.objects.filter(author=OuterRef('author'))
+    return {
+        'post_count': count_of(posts),
+        'published_post_count': count_of(posts.filter(PUBLISHED)),
+        'archived_post_count': count_of(archived),
+        'archived_published_post_count': count_of(archived.filter(PUBLISHED)),
+        'comment_count': (
+            count_of(Comment.objects.filter(post__author=OuterRef('author')))
+            + count_of(ArchivedComment.objects.filter(
+                post__author=OuterRef('author')
+            ))
+        ),
+        'last_post_date': get_last_post_date(),
+    }
+
+
+def recount(author_ids, create: bool = True):
+    """
+    Recounts the stats of the authors with one UPDATE per batch,
+    if create is true creates the missing ones when the UPDATE found
+    less rows and recounts them.
+    """
+
+    author_ids = sorted(set(author_ids))
+    for start in range(0, len(author_ids), BATCH_SIZE):
+        batch = author_ids[start:start + BATCH_SIZE]
+        stats = AuthorStats.objects.filter(author_id__in=batch)
+        updated = stats.update(**get_stats_values())
+        if create and updated < len(batch):
+            AuthorStats.objects.bulk_create(
+                [AuthorStats(author_id=author_id) for author_id in batch],
+                ignore_conflicts=True
+            )
+            stats.update(**get_stats_values())
+
+
+def is_published(post) -> bool:
+    """Whether the post counts as published, see PUBLISHED."""
+
+    if not post.is_published:
+        return False
+    if Post.category.is_cached(post):
+        return post.category is not None and post.category.is_published
+    return Category.objects.filter(
+        pk=post.category_id, is_published=True
+    ).exists()
+
+
+def remember_state(post):
+    """
+    Stores (author id, published, pub_date) of the post as it is
+    in the database, before the post is saved.
+    """
+
+    state = None
+    if not post._state.adding and post.pk is not None:
+        row = Post.objects.filter(pk=post.pk).order_by().values_list(
+            'author_id', 'is_published', 'category__is_published', 'pub_date'
+        ).first()
+        if row is not None:
+            author_id, published, category_published, pub_date = row
+            state = (author_id, bool(published and category_published),
+                     pub_date)
+    setattr(post, STATE_ATTRIBUTE, state)
+
+
+def add_posts(author_id, posts: int = 0, published: int = 0,
+              pub_date=None, recount_last: bool = False):
+    """
+    Adds the numbers of posts to the stats of the author in one UPDATE,
+    moves last_post_date to the pub_date of a published post, recounts
+    it if the latest post may have left. Stats of an author without
+    them are recounted.
+    """
+
+    values = {
+        'post_count': Greatest(F('post_count') + posts, 0),
+        'published_post_count': Greatest(
+            F('published_post_count') + published, 0
+        ),
+    }
+    if recount_last:
+        values['last_post_date'] = get_last_post_date()
+    elif pub_date is not None:
+        values['last_post_date'] = Greatest(
+            Coalesce(F('last_post_date'), Value(pub_date)), Value(pub_date)
+        )
+    if not AuthorStats.objects.filter(author_id=author_id).update(**values):
+        recount([author_id])
+
+
+def post_saved(post, created: bool):
+    """
+    Applies the change of the saved post to the stats of its author,
+    compared to the state remember_state stored, without a query
+    if the counted fields did not change.
+    """
+
+    old = getattr(post, STATE_ATTRIBUTE, None)
+    published = is_published(post)
+    if created or old is None:
+        add_posts(
+            post.author_id, 1, int(published),
+            post.pub_date if published else None
+        )
+        return
+    old_author_id, old_published, old_pub_date = old
+    if old_author_id != post.author_id:
+        recount([old_author_id, post.author_id])
+        return
+    # The latest post may have been this one.
+    recount_last = old_published and (
+        not published or post.pub_date < old_pub_date
+    )
+    if published != old_published or recount_last or (
+        published and post.pub_date != old_pub_date
+    ):
+        add_posts(
+            post.author_id, 0, int(published) - int(old_published),
+            post.pub_date if published else None, recount_last
+        )
+
+
+def recount_posts(pks):
+    """Recounts the stats of the authors of the live posts with the pks."""
+
+    pks = list(pks)
+    author_ids = set()
+    for start in range(0, len(pks), BATCH_SIZE):
+        author_ids.update(
+            Post.objects.filter(
+                pk__in=pks[start:start + BATCH_SIZE]
+            ).values_list('author_id', flat=True)
+        )
+    recount(author_ids)
+
+
+def rebuild() -> int:
+    """Recounts the stats of all authors, returns their number."""
+
+    AuthorStats.objects.all().delete()
+    recount(
+        [*Post.objects.values_list('author_id', flat=True).distinct(),
+         *ArchivedPost.objects.values_list('author_id', flat=True).distinct()]
+    )
+    return AuthorStats.objects.count()
+
+
+def add_comments(post_id, count: int):
+    AuthorStats.objects.filter(
+        author_id=Subquery(
+            Post.objects.filter(pk=post_id).values('author_id')
+        )
+    ).update(comment_count=Greatest(F('comment_count') + count, 0))
+
+
+def get_stats(author) -> AuthorStats:
+    """
+    Returns the stats of the author fetched with select_related('stats'),
+    empty ones if the author has no posts.
+    """
+
+    try:
+        return author.stats
+    except AuthorStats.DoesNotExist:
+        return AuthorStats(author=author)
+
+
+def get_post_counts(stats, all_posts: bool):
+    """
+    Returns (live, archived) numbers of the posts of the profile,
+    all of them or the published ones, None if they are not known:
+    a scheduled post is counted as published before its pub_date.
+    """
+
+    if all_posts:
+        return stats.post_count, stats.archived_post_count
+    if stats.last_post_date and stats.last_post_date > timezone.now():
+        return None
+    return stats.published_post_count, stats.archived_published_post_count
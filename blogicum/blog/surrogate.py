@@ -0,0 +1,25 @@
+from blogicum.edge import get_key
+
+POST = 'post'
+
+CATEGORY = 'category'
+
+AUTHOR = 'author'
+
+LOCATION = 'location'
+
+
+def get_post_keys(post):
+    """
+    Returns the surrogate keys of a post card or page: the post,
+    its category, author and location.
+    """
+
+    keys = [
+        get_key(POST, post.pk),
+        get_key(CATEGORY, post.category_id),
+        get_key(AUTHOR, post.author_id),
+    ]
+    if post.location_id:
+        keys.append(get_key(LOCATION, post.location_id))
+    return keys
@@ -1,14 +1,16 @@
 from django.urls import path
 
+from blogicum.gateway import as_view
+
 from . import views
 
 app_name = 'blog'
 
 urlpatterns = [
-    path('', views.HomepageListView.as_view(), name='index'),
+    path('', as_view(views.HomepageListView), name='index'),
     path(
         'category/<slug:category_slug>/',
-        views.CategoryListView.as_view(),
+        as_view(views.CategoryListView),
         name='category_posts'
     ),
     path(
@@ -18,7 +20,7 @@ urlpatterns = [
     ),
     path(
         'profile/<slug:username>/',
-        views.ProfileListView.as_view(),
+        as_view(views.ProfileListView),
         name='profile'
     ),
     path(
@@ -28,7 +30,7 @@ urlpatterns = [
     ),
     path(
         'posts/<int:post_pk>/',
-        views.PostDetailView.as_view(),
+        as_view(views.PostDetailView),
         name='post_detail'
     ),
     path(
@@ -56,4 +58,9 @@ urlpatterns = [
         views.CommentDeleteView.as_view(),
         name='delete_comment'
     ),
+    path(
+        'export/<slug:model_name>/',
+        views.ExportView.as_view(),
+        name='export'
+    ),
 ]
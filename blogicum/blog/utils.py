@@ -1,3 +1,7 @@
+from django.db.models import Func, Subquery
+from django.db.models.functions import Coalesce
+
+
 def get_short_string(full_string: str, max_words: int = 5) -> str:
     """
     Takes in a string full_string and int optional argument max_words,
@@ -9,3 +13,14 @@ def get_short_string(full_string: str, max_words: int = 5) -> str:
     if len(string_words) > max_words:
         return ' '.join(string_words[:max_words])
     return full_string
+
+
+def count_of(queryset, field: str = 'pk'):
+    """
+    Returns a subquery counting the rows of the queryset, which is
+    filtered by an OuterRef to the counting row, 0 if there are none.
+    """
+
+    return Coalesce(
+        Subquery(queryset.values(count=Func(field, function='COUNT'))), 0
+    )
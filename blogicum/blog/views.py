@@ -1,14 +1,24 @@
+from django.conf import settings
 from django.shortcuts import get_object_or_404, redirect
 from django.contrib.auth import get_user_model
-from django.contrib.auth.mixins import LoginRequiredMixin
+from django.contrib.auth.mixins import LoginRequiredMixin, UserPassesTestMixin
 from django.urls import reverse
-from django.http import Http404
+from django.utils import timezone
+from django.db.models import OuterRef
+from django.http import Http404, StreamingHttpResponse
 from django.views.generic import (
-    CreateView, DetailView, ListView, UpdateView, DeleteView
+    CreateView, DetailView, ListView, UpdateView, DeleteView, View
 )
 
-from .models import Post, Category, Comment
+from blogicum import edge, routers
+
+from . import (
+    archive, comment_buffer, export, feed, membership, negative_cache, stats
+)
+from .surrogate import AUTHOR, CATEGORY, get_post_keys
+from .models import ArchivedComment, ArchivedPost, Category, Comment, Post
 from .forms import PostForm, CommentForm, UserUpdateForm
+from .utils import count_of
 
 
 User = get_user_model()
@@ -80,32 +90,128 @@ class PostDispatchMixin:
         redirect to the post page.
         """
 
-        post = get_object_or_404(Post, pk=kwargs['post_pk'])
-        if post.author != self.request.user:
+        self.post_object = get_object_or_404(Post, pk=kwargs['post_pk'])
+        if self.post_object.author_id != self.request.user.pk:
             return redirect('blog:post_detail', post_pk=kwargs['post_pk'])
         return super().dispatch(request, *args, **kwargs)
 
+    def get_object(self, queryset=None):
+        """Returns the post fetched in dispatch."""
+
+        return self.post_object
+
+
+class ReplicaReadMixin:
+    """
+    Mixin that lets the view read from the read replicas on
+    GET requests, see blogicum.middleware.ReplicaRoutingMiddleware.
+    """
+
+    replica_reads = True
+
+
+class MembershipMixin:
+    """
+    Mixin that raises 404 error without a query if the URL kwargs
+    of membership_kwargs name an object that does not exist.
+    """
+
+    membership_kwargs = {}
+
+    def dispatch(self, request, *args, **kwargs):
+        for kwarg, kind in self.membership_kwargs.items():
+            if not membership.may_exist(kind, kwargs[kwarg]):
+                raise Http404
+        return super().dispatch(request, *args, **kwargs)
+
+
+class EdgeCacheMixin:
+    """
+    Mixin that lets shared caches store the page for anonymous
+    requests, with the surrogate keys of the posts of the page
+    and of the keys returned by get_list_keys.
+    """
+
+    def get_list_keys(self, context):
+        return [edge.LISTS]
+
+    def get_surrogate_keys(self, context):
+        keys = self.get_list_keys(context)
+        for post in context.get('page_obj') or ():
+            keys.extend(get_post_keys(post))
+        return keys
+
+    def render_to_response(self, context, **response_kwargs):
+        response = super().render_to_response(context, **response_kwargs)
+        return edge.patch_edge_cache(
+            self.request, response, self.get_surrogate_keys(context)
+        )
+
+
+def count_comments(queryset, comment_model=Comment):
+    """
+    Annotates the posts of the queryset with comment_count,
+    a subquery evaluated for the fetched rows only.
+    """
+
+    return queryset.annotate(comment_count=count_of(
+        comment_model.objects.filter(post=OuterRef('pk'))
+    ))
+
 
 class PaginateMixin:
-    """Mixin that adds model and paginate_by"""
+    """Mixin that adds model, paginate_by and comment counts of a page."""
 
     model = Post
     paginate_by = POSTS_PER_PAGE
 
+    def paginate_queryset(self, queryset, page_size):
+        """Counts comments of the page posts in the page query."""
+
+        return super().paginate_queryset(
+            self.with_comment_counts(queryset), page_size
+        )
+
+    def with_comment_counts(self, queryset):
+        return count_comments(queryset)
+
+
+class FeedMixin:
+    """
+    Mixin that pages through the cards of the feed table,
+    see blog.feed, instead of joining posts with their relations.
+    """
 
-class HomepageListView(PaginateMixin, ListView):
+    def get_queryset(self):
+        return feed.get_entries()
+
+    def with_comment_counts(self, queryset):
+        """The cards carry their comment counts."""
+
+        return feed.FeedPosts(queryset)
+
+
+class HomepageListView(
+    FeedMixin, EdgeCacheMixin, ReplicaReadMixin, PaginateMixin, ListView
+):
     """CBV that displays posts on 'index.html'."""
 
     template_name = 'blog/index.html'
-    queryset = Post.objects.get_published()
 
+    def get_list_keys(self, context):
+        return [edge.FEED, edge.LISTS]
 
-class CategoryListView(PaginateMixin, ListView):
+
+class CategoryListView(
+    MembershipMixin, FeedMixin, EdgeCacheMixin, ReplicaReadMixin,
+    PaginateMixin, ListView
+):
     """
     CBV that displays posts of a specific category on 'category.html'.
     """
 
     template_name = 'blog/category.html'
+    membership_kwargs = {'category_slug': membership.CATEGORY}
 
     def get_queryset(self):
         """
@@ -114,23 +220,21 @@ class CategoryListView(PaginateMixin, ListView):
         raise 404 error.
         """
 
-        category = get_object_or_404(
+        self.category = get_object_or_404(
             Category, slug=self.kwargs['category_slug'], is_published=True
         )
-        queryset = Post.objects.get_published().filter(
-            category=category
-        )
-        return queryset
+        return super().get_queryset().filter(category=self.category)
 
     def get_context_data(self, **kwargs):
         """Adds information about the category to the context."""
 
         context = super().get_context_data(**kwargs)
-        context['category'] = get_object_or_404(
-            Category, slug=self.kwargs['category_slug']
-        )
+        context['category'] = self.category
         return context
 
+    def get_list_keys(self, context):
+        return [edge.LISTS, edge.get_key(CATEGORY, context['category'].pk)]
+
 
 class ProfileUpdateView(LoginRequiredMixin, UpdateView):
     """
@@ -155,12 +259,16 @@ class ProfileUpdateView(LoginRequiredMixin, UpdateView):
         return reverse('blog:profile', kwargs={'username': self.request.user})
 
 
-class ProfileListView(PaginateMixin, ListView):
+class ProfileListView(
+    MembershipMixin, EdgeCacheMixin, ReplicaReadMixin, PaginateMixin,
+    ListView
+):
     """
     CBV that displays posts of a specific author on 'profile.html'.
     """
 
     template_name = 'blog/profile.html'
+    membership_kwargs = {'username': membership.USER}
 
     def get_queryset(self):
         """
@@ -171,7 +279,12 @@ class ProfileListView(PaginateMixin, ListView):
         raise 404 error.
         """
 
-        author = get_object_or_404(User, username=self.kwargs['username'])
+        author = get_object_or_404(
+            User.objects.select_related('stats'),
+            username=self.kwargs['username']
+        )
+        self.author = author
+        self.stats = stats.get_stats(author)
         if self.request.user == author:
             queryset = Post.objects.select_related(
                 'author', 'category', 'location'
@@ -185,14 +298,44 @@ class ProfileListView(PaginateMixin, ListView):
         return queryset
 
     def get_context_data(self, **kwargs):
-        """Adds information about the user to the context."""
+        """Adds information about the user and their stats to the context."""
 
         context = super().get_context_data(**kwargs)
-        context['profile'] = get_object_or_404(
-            User, username=self.kwargs['username']
-        )
+        context['profile'] = self.author
+        context['stats'] = self.stats
+        # A scheduled post is not shown before its pub_date.
+        if (
+            self.stats.last_post_date
+            and self.stats.last_post_date <= timezone.now()
+        ):
+            context['last_post_date'] = self.stats.last_post_date
         return context
 
+    def get_archived_queryset(self):
+        """Archived posts of the author, by the rules of get_queryset."""
+
+        if self.request.user == self.author:
+            queryset = ArchivedPost.objects.select_related(
+                'author', 'category', 'location'
+            )
+        else:
+            queryset = ArchivedPost.objects.get_published()
+        return queryset.filter(author=self.author)
+
+    def with_comment_counts(self, queryset):
+        """The posts of the author followed by the archived ones."""
+
+        return archive.LiveAndArchived(
+            super().with_comment_counts(queryset),
+            count_comments(self.get_archived_queryset(), ArchivedComment),
+            stats.get_post_counts(
+                self.stats, all_posts=self.request.user == self.author
+            )
+        )
+
+    def get_list_keys(self, context):
+        return [edge.LISTS, edge.get_key(AUTHOR, context['profile'].pk)]
+
 
 class PostCreateView(LoginRequiredMixin, CreateView):
     """
@@ -202,6 +345,7 @@ class PostCreateView(LoginRequiredMixin, CreateView):
     model = Post
     form_class = PostForm
     template_name = 'blog/create.html'
+    rate_limit_scope = 'post'
 
     def form_valid(self, form):
         """Adds the author to the form."""
@@ -218,7 +362,7 @@ class PostCreateView(LoginRequiredMixin, CreateView):
         return reverse('blog:profile', kwargs={'username': self.request.user})
 
 
-class PostDetailView(DetailView):
+class PostDetailView(EdgeCacheMixin, ReplicaReadMixin, DetailView):
     """
     CBV that displays correct post on 'detail.html'.
     """
@@ -226,30 +370,82 @@ class PostDetailView(DetailView):
     model = Post
     template_name = 'blog/detail.html'
     pk_url_kwarg = 'post_pk'
+    context_object_name = 'post'
 
     def dispatch(self, request, *args, **kwargs):
         """
-        Gets the correct post or raise 404 error,
-        if the post does not exist.
+        Gets the correct post, live or archived, or raise 404 error,
+        if the post does not exist,
+        ids that do not exist according to the membership filter or
+        that recently did not exist are answered without a query.
         If post author is not equal to the request user and
         post is not published raise 404 error.
         """
 
-        post = get_object_or_404(Post, pk=kwargs['post_pk'])
-        if post.is_published is False and request.user != post.author:
+        if not membership.may_exist(membership.POST, kwargs['post_pk']):
+            raise Http404
+        if negative_cache.is_missing(negative_cache.POST, kwargs['post_pk']):
+            raise Http404
+        self.post_object = self.find_post(kwargs['post_pk'])
+        if self.post_object is None and (
+            settings.REPLICA_DATABASES and routers.replica_reads.get()
+        ):
+            # A replica may lag behind: only a miss on the primary
+            # is remembered, or a new post would be 404 for the timeout.
+            self.post_object = self.find_post(
+                kwargs['post_pk'], routers.PRIMARY
+            )
+        if self.post_object is None:
+            negative_cache.remember_missing(
+                negative_cache.POST, kwargs['post_pk']
+            )
+            raise Http404
+        if (
+            self.post_object.is_published is False
+            and request.user.pk != self.post_object.author_id
+        ):
             raise Http404
         return super().dispatch(request, *args, **kwargs)
 
+    def get_post(self, model, pk, using=None):
+        return model.objects.using(using).select_related(
+            'author', 'category', 'location'
+        ).filter(pk=pk).first()
+
+    def find_post(self, pk, using=None):
+        """Returns the live or the archived post with the pk, or None."""
+
+        return (
+            self.get_post(Post, pk, using)
+            or self.get_post(ArchivedPost, pk, using)
+        )
+
+    def get_object(self, queryset=None):
+        """Returns the post fetched in dispatch."""
+
+        return self.post_object
+
     def get_context_data(self, **kwargs):
         """Adds the CommentForm and post comments to the context."""
 
         context = super().get_context_data(**kwargs)
         context['form'] = CommentForm()
-        context['comments'] = (
+        context['comments'] = comment_buffer.add_pending(
+            self.request, self.object,
             self.object.comments.select_related('author')
         )
         return context
 
+    def get_surrogate_keys(self, context):
+        """Keys of the post and of the authors of its comments."""
+
+        keys = get_post_keys(self.object)
+        keys.extend(
+            edge.get_key(AUTHOR, comment.author_id)
+            for comment in context['comments']
+        )
+        return keys
+
 
 class PostUpdateView(PostDispatchMixin, LoginRequiredMixin, UpdateView):
     """
@@ -274,8 +470,7 @@ class PostDeleteView(PostDispatchMixin, LoginRequiredMixin, DeleteView):
         """Adds the PostForm with instance to the context."""
 
         context = super().get_context_data(**kwargs)
-        instance = Post.objects.get(pk=self.kwargs['post_pk'])
-        context['form'] = PostForm(instance=instance)
+        context['form'] = PostForm(instance=self.object)
         return context
 
     def get_success_url(self):
@@ -290,16 +485,37 @@ class PostDeleteView(PostDispatchMixin, LoginRequiredMixin, DeleteView):
 class CommentCreateView(CommentMixin, LoginRequiredMixin, CreateView):
     """
     CBV that displays CommentForm on 'comment.html'.
+    With settings.COMMENT_BUFFER comments are queued and written in
+    batches, see blog.comment_buffer.
     """
 
+    rate_limit_scope = 'comment'
+
     def form_valid(self, form):
         """Adds the author and post to the form."""
 
+        if settings.COMMENT_BUFFER:
+            return self.enqueue(form)
         post = get_object_or_404(Post, pk=self.kwargs['post_pk'])
         form.instance.author = self.request.user
         form.instance.post = post
         return super().form_valid(form)
 
+    def enqueue(self, form):
+        """
+        Queues the comment without a query, posts that do not exist
+        according to the membership filter raise 404 error, the others
+        are checked when the comment is written.
+        """
+
+        post_pk = self.kwargs['post_pk']
+        if not membership.may_exist(membership.POST, post_pk):
+            raise Http404
+        form.instance.author = self.request.user
+        form.instance.post_id = post_pk
+        comment_buffer.enqueue(self.request, form.instance)
+        return redirect(self.get_success_url())
+
 
 class CommentDeleteView(
     CommentMixin, CommentDispatchMixin, LoginRequiredMixin, DeleteView
@@ -315,3 +531,41 @@ class CommentUpdateView(
     CBV that displays CommentForm with comment instance on 'comment.html'.
     """
     pass
+
+
+class ExportView(UserPassesTestMixin, View):
+    """
+    CBV that streams a table of the blog as CSV or JSONL to staff users.
+    Query parameters: format (csv or jsonl) and after (the last pk
+    of an interrupted export to resume from).
+    """
+
+    def test_func(self):
+        return self.request.user.is_staff
+
+    def get(self, request, *args, **kwargs):
+        """
+        Returns a StreamingHttpResponse with the rows of the model,
+        if the model or the format is unknown raise 404 error.
+        """
+
+        model = export.EXPORT_MODELS.get(kwargs['model_name'])
+        export_format = request.GET.get('format', export.CSV)
+        after = request.GET.get('after', '0')
+        if (
+            model is None or export_format not in export.FORMATS
+            or not after.isdigit()
+        ):
+            raise Http404
+        content_type = (
+            'text/csv' if export_format == export.CSV
+            else 'application/x-ndjson'
+        )
+        response = StreamingHttpResponse(
+            export.iter_lines(model, export_format, int(after)),
+            content_type=f'{content_type}; charset=utf-8'
+        )
+        response['Content-Disposition'] = (
+            f'attachment; filename="{kwargs["model_name"]}.{export_format}"'
+        )
+        return response
@@ -0,0 +1,99 @@
+from functools import partial
+
+from django.conf import settings
+from django.db import transaction
+
+from blog import stats
+from blog.models import ArchivedPost, Category, Location, Post
+from blog.moderation import batched_pks
+from blog.signals import posts_bulk_changed
+from blogicum import workers
+
+BATCH_SIZE = 500
+
+VISIBILITY = 'visibility'
+
+# Name of the background worker of the propagations.
+WORKER = 'visibility'
+
+# Fields of categories and locations that change how their posts
+# are shown, by the relation of Post to the model.
+TRACKED_FIELDS = {
+    Category: ('category', ('is_published', 'slug', 'title')),
+    Location: ('location', ('is_published', 'name')),
+}
+
+STATE_ATTRIBUTE = '_visibility_state'
+
+
+def remember_state(model, instance):
+    """
+    Stores the tracked fields of the instance as they are in the
+    database, before the instance is saved.
+    """
+
+    _, fields = TRACKED_FIELDS[model]
+    state = None
+    if not instance._state.adding and instance.pk is not None:
+        state = model.objects.filter(pk=instance.pk).values(*fields).first()
+    setattr(instance, STATE_ATTRIBUTE, state)
+
+
+def get_changed_fields(model, instance) -> set:
+    """
+    Returns the tracked fields the save changed,
+    nothing for a created instance, it has no posts yet.
+    """
+
+    _, fields = TRACKED_FIELDS[model]
+    state = getattr(instance, STATE_ATTRIBUTE, None)
+    if state is None:
+        return set()
+    return {
+        field for field in fields if state[field] != getattr(instance, field)
+    }
+
+
+def propagate(model, pk, batch_size: int = BATCH_SIZE, fields=()) -> int:
+    """
+    Sends posts_bulk_changed with the VISIBILITY action for every batch
+    of posts of the category or location, so the receivers rebuild the
+    data derived from them a batch at a time. If the publication
+    of a category changed, recounts the stats of the authors of its
+    archived posts too.
+    Returns the number of posts.
+    """
+
+    relation, _ = TRACKED_FIELDS[model]
+    count = 0
+    for batch in batched_pks(
+        Post.objects.filter(**{relation: pk}), batch_size
+    ):
+        posts_bulk_changed.send(sender=Post, pks=batch, action=VISIBILITY)
+        count += len(batch)
+    if model is Category and 'is_published' in fields:
+        stats.recount(
+            ArchivedPost.objects.filter(category=pk).values_list(
+                'author_id', flat=True
+            ).distinct()
+        )
+    return count
+
+
+def schedule(model, pk, fields=()):
+    """
+    Propagates the change of the fields of the object once the
+    transaction commits, in the background if
+    settings.VISIBILITY_BACKGROUND is set. Propagations lost with
+    a killed process are restored by rebuild_feed and rebuild_stats.
+    """
+
+    job = partial(propagate, model, pk, BATCH_SIZE, set(fields))
+
+    def run():
+        if settings.VISIBILITY_BACKGROUND:
+            workers.get_worker(WORKER).submit(job)
+        else:
+            job()
+
+    transaction.on_commit(run)
@@ -0,0 +1,37 @@
+from django.conf import settings
+from django.contrib.auth.backends import ModelBackend
+from django.core.cache import caches
+
+
+def get_cache():
+    return caches[settings.USER_CACHE_ALIAS]
+
+
+def get_user_key(user_id) -> str:
+    return f'auth:user:{user_id}'
+
+
+def forget_user(user_id):
+    """Drops the cached user, the next request loads it again."""
+
+    get_cache().delete(get_user_key(user_id))
+
+
+class CachedModelBackend(ModelBackend):
+    """
+    ModelBackend that caches the users AuthenticationMiddleware loads
+    for every authenticated request, so rendering the header does not
+    query auth_user. Saving or deleting a user drops the cached one,
+    see blog.receivers.
+    """
+
+    def get_user(self, user_id):
+        cache = get_cache()
+        key = get_user_key(user_id)
+        user = cache.get(key)
+        if user is None:
+            user = super().get_user(user_id)
+            if user is None:
+                return None
+            cache.set(key, user, settings.USER_CACHE_TIMEOUT)
+        return user if self.user_can_authenticate(user) else None
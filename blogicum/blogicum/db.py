@@ -0,0 +1,44 @@
+from django.db import connections
+
+
+def check_connections_health(**kwargs):
+    """
+    Receiver of request_started that closes persistent connections
+    which went away between requests (database restart, idle timeout),
+    so the request opens a fresh one instead of failing.
+    Only databases with the CONN_HEALTH_CHECKS option are checked.
+    """
+
+    for connection in connections.all():
+        if (
+            connection.settings_dict.get('CONN_HEALTH_CHECKS')
+            and connection.connection is not None
+            and not connection.is_usable()
+        ):
+            connection.close()
+
+
+SQLITE_PRAGMAS = (
+    'journal_mode', 'synchronous', 'mmap_size', 'cache_size',
+    'busy_timeout', 'temp_store', 'foreign_keys', 'wal_autocheckpoint',
+)
+
+
+def apply_sqlite_pragmas(sender, connection, **kwargs):
+    """
+    Receiver of connection_created that runs the PRAGMAS option of
+    a SQLite database on every new connection, e.g. WAL journal mode
+    so readers are not blocked by a writer.
+    """
+
+    pragmas = connection.settings_dict.get('PRAGMAS')
+    if connection.vendor != 'sqlite' or not pragmas:
+        return
+    with connection.cursor() as cursor:
+        for name, value in pragmas.items():
+            if name not in SQLITE_PRAGMAS:
+                raise ValueError(f'Unsupported SQLite pragma {name!r}.')
+            value = str(value)
+            if not value.lstrip('-').isalnum():
+                raise ValueError(f'Invalid value of pragma {name!r}.')
+            cursor.execute(f'PRAGMA {name} = {value}')
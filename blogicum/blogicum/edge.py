@@ -0,0 +1,144 @@
+import json
+import logging
+import threading
+import urllib.request
+
+from django.conf import settings
+from django.db import transaction
+from django.utils.cache import patch_cache_control
+
+from blogicum import workers
+
+logger = logging.getLogger(__name__)
+
+SAFE_METHODS = ('GET', 'HEAD')
+
+# Keys sent to the purge endpoint in one request.
+PURGE_BATCH_SIZE = 256
+
+# Key of the home page feed.
+FEED = 'feed'
+
+# Key of every list of posts, for changes that may touch any of them.
+LISTS = 'lists'
+
+# Key of the static pages.
+PAGES = 'pages'
+
+
+def get_key(kind: str, pk) -> str:
+    """Returns the surrogate key of an object, e.g. post-42."""
+
+    return f'{kind}-{pk}'
+
+
+def is_shared_cacheable(request, response) -> bool:
+    """
+    Returns True if a shared cache may store the response: a successful
+    safe request without a session cookie that sets no cookie.
+    """
+
+    return (
+        request.method in SAFE_METHODS
+        and response.status_code == 200
+        and settings.SESSION_COOKIE_NAME not in request.COOKIES
+        and not response.cookies
+    )
+
+
+def patch_edge_cache(request, response, keys):
+    """
+    Marks the response cacheable by a shared cache for
+    settings.EDGE_CACHE_MAX_AGE seconds, served stale while revalidated
+    for settings.EDGE_CACHE_STALE seconds more, with the surrogate
+    keys it depends on. Browsers revalidate every time. Responses to
+    sessions are private.
+    """
+
+    if not is_shared_cacheable(request, response):
+        patch_cache_control(response, private=True, max_age=0)
+        return response
+    patch_cache_control(
+        response, public=True, max_age=0,
+        s_maxage=settings.EDGE_CACHE_MAX_AGE,
+        stale_while_revalidate=settings.EDGE_CACHE_STALE
+    )
+    response[settings.SURROGATE_KEY_HEADER] = ' '.join(sorted(set(keys)))
+    return response
+
+
+def send_purge(keys):
+    """
+    Posts {"keys": [...]} to settings.EDGE_PURGE_URL in batches.
+    Failures are logged, a missed purge only keeps a page until
+    it expires.
+    """
+
+    keys = sorted(set(keys))
+    headers = {'Content-Type': 'application/json'}
+    if settings.EDGE_PURGE_TOKEN:
+        headers['Authorization'] = f'Bearer {settings.EDGE_PURGE_TOKEN}'
+    for start in range(0, len(keys), PURGE_BATCH_SIZE):
+        request = urllib.request.Request(
+            settings.EDGE_PURGE_URL, method='POST', headers=headers,
+            data=json.dumps(
+                {'keys': keys[start:start + PURGE_BATCH_SIZE]}
+            ).encode()
+        )
+        try:
+            with urllib.request.urlopen(
+                request, timeout=settings.EDGE_PURGE_TIMEOUT
+            ):
+                pass
+        except OSError as error:
+            logger.warning('Purge of %s keys failed: %s', len(keys), error)
+
+
+# Name of the background worker sending the purges.
+WORKER = 'edge-purge'
+
+# Keys waiting for the worker, the keys of all changes committed while
+# a purge is sent go in the next one.
+_pending = set()
+
+_pending_lock = threading.Lock()
+
+
+def send_pending():
+    with _pending_lock:
+        keys = list(_pending)
+        _pending.clear()
+    send_purge(keys)
+
+
+def queue_purge(keys):
+    """
+    Hands the keys to the background worker, keys still queued
+    when the process is killed are lost, their pages expire after
+    EDGE_CACHE_MAX_AGE.
+    """
+
+    with _pending_lock:
+        scheduled = bool(_pending)
+        _pending.update(keys)
+    if not scheduled:
+        workers.get_worker(WORKER).submit(send_pending)
+
+
+def purge(keys):
+    """
+    Purges the keys from the shared cache once the change commits,
+    in the background if settings.EDGE_PURGE_BACKGROUND is set.
+    """
+
+    if not settings.EDGE_PURGE_URL:
+        return
+    keys = list(keys)
+
+    def run():
+        if settings.EDGE_PURGE_BACKGROUND:
+            queue_purge(keys)
+        else:
+            send_purge(keys)
+
+    transaction.on_commit(run)
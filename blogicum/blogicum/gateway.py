@@ -0,0 +1,98 @@
+import asyncio
+import contextvars
+import functools
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.db import close_old_connections
+
+
+class ORMGateway:
+    """
+    Runs blocking ORM and template code for async views on a bounded
+    thread pool. At most max_workers calls run at once, so the number
+    of threads and database connections does not grow with the number
+    of concurrent requests; the rest wait on the event loop.
+    """
+
+    def __init__(self, max_workers: int):
+        self.max_workers = max_workers
+        self.executor = ThreadPoolExecutor(
+            max_workers=max_workers, thread_name_prefix='orm-gateway'
+        )
+
+    @staticmethod
+    def call(func, *args, **kwargs):
+        """Calls func with the connection handling of a request."""
+
+        close_old_connections()
+        try:
+            return func(*args, **kwargs)
+        finally:
+            close_old_connections()
+
+    async def run(self, func, *args, **kwargs):
+        """Awaits func(*args, **kwargs) executed on the pool."""
+
+        context = contextvars.copy_context()
+        return await asyncio.get_running_loop().run_in_executor(
+            self.executor,
+            functools.partial(
+                context.run, self.call, func, *args, **kwargs
+            )
+        )
+
+
+_gateway = None
+
+
+def get_gateway() -> ORMGateway:
+    """Returns the process-wide gateway, settings.ORM_GATEWAY_WORKERS."""
+
+    global _gateway
+    if _gateway is None:
+        _gateway = ORMGateway(settings.ORM_GATEWAY_WORKERS)
+    return _gateway
+
+
+def reset_gateway():
+    """Shuts the gateway down, the next one is built from settings."""
+
+    global _gateway
+    if _gateway is not None:
+        _gateway.executor.shutdown()
+    _gateway = None
+
+
+def async_view(view_class, **initkwargs):
+    """
+    Returns an async view that runs the class-based view_class and
+    renders its response on the ORM gateway, the event loop thread
+    only waits for the result.
+    """
+
+    view = view_class.as_view(**initkwargs)
+
+    def run(request, *args, **kwargs):
+        response = view(request, *args, **kwargs)
+        if hasattr(response, 'render'):
+            response.render()
+        return response
+
+    async def handler(request, *args, **kwargs):
+        return await get_gateway().run(run, request, *args, **kwargs)
+
+    handler.view_class = view_class
+    handler.view_initkwargs = initkwargs
+    return handler
+
+
+def as_view(view_class, **initkwargs):
+    """
+    Returns the async variant of the class-based view if
+    settings.ASYNC_VIEWS is true, the regular view otherwise.
+    """
+
+    if settings.ASYNC_VIEWS:
+        return async_view(view_class, **initkwargs)
+    return view_class.as_view(**initkwargs)
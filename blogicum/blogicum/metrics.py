@@ -0,0 +1,314 @@
+import bisect
+import contextvars
+import threading
+import time
+
+from django.template.base import Template
+
+LATENCY_BUCKETS = (
+    0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0
+)
+
+QUERY_BUCKETS = (0, 1, 2, 5, 10, 20, 50, 100, 200)
+
+UNRESOLVED = '<unresolved>'
+
+
+def format_labels(labels) -> str:
+    if not labels:
+        return ''
+    escaped = (
+        (name, str(value).replace('\\', r'\\').replace('"', r'\"')
+         .replace('\n', r'\n'))
+        for name, value in labels
+    )
+    pairs = ','.join(f'{name}="{value}"' for name, value in escaped)
+    return '{' + pairs + '}'
+
+
+class Counter:
+    """Monotonic counter per label set, Prometheus counter."""
+
+    type = 'counter'
+
+    def __init__(self, name: str, documentation: str):
+        self.name = name
+        self.documentation = documentation
+        self.lock = threading.Lock()
+        self.values = {}
+
+    def inc(self, amount: float = 1, **labels):
+        key = tuple(sorted(labels.items()))
+        with self.lock:
+            self.values[key] = self.values.get(key, 0) + amount
+
+    def samples(self):
+        with self.lock:
+            values = dict(self.values)
+        for labels, value in sorted(values.items()):
+            yield f'{self.name}{format_labels(labels)} {value}'
+
+    def reset(self):
+        with self.lock:
+            self.values.clear()
+
+
+class Histogram(Counter):
+    """
+    Cumulative histogram per label set with fixed buckets,
+    Prometheus histogram.
+    """
+
+    type = 'histogram'
+
+    def __init__(self, name: str, documentation: str, buckets):
+        super().__init__(name, documentation)
+        self.buckets = tuple(buckets)
+
+    def observe(self, value: float, **labels):
+        key = tuple(sorted(labels.items()))
+        index = bisect.bisect_left(self.buckets, value)
+        with self.lock:
+            series = self.values.get(key)
+            if series is None:
+                series = self.values[key] = [
+                    [0] * (len(self.buckets) + 1), 0.0, 0
+                ]
+            series[0][index] += 1
+            series[1] += value
+            series[2] += 1
+
+    def samples(self):
+        with self.lock:
+            values = {
+                labels: (list(counts), total, count)
+                for labels, (counts, total, count) in self.values.items()
+            }
+        for labels, (counts, total, count) in sorted(values.items()):
+            cumulative = 0
+            for bound, bucket_count in zip(
+                (*self.buckets, '+Inf'), counts
+            ):
+                cumulative += bucket_count
+                bucket_labels = format_labels((*labels, ('le', bound)))
+                yield f'{self.name}_bucket{bucket_labels} {cumulative}'
+            yield f'{self.name}_sum{format_labels(labels)} {total}'
+            yield f'{self.name}_count{format_labels(labels)} {count}'
+
+
+REQUESTS = Counter(
+    'blogicum_requests_total', 'Requests by view and status code.'
+)
+
+REQUEST_DURATION = Histogram(
+    'blogicum_request_duration_seconds',
+    'Latency of sampled requests by view.', LATENCY_BUCKETS
+)
+
+DB_QUERIES = Histogram(
+    'blogicum_db_queries', 'SQL queries per sampled request by view.',
+    QUERY_BUCKETS
+)
+
+DB_DURATION = Histogram(
+    'blogicum_db_duration_seconds',
+    'Time spent in SQL queries per sampled request by view.',
+    LATENCY_BUCKETS
+)
+
+TEMPLATE_DURATION = Histogram(
+    'blogicum_template_duration_seconds',
+    'Time spent rendering templates per sampled request by view.',
+    LATENCY_BUCKETS
+)
+
+TEMPLATE_RENDERS = Counter(
+    'blogicum_template_renders_total',
+    'Renders of a template by the template including it ("" at the top)'
+    ' in sampled requests.'
+)
+
+TEMPLATE_SECONDS = Counter(
+    'blogicum_template_render_seconds_total',
+    'Time spent rendering a template, its includes too, by the template'
+    ' including it in sampled requests.'
+)
+
+TEMPLATE_SELF_SECONDS = Counter(
+    'blogicum_template_render_self_seconds_total',
+    'Time spent rendering a template, its includes not, by the template'
+    ' including it in sampled requests.'
+)
+
+REGISTRY = [
+    REQUESTS, REQUEST_DURATION, DB_QUERIES, DB_DURATION, TEMPLATE_DURATION,
+    TEMPLATE_RENDERS, TEMPLATE_SECONDS, TEMPLATE_SELF_SECONDS,
+]
+
+
+def expose(registry=REGISTRY) -> str:
+    """Returns the metrics in the Prometheus text exposition format."""
+
+    lines = []
+    for metric in registry:
+        lines.append(f'# HELP {metric.name} {metric.documentation}')
+        lines.append(f'# TYPE {metric.name} {metric.type}')
+        lines.extend(metric.samples())
+    return '\n'.join(lines) + '\n'
+
+
+def reset(registry=REGISTRY):
+    for metric in registry:
+        metric.reset()
+
+
+class RequestStats:
+    """
+    Query count, SQL time and template time of one request.
+    If sql is a list, (sql, seconds) of every query is appended to it.
+    templates maps (including template, template) to the render count,
+    the time with includes and the time without them.
+    """
+
+    def __init__(self, sql=None):
+        self.queries = 0
+        self.db_time = 0.0
+        self.template_time = 0.0
+        self.templates = {}
+        # [template name, time of its includes] of the templates
+        # being rendered, the innermost last.
+        self.template_stack = []
+        self.sql = sql
+
+    def add(self, other: 'RequestStats'):
+        """Adds the counts and timings of other to these stats."""
+
+        self.queries += other.queries
+        self.db_time += other.db_time
+        self.template_time += other.template_time
+        for key, values in other.templates.items():
+            totals = self.templates.setdefault(key, [0, 0.0, 0.0])
+            for index, value in enumerate(values):
+                totals[index] += value
+
+
+# Stats of the sampled request being handled, None otherwise. Being
+# a context variable, it follows the request onto the ORM gateway.
+current_stats = contextvars.ContextVar('current_stats', default=None)
+
+
+def record_query(execute, sql, params, many, context):
+    """Execute wrapper that adds the query to the stats of the request."""
+
+    stats = current_stats.get()
+    if stats is None:
+        return execute(sql, params, many, context)
+    started = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        duration = time.perf_counter() - started
+        stats.db_time += duration
+        stats.queries += 1
+        if stats.sql is not None:
+            stats.sql.append((sql, duration))
+
+
+def instrument_connection(sender, connection, **kwargs):
+    """
+    Receiver of connection_created that installs record_query
+    on every new connection, whatever thread opens it.
+    """
+
+    if record_query not in connection.execute_wrappers:
+        connection.execute_wrappers.append(record_query)
+
+
+_template_render = None
+
+
+def timed_render(self, context):
+    """
+    Template.render that adds the render time of the template to the
+    stats of the request, by the template including it. A template
+    extending another one is timed together with its parent.
+    """
+
+    stats = current_stats.get()
+    if stats is None:
+        return _template_render(self, context)
+    stack = stats.template_stack
+    parent = stack[-1][0] if stack else ''
+    name = self.origin.template_name or self.origin.name
+    frame = [name, 0.0]
+    stack.append(frame)
+    started = time.perf_counter()
+    try:
+        return _template_render(self, context)
+    finally:
+        elapsed = time.perf_counter() - started
+        stack.pop()
+        if stack:
+            stack[-1][1] += elapsed
+        else:
+            stats.template_time += elapsed
+        totals = stats.templates.get((parent, name))
+        if totals is None:
+            totals = stats.templates[(parent, name)] = [0, 0.0, 0.0]
+        totals[0] += 1
+        totals[1] += elapsed
+        totals[2] += elapsed - frame[1]
+
+
+def instrument_templates():
+    """
+    Replaces Template.render with timed_render, once. Like the
+    instrumentation of the Django test runner, but on render(), which
+    the test runner leaves alone and {% include %} goes through.
+    """
+
+    global _template_render
+    if _template_render is None:
+        _template_render = Template.render
+        Template.render = timed_render
+
+
+def get_view_name(request) -> str:
+    match = getattr(request, 'resolver_match', None)
+    return match.view_name if match else UNRESOLVED
+
+
+def observe(request, stats: RequestStats, duration: float):
+    """Records the stats of a finished sampled request."""
+
+    view = get_view_name(request)
+    REQUEST_DURATION.observe(duration, view=view)
+    DB_QUERIES.observe(stats.queries, view=view)
+    DB_DURATION.observe(stats.db_time, view=view)
+    TEMPLATE_DURATION.observe(stats.template_time, view=view)
+    for (parent, name), (count, total, own) in stats.templates.items():
+        TEMPLATE_RENDERS.inc(count, parent=parent, template=name)
+        TEMPLATE_SECONDS.inc(total, parent=parent, template=name)
+        TEMPLATE_SELF_SECONDS.inc(own, parent=parent, template=name)
+
+
+def summarize_templates(stats: RequestStats, requests: int = 1):
+    """
+    Returns the template timings of the stats, per request if they
+    cover several requests, slowest first.
+    """
+
+    return sorted(
+        (
+            {
+                'template': name,
+                'parent': parent,
+                'renders': count / requests,
+                'ms': total * 1000 / requests,
+                'self_ms': own * 1000 / requests,
+            }
+            for (parent, name), (count, total, own)
+            in stats.templates.items()
+        ),
+        key=lambda timing: timing['self_ms'], reverse=True
+    )
@@ -0,0 +1,352 @@
+import asyncio
+import cProfile
+import logging
+import random
+import time
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.contrib.sessions.middleware import SessionMiddleware
+
+from blogicum import metrics, nplusone, profiler, ratelimit, staticfiles
+from blogicum.routers import replica_reads
+
+SAFE_METHODS = ('GET', 'HEAD', 'OPTIONS')
+
+PRIMARY_UNTIL_SESSION_KEY = '_primary_until'
+
+logger = logging.getLogger(__name__)
+
+
+class AsyncCapableMiddleware:
+    """
+    Base of middleware running natively in both handlers: under ASGI
+    __call__ returns the coroutine of acall, so the handler does not
+    wrap the middleware chain with sync_to_async.
+    Subclasses implement __call__ for WSGI and acall for ASGI.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.is_async = asyncio.iscoroutinefunction(get_response)
+        if self.is_async:
+            # Lets the handler see the instance as a coroutine function,
+            # as django.utils.deprecation.MiddlewareMixin does.
+            self._is_coroutine = asyncio.coroutines._is_coroutine
+
+    async def acall(self, request):
+        return await self.get_response(request)
+
+
+class ReplicaRoutingMiddleware(AsyncCapableMiddleware):
+    """
+    Lets views marked with replica_reads = True read from the replicas
+    on safe requests. After a write the session of the user is pinned
+    to the primary for settings.REPLICA_PIN_SECONDS, so authors see
+    their own changes before they reach the replicas.
+    Must be placed after SessionMiddleware.
+    """
+
+    def __init__(self, get_response):
+        super().__init__(get_response)
+        self.pin_seconds = getattr(settings, 'REPLICA_PIN_SECONDS', 10)
+        if self.is_async:
+            # A coroutine, so the handler does not run it in a thread.
+            self.process_view = self.aprocess_view
+
+    def __call__(self, request):
+        if self.is_async:
+            return self.acall(request)
+        token = replica_reads.set(False)
+        try:
+            response = self.get_response(request)
+        finally:
+            replica_reads.reset(token)
+        if request.method not in SAFE_METHODS:
+            self.pin(request)
+        return response
+
+    async def acall(self, request):
+        token = replica_reads.set(False)
+        try:
+            response = await self.get_response(request)
+        finally:
+            replica_reads.reset(token)
+        if request.method not in SAFE_METHODS:
+            # The user and the session may be loaded from the database.
+            await sync_to_async(self.pin)(request)
+        return response
+
+    def pin(self, request):
+        """Pins the session of the user who wrote to the primary."""
+
+        if hasattr(request, 'session') and request.user.is_authenticated:
+            request.session[PRIMARY_UNTIL_SESSION_KEY] = (
+                time.time() + self.pin_seconds
+            )
+
+    def reads_replicas(self, request, view_func) -> bool:
+        view_class = getattr(view_func, 'view_class', None)
+        return (
+            request.method in SAFE_METHODS
+            and getattr(view_class, 'replica_reads', False)
+        )
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        if self.reads_replicas(request, view_func) and not self.is_pinned(
+            request
+        ):
+            replica_reads.set(True)
+
+    async def aprocess_view(self, request, view_func, view_args,
+                            view_kwargs):
+        if not self.reads_replicas(request, view_func):
+            return
+        session = getattr(request, 'session', None)
+        if session is not None and session.session_key and (
+            await sync_to_async(self.is_pinned)(request)
+        ):
+            return
+        replica_reads.set(True)
+
+    def is_pinned(self, request) -> bool:
+        session = getattr(request, 'session', None)
+        if session is None or not session.session_key:
+            return False
+        return session.get(PRIMARY_UNTIL_SESSION_KEY, 0) > time.time()
+
+
+class MetricsMiddleware(AsyncCapableMiddleware):
+    """
+    Counts requests by view and status code and, for a share
+    settings.METRICS_SAMPLE_RATE of them, records latency, SQL query
+    count, SQL time and template render time into the in-process
+    histograms of blogicum.metrics.
+    Must be placed first to measure the whole request.
+    """
+
+    def __init__(self, get_response):
+        super().__init__(get_response)
+        self.sample_rate = settings.METRICS_SAMPLE_RATE
+
+    def __call__(self, request):
+        if self.is_async:
+            return self.acall(request)
+        sample = self.start()
+        try:
+            response = self.get_response(request)
+        finally:
+            self.stop(sample)
+        self.record(request, response, sample)
+        return response
+
+    async def acall(self, request):
+        sample = self.start()
+        try:
+            response = await self.get_response(request)
+        finally:
+            self.stop(sample)
+        self.record(request, response, sample)
+        return response
+
+    def start(self):
+        """
+        Returns (stats, context token, start time) of a sampled request,
+        None for the others.
+        """
+
+        if random.random() >= self.sample_rate:
+            return None
+        # Stats set by the caller (a benchmark) are shared with it.
+        stats = metrics.current_stats.get()
+        token = None
+        if stats is None:
+            stats = metrics.RequestStats()
+            token = metrics.current_stats.set(stats)
+        return stats, token, time.perf_counter()
+
+    def stop(self, sample):
+        if sample is not None and sample[1] is not None:
+            metrics.current_stats.reset(sample[1])
+
+    def record(self, request, response, sample):
+        if sample is not None:
+            stats, _, started = sample
+            metrics.observe(request, stats, time.perf_counter() - started)
+        metrics.REQUESTS.inc(
+            view=metrics.get_view_name(request),
+            status=response.status_code
+        )
+
+
+class QueryReportMiddleware:
+    """
+    Fingerprints the SQL of every request and logs the queries repeated
+    at least settings.NPLUSONE_THRESHOLD times with the template line
+    or code location they come from. Meant for tests and staging,
+    the stack of every query is inspected.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.threshold = settings.NPLUSONE_THRESHOLD
+
+    def __call__(self, request):
+        with nplusone.collect_queries() as report:
+            response = self.get_response(request)
+        view_name = metrics.get_view_name(request)
+        nplusone.query_report_ready.send(
+            sender=self.__class__, view_name=view_name, report=report
+        )
+        if report.repeated(self.threshold):
+            logger.warning(
+                'Repeated queries in %s (%s queries):\n%s',
+                view_name, report.queries, report.format(self.threshold)
+            )
+        return response
+
+
+class ProfilingMiddleware:
+    """
+    Profiles a share settings.PROFILER_SAMPLE_RATE of requests with
+    cProfile and samples the stack of any request running longer than
+    settings.PROFILER_THRESHOLD seconds. Both are stored, with the view
+    name, the SQL list and the SQL and template timings, as JSON in
+    settings.PROFILER_DIR.
+    Must be placed after MetricsMiddleware.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.sample_rate = settings.PROFILER_SAMPLE_RATE
+        self.threshold = settings.PROFILER_THRESHOLD
+        self.sampler = profiler.get_sampler()
+
+    def __call__(self, request):
+        stats = metrics.current_stats.get()
+        token = None
+        if stats is None:
+            stats = metrics.RequestStats()
+            token = metrics.current_stats.set(stats)
+        stats.sql = []
+        profile = (
+            cProfile.Profile() if random.random() < self.sample_rate
+            else None
+        )
+        trace = self.sampler.start(self.threshold)
+        try:
+            if profile is None:
+                response = self.get_response(request)
+            else:
+                response = profile.runcall(self.get_response, request)
+        finally:
+            self.sampler.stop(trace)
+            if token is not None:
+                metrics.current_stats.reset(token)
+        duration = time.perf_counter() - trace.started
+        if profile is not None or duration >= self.threshold:
+            profiler.save_profile({
+                'view': metrics.get_view_name(request),
+                'method': request.method,
+                'path': request.path,
+                'status': response.status_code,
+                'duration_ms': duration * 1000,
+                'db_ms': stats.db_time * 1000,
+                'template_ms': stats.template_time * 1000,
+                'templates': metrics.summarize_templates(stats),
+                'sql': [
+                    {'sql': sql, 'ms': seconds * 1000}
+                    for sql, seconds in stats.sql
+                ],
+                'profile': (
+                    profiler.format_stats(profile) if profile else None
+                ),
+                'stacks': trace.samples.most_common(),
+            })
+        return response
+
+
+class LazySessionMiddleware(SessionMiddleware):
+    """
+    SessionMiddleware that leaves responses to requests without
+    a session cookie alone while their session stays empty: reading
+    request.user there does not add Vary: Cookie, so anonymous pages
+    can be stored by a shared HTTP cache. Such a cache must not serve
+    them to requests that carry the session cookie.
+    """
+
+    def process_response(self, request, response):
+        if (
+            settings.SESSION_COOKIE_NAME not in request.COOKIES
+            and not request.session.modified
+        ):
+            return response
+        return super().process_response(request, response)
+
+
+class RateLimitMiddleware(AsyncCapableMiddleware):
+    """
+    Answers POST requests to views with a rate_limit_scope with 429
+    once the token buckets of the client IP or the user in that scope
+    of settings.RATE_LIMITS are empty, before CSRF middleware parses
+    the form and before the view touches the database.
+    Must be placed before CsrfViewMiddleware.
+    """
+
+    def __call__(self, request):
+        if self.is_async:
+            return self.acall(request)
+        return self.get_response(request)
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        view_class = getattr(view_func, 'view_class', None)
+        scope = getattr(view_class, 'rate_limit_scope', None)
+        if request.method != 'POST' or scope is None:
+            return None
+        retry_after = ratelimit.check(request, scope)
+        if retry_after:
+            return ratelimit.too_many_requests(retry_after)
+        return None
+
+
+class StaticFilesMiddleware(AsyncCapableMiddleware):
+    """
+    Serves the collected files of settings.STATIC_ROOT at STATIC_URL,
+    see blogicum.staticfiles, for deployments without a proxy
+    in front. Static requests skip the rest of the middleware.
+    Must be placed first.
+    """
+
+    def __init__(self, get_response):
+        super().__init__(get_response)
+        self.prefix = settings.STATIC_URL
+
+    def get_path(self, request):
+        """Returns the path of the static file asked for, or None."""
+
+        if (
+            request.method in ('GET', 'HEAD')
+            and request.path_info.startswith(self.prefix)
+        ):
+            return request.path_info[len(self.prefix):]
+        return None
+
+    def __call__(self, request):
+        if self.is_async:
+            return self.acall(request)
+        path = self.get_path(request)
+        if path is not None:
+            return staticfiles.serve(request, path)
+        return self.get_response(request)
+
+    async def acall(self, request):
+        path = self.get_path(request)
+        if path is not None:
+            # stat and open block, they run in a thread of the executor.
+            return await sync_to_async(
+                staticfiles.serve, thread_sensitive=False
+            )(request, path)
+        return await self.get_response(request)
@@ -0,0 +1,130 @@
+import contextlib
+import re
+import sys
+from collections import Counter
+from pathlib import Path
+
+from django.conf import settings
+from django.db import connections
+from django.dispatch import Signal
+
+from blogicum import metrics
+
+# Sent by QueryReportMiddleware for every request with
+# view_name and report (QueryReport) arguments.
+query_report_ready = Signal()
+
+STRINGS = re.compile(r"'(?:[^']|'')*'")
+
+NUMBERS = re.compile(r'\b\d+(?:\.\d+)?\b')
+
+LISTS = re.compile(r'\((?:\s*\?\s*,)+\s*\?\s*\)')
+
+PLACEHOLDERS = re.compile(r'%s')
+
+TEMPLATE_BASE = str(Path('django', 'template', 'base.py'))
+
+# Project files of the instrumentation itself, never an origin.
+INSTRUMENTATION_FILES = (__file__, metrics.__file__)
+
+
+def fingerprint(sql: str) -> str:
+    """
+    Returns the SQL with literals, placeholders and IN lists replaced,
+    so queries that differ only in their parameters match.
+    """
+
+    sql = STRINGS.sub('?', sql)
+    sql = NUMBERS.sub('?', sql)
+    sql = PLACEHOLDERS.sub('?', sql)
+    return LISTS.sub('(...)', sql)
+
+
+def is_project_file(filename: str) -> bool:
+    return (
+        filename.startswith(str(settings.BASE_DIR))
+        and filename not in INSTRUMENTATION_FILES
+        and 'site-packages' not in filename
+    )
+
+
+def get_origin(frame=None) -> str:
+    """
+    Returns where the running query comes from: the template and
+    line of the innermost template node being rendered, otherwise
+    the file and line of the innermost project code.
+    """
+
+    frame = frame or sys._getframe(1)
+    code_origin = None
+    while frame is not None:
+        code = frame.f_code
+        if (
+            code.co_name == 'render_annotated'
+            and code.co_filename.endswith(TEMPLATE_BASE)
+        ):
+            node = frame.f_locals.get('self')
+            token = getattr(node, 'token', None)
+            origin = getattr(node, 'origin', None)
+            if token is not None and origin is not None:
+                return f'{origin.template_name}:{token.lineno}'
+        if code_origin is None and is_project_file(code.co_filename):
+            path = Path(code.co_filename).relative_to(settings.BASE_DIR)
+            code_origin = f'{path}:{frame.f_lineno}'
+        frame = frame.f_back
+    return code_origin or '<unknown>'
+
+
+class QueryReport:
+    """
+    Execute wrapper that counts the queries it sees by fingerprint
+    and remembers where each fingerprint was executed from.
+    """
+
+    def __init__(self):
+        self.queries = 0
+        self.counts = Counter()
+        self.origins = {}
+
+    def __call__(self, execute, sql, params, many, context):
+        self.add(sql, get_origin(sys._getframe(1)))
+        return execute(sql, params, many, context)
+
+    def add(self, sql: str, origin: str):
+        key = fingerprint(sql)
+        self.queries += 1
+        self.counts[key] += 1
+        self.origins.setdefault(key, Counter())[origin] += 1
+
+    def repeated(self, threshold: int):
+        """
+        Returns (fingerprint, count, origin) of the queries executed
+        at least threshold times, the usual N+1 pattern of lazy
+        relation access in a loop.
+        """
+
+        return [
+            (key, count, self.origins[key].most_common(1)[0][0])
+            for key, count in self.counts.most_common()
+            if count >= threshold
+        ]
+
+    def format(self, threshold: int) -> str:
+        return '\n'.join(
+            f'{count}x at {origin}: {key}'
+            for key, count, origin in self.repeated(threshold)
+        )
+
+
+@contextlib.contextmanager
+def collect_queries():
+    """
+    Collects the queries of the current thread into a QueryReport.
+    Views run on the ORM gateway use other threads and are not seen.
+    """
+
+    report = QueryReport()
+    with contextlib.ExitStack() as stack:
+        for connection in connections.all():
+            stack.enter_context(connection.execute_wrapper(report))
+        yield report
@@ -0,0 +1,173 @@
+import cProfile
+import datetime as dt
+import io
+import json
+import pstats
+import re
+import sys
+import threading
+import time
+from collections import Counter
+from pathlib import Path
+
+from django.conf import settings
+
+PROFILE_NAME = re.compile(r'^[\w.-]+\.json$')
+
+UNSAFE_CHARACTERS = re.compile(r'[^\w.-]+')
+
+# Functions listed in the cProfile summary of a profile.
+STATS_LIMIT = 40
+
+# Frames kept from the top of a sampled stack.
+STACK_DEPTH = 60
+
+
+def collapse_stack(frame) -> str:
+    """
+    Returns the stack of the frame from the outermost call as
+    'file:function:line;...', the collapsed format of flame graphs.
+    """
+
+    calls = []
+    while frame is not None and len(calls) < STACK_DEPTH:
+        code = frame.f_code
+        calls.append(
+            f'{Path(code.co_filename).name}:{code.co_name}:{frame.f_lineno}'
+        )
+        frame = frame.f_back
+    return ';'.join(reversed(calls))
+
+
+class Trace:
+    """
+    Stack samples of a request running in the thread thread_id,
+    sampled once it has been running for threshold seconds.
+    """
+
+    def __init__(self, thread_id: int, started: float, threshold: float):
+        self.thread_id = thread_id
+        self.started = started
+        self.threshold = threshold
+        self.samples = Counter()
+
+
+class StackSampler:
+    """
+    Background thread that samples, every interval seconds, the stacks
+    of the requests that have been running for more than the threshold
+    of their trace. Faster requests cost two dict operations.
+    """
+
+    def __init__(self, interval: float):
+        self.interval = interval
+        self.traces = {}
+        self.lock = threading.Lock()
+        self.thread = threading.Thread(
+            target=self.run, name='stack-sampler', daemon=True
+        )
+        self.thread.start()
+
+    def start(self, threshold: float) -> Trace:
+        trace = Trace(threading.get_ident(), time.perf_counter(), threshold)
+        with self.lock:
+            self.traces[trace.thread_id] = trace
+        return trace
+
+    def stop(self, trace: Trace):
+        with self.lock:
+            self.traces.pop(trace.thread_id, None)
+
+    def sample(self):
+        now = time.perf_counter()
+        with self.lock:
+            slow = [
+                trace for trace in self.traces.values()
+                if now - trace.started > trace.threshold
+            ]
+        if not slow:
+            return
+        frames = sys._current_frames()
+        for trace in slow:
+            frame = frames.get(trace.thread_id)
+            if frame is not None:
+                trace.samples[collapse_stack(frame)] += 1
+
+    def run(self):
+        while True:
+            time.sleep(self.interval)
+            self.sample()
+
+
+_sampler = None
+
+
+def get_sampler() -> StackSampler:
+    """Returns the process-wide sampler, started on first use."""
+
+    global _sampler
+    if _sampler is None:
+        _sampler = StackSampler(settings.PROFILER_INTERVAL)
+    return _sampler
+
+
+def format_stats(profile: cProfile.Profile) -> str:
+    """Returns the cProfile summary sorted by cumulative time."""
+
+    output = io.StringIO()
+    pstats.Stats(profile, stream=output).sort_stats(
+        'cumulative'
+    ).print_stats(STATS_LIMIT)
+    return output.getvalue()
+
+
+def get_directory() -> Path:
+    return Path(settings.PROFILER_DIR)
+
+
+def save_profile(data: dict) -> Path:
+    """
+    Writes the profile as JSON named after the time, the view and
+    the duration, then keeps only the settings.PROFILER_KEEP newest
+    profiles of the directory.
+    """
+
+    directory = get_directory()
+    directory.mkdir(parents=True, exist_ok=True)
+    now = dt.datetime.now(tz=dt.timezone.utc)
+    view = UNSAFE_CHARACTERS.sub('_', data['view'])
+    path = directory / (
+        f'{now:%Y%m%dT%H%M%S.%f}-{view}-{data["duration_ms"]:.0f}ms.json'
+    )
+    path.write_text(json.dumps(
+        {'created_at': now.isoformat(), **data}, ensure_ascii=False, indent=2
+    ))
+    for old in list_profiles()[settings.PROFILER_KEEP:]:
+        old.unlink(missing_ok=True)
+    return path
+
+
+def list_profiles():
+    """Returns the paths of the stored profiles, newest first."""
+
+    directory = get_directory()
+    if not directory.is_dir():
+        return []
+    return sorted(
+        (
+            path for path in directory.iterdir()
+            if PROFILE_NAME.match(path.name)
+        ),
+        key=lambda path: path.name, reverse=True
+    )
+
+
+def load_profile(name: str) -> dict:
+    """
+    Returns the stored profile by its file name,
+    raises FileNotFoundError for names outside the directory.
+    """
+
+    if not PROFILE_NAME.match(name):
+        raise FileNotFoundError(name)
+    return json.loads((get_directory() / name).read_text())
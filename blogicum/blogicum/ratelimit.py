@@ -0,0 +1,112 @@
+import math
+import re
+import time
+
+from django.conf import settings
+from django.core.cache import caches
+from django.http import HttpResponse
+
+RATE = re.compile(r'^(\d+)/(\d*)([smhd]?)$')
+
+PERIODS = {'': 1, 's': 1, 'm': 60, 'h': 3600, 'd': 86400}
+
+# Tokens are counted in thousandths, so refill needs no float state.
+SCALE = 1000
+
+# Buckets live this many periods after their creation. An idle bucket
+# is full after one period, a new one is full as well.
+TTL_PERIODS = 10
+
+USER = 'user'
+
+IP = 'ip'
+
+
+def parse_rate(rate: str):
+    """
+    Returns (capacity, period in seconds) of a rate like '10/m',
+    '5/30s' or '100/3600'.
+    """
+
+    match = RATE.match(rate)
+    if match is None:
+        raise ValueError(f'Invalid rate: {rate!r}')
+    capacity, count, unit = match.groups()
+    return int(capacity), int(count or 1) * PERIODS[unit]
+
+
+def get_cache():
+    return caches[settings.RATE_LIMIT_CACHE_ALIAS]
+
+
+def get_identities(request):
+    """Returns the (kind, identity) pairs the request is limited by."""
+
+    identities = [(IP, request.META.get('REMOTE_ADDR', ''))]
+    if request.user.is_authenticated:
+        identities.append((USER, request.user.pk))
+    return identities
+
+
+def consume(key: str, capacity: int, period: int, now: float = None):
+    """
+    Takes a token from the bucket of the key, returns 0 if there was
+    one, else the seconds until the next token.
+
+    The bucket is one counter in the cache, the tokens taken since
+    the epoch; minus the tokens refilled since the epoch it is the debt
+    of the bucket. Taking a token is an atomic incr, so concurrent
+    requests cannot take the same token. A request that finds a
+    negative debt (a bucket refilled over capacity while idle) clears
+    it, at most once a second.
+    """
+
+    now = time.time() if now is None else now
+    cache = get_cache()
+    refilled = int(now * capacity / period * SCALE)
+    try:
+        taken = cache.incr(key, SCALE)
+    except ValueError:
+        cache.add(key, refilled, math.ceil(period * TTL_PERIODS))
+        try:
+            taken = cache.incr(key, SCALE)
+        except ValueError:
+            # Evicted meanwhile, let the request pass.
+            return 0
+    debt = taken - refilled
+    if debt < SCALE and cache.add(f'{key}:clamp', 1, 1):
+        cache.incr(key, SCALE - debt)
+    if debt <= capacity * SCALE:
+        return 0
+    # Rejected requests do not take tokens.
+    cache.decr(key, SCALE)
+    return (debt - capacity * SCALE) * period / capacity / SCALE
+
+
+def check(request, scope: str) -> float:
+    """
+    Takes a token from every bucket of the request in the scope of
+    settings.RATE_LIMITS, returns 0 if all had one, else the seconds
+    to wait.
+    """
+
+    rates = settings.RATE_LIMITS.get(scope, {})
+    retry_after = 0
+    for kind, identity in get_identities(request):
+        rate = rates.get(kind)
+        if rate is None:
+            continue
+        capacity, period = parse_rate(rate)
+        retry_after = max(retry_after, consume(
+            f'ratelimit:{scope}:{kind}:{identity}', capacity, period
+        ))
+    return retry_after
+
+
+def too_many_requests(retry_after: float) -> HttpResponse:
+    response = HttpResponse(
+        'Слишком много запросов, попробуйте позже.', status=429,
+        content_type='text/plain; charset=utf-8'
+    )
+    response['Retry-After'] = max(1, math.ceil(retry_after))
+    return response
@@ -0,0 +1,46 @@
+import random
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.conf import settings
+
+PRIMARY = 'default'
+
+# True while a read-only view that may be served by a replica runs,
+# set by blogicum.middleware.ReplicaRoutingMiddleware.
+replica_reads = ContextVar('replica_reads', default=False)
+
+
+@contextmanager
+def use_replicas():
+    """Routes the reads inside the block to the replicas."""
+
+    token = replica_reads.set(True)
+    try:
+        yield
+    finally:
+        replica_reads.reset(token)
+
+
+class ReplicaRouter:
+    """
+    Sends reads of read-only views to a random replica of
+    settings.REPLICA_DATABASES, everything else to the primary.
+    """
+
+    def __init__(self):
+        self.replicas = list(getattr(settings, 'REPLICA_DATABASES', []))
+
+    def db_for_read(self, model, **hints):
+        if self.replicas and replica_reads.get():
+            return random.choice(self.replicas)
+        return PRIMARY
+
+    def db_for_write(self, model, **hints):
+        return PRIMARY
+
+    def allow_relation(self, obj1, obj2, **hints):
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        return db == PRIMARY
@@ -8,27 +8,75 @@ https://docs.djangoproject.com/en/3.2/topics/settings/
 
 For the full list of settings and their values, see
 https://docs.djangoproject.com/en/3.2/ref/settings/
+
+Settings are driven by environment variables prefixed with BLOGICUM_.
+BLOGICUM_PROFILE selects the profile: 'development' (default) or
+'production'. The production profile turns debug off, drops debug-only
+apps and middleware, keeps DB connections open between requests and
+uses the cached template loader.
 """
 
+import os
 from pathlib import Path
 
+from django.core.exceptions import ImproperlyConfigured
+
+
+def env(name, default=None):
+    return os.environ.get(f'BLOGICUM_{name}', default)
+
+
+def env_bool(name, default=False):
+    value = env(name)
+    if value is None:
+        return default
+    return value.strip().lower() in ('1', 'true', 'yes', 'on')
+
+
+def env_list(name, default=()):
+    value = env(name)
+    if value is None:
+        return list(default)
+    return [item.strip() for item in value.split(',') if item.strip()]
+
+
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
 BASE_DIR = Path(__file__).resolve().parent.parent
 
+DEVELOPMENT = 'development'
+
+PRODUCTION = 'production'
+
+PROFILE = env('PROFILE', DEVELOPMENT)
+
+if PROFILE not in (DEVELOPMENT, PRODUCTION):
+    raise ImproperlyConfigured(f'Unknown BLOGICUM_PROFILE {PROFILE!r}.')
+
+IS_PRODUCTION = PROFILE == PRODUCTION
+
 
 # Quick-start development settings - unsuitable for production
 # See https://docs.djangoproject.com/en/3.2/howto/deployment/checklist/
 
 # SECURITY WARNING: keep the secret key used in production secret!
-SECRET_KEY = 'django-insecure-1p&nutd@2^3=r2x+*(bm3#37-r9)s7*uvb$haj)iyvzb12^7nj'
+SECRET_KEY = env(
+    'SECRET_KEY',
+    None if IS_PRODUCTION else
+    'django-insecure-1p&nutd@2^3=r2x+*(bm3#37-r9)s7*uvb$haj)iyvzb12^7nj'
+)
+
+if not SECRET_KEY:
+    raise ImproperlyConfigured(
+        'BLOGICUM_SECRET_KEY is required by the production profile.'
+    )
 
 # SECURITY WARNING: don't run with debug turned on in production!
-DEBUG = True
+DEBUG = env_bool('DEBUG', not IS_PRODUCTION)
 
-ALLOWED_HOSTS = [
+ALLOWED_HOSTS = env_list('ALLOWED_HOSTS', [
     'localhost',
     '127.0.0.1'
-]
+])
 
 
 # Application definition
@@ -42,21 +90,73 @@ INSTALLED_APPS = [
     'django.contrib.sessions',
     'django.contrib.messages',
     'django.contrib.staticfiles',
-    'debug_toolbar',
     'django_bootstrap5',
 ]
 
+# Debug-only components, never enabled by the production profile.
+DEBUG_APPS = [
+    'debug_toolbar',
+]
+
+DEBUG_MIDDLEWARE = [
+    'debug_toolbar.middleware.DebugToolbarMiddleware',
+]
+
+DEBUG_TOOLBAR = env_bool('DEBUG_TOOLBAR', not IS_PRODUCTION)
+
+if DEBUG_TOOLBAR:
+    INSTALLED_APPS += DEBUG_APPS
+
 MIDDLEWARE = [
     'django.middleware.security.SecurityMiddleware',
-    'django.contrib.sessions.middleware.SessionMiddleware',
+    'blogicum.middleware.LazySessionMiddleware',
     'django.middleware.common.CommonMiddleware',
+    'blogicum.middleware.RateLimitMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
-    'debug_toolbar.middleware.DebugToolbarMiddleware',
 ]
 
+if DEBUG_TOOLBAR:
+    MIDDLEWARE += DEBUG_MIDDLEWARE
+
+# Logs queries repeated NPLUSONE_THRESHOLD times in one request
+# (N+1 access to relations) with their origin, for tests and staging.
+NPLUSONE = env_bool('NPLUSONE', False)
+
+NPLUSONE_THRESHOLD = int(env('NPLUSONE_THRESHOLD', 3))
+
+if NPLUSONE:
+    MIDDLEWARE.insert(0, 'blogicum.middleware.QueryReportMiddleware')
+
+# Profiles PROFILER_SAMPLE_RATE of requests with cProfile and samples
+# the stacks of requests slower than PROFILER_THRESHOLD seconds, keeps
+# the PROFILER_KEEP newest profiles in PROFILER_DIR (/profiler/ page).
+PROFILER = env_bool('PROFILER', False)
+
+PROFILER_SAMPLE_RATE = float(env('PROFILER_SAMPLE_RATE', 0.0))
+
+PROFILER_THRESHOLD = float(env('PROFILER_THRESHOLD', 1.0))
+
+PROFILER_INTERVAL = float(env('PROFILER_INTERVAL', 0.005))
+
+PROFILER_DIR = Path(env('PROFILER_DIR', BASE_DIR.parent / 'profiles'))
+
+PROFILER_KEEP = int(env('PROFILER_KEEP', 100))
+
+if PROFILER:
+    MIDDLEWARE.insert(0, 'blogicum.middleware.ProfilingMiddleware')
+
+# Per-view latency, SQL and template metrics of a share of requests,
+# exported in the Prometheus format at /metrics/ to staff users.
+METRICS = env_bool('METRICS', True)
+
+METRICS_SAMPLE_RATE = float(env('METRICS_SAMPLE_RATE', 1.0))
+
+if METRICS:
+    MIDDLEWARE.insert(0, 'blogicum.middleware.MetricsMiddleware')
+
 ROOT_URLCONF = 'blogicum.urls'
 
 INTERNAL_IPS = [
@@ -69,7 +169,7 @@ TEMPLATES = [
     {
         'BACKEND': 'django.template.backends.django.DjangoTemplates',
         'DIRS': [TEMPLATES_DIR],
-        'APP_DIRS': True,
+        'APP_DIRS': not IS_PRODUCTION,
         'OPTIONS': {
             'context_processors': [
                 'django.template.context_processors.debug',
@@ -81,19 +181,210 @@ TEMPLATES = [
     },
 ]
 
+if IS_PRODUCTION:
+    # Templates are compiled once per process instead of on every render.
+    TEMPLATES[0]['OPTIONS']['loaders'] = [
+        ('django.template.loaders.cached.Loader', [
+            'django.template.loaders.filesystem.Loader',
+            'django.template.loaders.app_directories.Loader',
+        ]),
+    ]
+
 WSGI_APPLICATION = 'blogicum.wsgi.application'
 
+# Serve the feed, post and static pages with async views, enabled by
+# blogicum.asgi. Their ORM and template work runs on a pool of
+# ORM_GATEWAY_WORKERS threads, see blogicum.gateway.
+ASYNC_VIEWS = env_bool('ASYNC_VIEWS', False)
+
+ORM_GATEWAY_WORKERS = int(env('ORM_GATEWAY_WORKERS', 8))
+
 
 # Database
 # https://docs.djangoproject.com/en/3.2/ref/settings/#databases
 
 DATABASES = {
     'default': {
-        'ENGINE': 'django.db.backends.sqlite3',
-        'NAME': BASE_DIR / 'db.sqlite3',
+        'ENGINE': env('DB_ENGINE', 'django.db.backends.sqlite3'),
+        'NAME': env('DB_NAME', BASE_DIR / 'db.sqlite3'),
+        'USER': env('DB_USER', ''),
+        'PASSWORD': env('DB_PASSWORD', ''),
+        'HOST': env('DB_HOST', ''),
+        'PORT': env('DB_PORT', ''),
+        # Seconds to keep a connection open between requests.
+        'CONN_MAX_AGE': int(env('CONN_MAX_AGE', 600 if IS_PRODUCTION else 0)),
+        # Ping a reused persistent connection before the request uses it,
+        # see blogicum.db.check_connections_health.
+        'CONN_HEALTH_CHECKS': env_bool('CONN_HEALTH_CHECKS', IS_PRODUCTION),
     }
 }
 
+# Pragmas run on every new SQLite connection, see
+# blogicum.db.apply_sqlite_pragmas. Override them with
+# BLOGICUM_SQLITE_PRAGMAS='journal_mode=WAL,synchronous=NORMAL'
+# or disable them with BLOGICUM_SQLITE_TUNING=0.
+SQLITE_PRAGMAS = {
+    'journal_mode': 'WAL',
+    'synchronous': 'NORMAL',
+    'mmap_size': 256 * 1024 * 1024,
+    'cache_size': -20000,
+    'busy_timeout': 5000,
+}
+
+if env('SQLITE_PRAGMAS'):
+    SQLITE_PRAGMAS = dict(
+        item.split('=', 1) for item in env_list('SQLITE_PRAGMAS')
+    )
+
+if env_bool('SQLITE_TUNING', True):
+    DATABASES['default']['PRAGMAS'] = SQLITE_PRAGMAS
+
+# Read replicas of the default database: a comma separated list of
+# hosts (of file names for SQLite) in BLOGICUM_DB_REPLICAS.
+# Read-only views read from them, see blogicum.routers.ReplicaRouter.
+REPLICA_DATABASES = []
+
+for number, replica in enumerate(env_list('DB_REPLICAS'), start=1):
+    alias = f'replica{number}'
+    DATABASES[alias] = {
+        **DATABASES['default'],
+        'HOST': replica,
+        'TEST': {'MIRROR': 'default'},
+    }
+    if DATABASES['default']['ENGINE'].endswith('sqlite3'):
+        DATABASES[alias].update(NAME=replica, HOST='')
+    REPLICA_DATABASES.append(alias)
+
+# Seconds a session reads from the primary after a write.
+REPLICA_PIN_SECONDS = int(env('REPLICA_PIN_SECONDS', 10))
+
+if REPLICA_DATABASES:
+    DATABASE_ROUTERS = ['blogicum.routers.ReplicaRouter']
+    MIDDLEWARE.insert(
+        MIDDLEWARE.index(
+            'django.contrib.auth.middleware.AuthenticationMiddleware'
+        ) + 1,
+        'blogicum.middleware.ReplicaRoutingMiddleware'
+    )
+
+
+# Cache
+# https://docs.djangoproject.com/en/3.2/topics/cache/
+
+CACHES = {
+    'default': {
+        'BACKEND': env(
+            'CACHE_BACKEND', 'django.core.cache.backends.locmem.LocMemCache'
+        ),
+        'LOCATION': env('CACHE_LOCATION', ''),
+        'TIMEOUT': int(env('CACHE_TIMEOUT', 300)),
+    }
+}
+
+# Lookups that found nothing (e.g. missing post ids requested by
+# crawlers) are answered with 404 without a query for this long.
+NEGATIVE_CACHE_ALIAS = 'default'
+
+NEGATIVE_CACHE_TIMEOUT = int(env('NEGATIVE_CACHE_TIMEOUT', 60))
+
+# In-memory sets of existing post ids, category slugs and usernames
+# answer lookups of keys that do not exist with 404 without a query.
+# They are rebuilt after MEMBERSHIP_MAX_AGE seconds at the latest.
+MEMBERSHIP_FILTERS = env_bool('MEMBERSHIP_FILTERS', True)
+
+MEMBERSHIP_MAX_AGE = int(env('MEMBERSHIP_MAX_AGE', 300))
+
+
+# Responses to requests without a session are cacheable by a shared
+# cache (CDN, reverse proxy) for EDGE_CACHE_MAX_AGE seconds and carry
+# the surrogate keys of the objects they show. Changes of the objects
+# post their keys as {"keys": [...]} to EDGE_PURGE_URL.
+EDGE_CACHE_MAX_AGE = int(env('EDGE_CACHE_MAX_AGE', 60))
+
+EDGE_CACHE_STALE = int(env('EDGE_CACHE_STALE', 300))
+
+SURROGATE_KEY_HEADER = env('SURROGATE_KEY_HEADER', 'Surrogate-Key')
+
+EDGE_PURGE_URL = env('EDGE_PURGE_URL', '')
+
+EDGE_PURGE_TOKEN = env('EDGE_PURGE_TOKEN', '')
+
+EDGE_PURGE_TIMEOUT = float(env('EDGE_PURGE_TIMEOUT', 2))
+
+# Purges are sent by a background thread of the process, so the
+# request that changed the objects does not wait for the endpoint.
+EDGE_PURGE_BACKGROUND = env_bool('EDGE_PURGE_BACKGROUND', True)
+
+
+# Comments are queued in the process and written with bulk_create in
+# batches of COMMENT_BUFFER_SIZE, leftovers every COMMENT_BUFFER_INTERVAL
+# seconds. Their authors see them at once, others after the write.
+# Queued comments are lost if the process is killed.
+COMMENT_BUFFER = env_bool('COMMENT_BUFFER', False)
+
+COMMENT_BUFFER_SIZE = int(env('COMMENT_BUFFER_SIZE', 50))
+
+COMMENT_BUFFER_INTERVAL = float(env('COMMENT_BUFFER_INTERVAL', 1.0))
+
+
+# Publishing, hiding or renaming a category or a location updates the
+# data derived from its posts (feed cards, edge cache) in batches,
+# after the save, in a background thread of the process.
+VISIBILITY_BACKGROUND = env_bool('VISIBILITY_BACKGROUND', True)
+
+
+# Posts published more than ARCHIVE_AFTER_DAYS days ago are moved with
+# their comments to archive tables by the archive_posts command. They
+# stay readable on their pages and in the profile of their author, the
+# feed and category pages only read the live tables.
+ARCHIVE_AFTER_DAYS = int(env('ARCHIVE_AFTER_DAYS', 365))
+
+
+# Token buckets of POST requests per client IP and per user, by the
+# rate_limit_scope of the view, as 'tokens/period' (s, m, h or d).
+# Requests over the limit get 429. The buckets are kept in the
+# RATE_LIMIT_CACHE_ALIAS cache; with the per-process LocMemCache every
+# process has its own buckets and the limits are multiplied by the
+# number of processes, so the production profile requires a shared one.
+# REMOTE_ADDR must be the client address, set by the proxy in front.
+# BLOGICUM_RATE_LIMITS=0 turns the limits off.
+RATE_LIMITS = {
+    'comment': {
+        'user': env('RATE_LIMIT_COMMENT_USER', '10/m'),
+        'ip': env('RATE_LIMIT_COMMENT_IP', '30/m'),
+    },
+    'post': {
+        'user': env('RATE_LIMIT_POST_USER', '10/h'),
+        'ip': env('RATE_LIMIT_POST_IP', '30/h'),
+    },
+} if env_bool('RATE_LIMITS', True) else {}
+
+RATE_LIMIT_CACHE_ALIAS = 'default'
+
+
+# Sessions and authentication
+# https://docs.djangoproject.com/en/3.2/topics/http/sessions/
+
+# Sessions are read from the cache and written through to the database,
+# BLOGICUM_SESSION_ENGINE=django.contrib.sessions.backends.signed_cookies
+# keeps them in the cookie instead.
+SESSION_ENGINE = env(
+    'SESSION_ENGINE', 'django.contrib.sessions.backends.cached_db'
+)
+
+SESSION_CACHE_ALIAS = 'default'
+
+# The user of an authenticated request is cached as well,
+# BLOGICUM_USER_CACHE=0 loads it from the database on every request.
+AUTHENTICATION_BACKENDS = [
+    'blogicum.auth.CachedModelBackend' if env_bool('USER_CACHE', True)
+    else 'django.contrib.auth.backends.ModelBackend'
+]
+
+USER_CACHE_ALIAS = 'default'
+
+USER_CACHE_TIMEOUT = int(env('USER_CACHE_TIMEOUT', 300))
+
 
 # Password validation
 # https://docs.djangoproject.com/en/3.2/ref/settings/#auth-password-validators
@@ -137,6 +428,27 @@ STATICFILES_DIRS = [
     BASE_DIR / 'static_dev'
 ]
 
+STATIC_ROOT = env('STATIC_ROOT', BASE_DIR / 'static')
+
+# collectstatic writes the files under names with a hash of their
+# content, listed in a manifest, with .gz and .br siblings of the text
+# files, see blogicum.staticfiles. Templates then need the manifest,
+# so it is off in development.
+if env_bool('STATIC_MANIFEST', IS_PRODUCTION):
+    STATICFILES_STORAGE = (
+        'blogicum.staticfiles.CompressedManifestStaticFilesStorage'
+    )
+
+# Serve STATIC_ROOT from the Django process when no proxy serves it:
+# hashed names are cached by browsers for a year, the others for
+# STATIC_MAX_AGE seconds.
+STATIC_SERVE = env_bool('STATIC_SERVE', False)
+
+STATIC_MAX_AGE = int(env('STATIC_MAX_AGE', 60))
+
+if STATIC_SERVE:
+    MIDDLEWARE.insert(0, 'blogicum.middleware.StaticFilesMiddleware')
+
 # Default primary key field type
 # https://docs.djangoproject.com/en/3.2/ref/settings/#default-auto-field
 
@@ -153,3 +465,50 @@ EMAIL_FILE_PATH = BASE_DIR / 'sent_emails'
 CSRF_FAILURE_VIEW = 'pages.views.csrf_failure'
 
 MEDIA_ROOT = BASE_DIR / 'media'
+
+
+# A production process must not boot with debug-only components.
+if IS_PRODUCTION and (
+    DEBUG
+    or set(DEBUG_APPS) & set(INSTALLED_APPS)
+    or set(DEBUG_MIDDLEWARE) & set(MIDDLEWARE)
+):
+    raise ImproperlyConfigured(
+        'The production profile cannot run with DEBUG or debug-only '
+        'apps and middleware enabled.'
+    )
+
+# Cache backends every process keeps to itself.
+LOCAL_CACHE_BACKENDS = (
+    'django.core.cache.backends.locmem.LocMemCache',
+    'django.core.cache.backends.dummy.DummyCache',
+)
+
+# Aliases of the caches that must be shared by all the processes:
+# a logout or a password change handled by one process must end
+# the cached session and user in the others.
+SHARED_CACHE_ALIASES = set()
+
+if SESSION_ENGINE in (
+    'django.contrib.sessions.backends.cache',
+    'django.contrib.sessions.backends.cached_db',
+):
+    SHARED_CACHE_ALIASES.add(SESSION_CACHE_ALIAS)
+
+if 'blogicum.auth.CachedModelBackend' in AUTHENTICATION_BACKENDS:
+    SHARED_CACHE_ALIASES.add(USER_CACHE_ALIAS)
+
+if RATE_LIMITS:
+    SHARED_CACHE_ALIASES.add(RATE_LIMIT_CACHE_ALIAS)
+
+if IS_PRODUCTION and any(
+    CACHES[alias]['BACKEND'] in LOCAL_CACHE_BACKENDS
+    for alias in SHARED_CACHE_ALIASES
+):
+    raise ImproperlyConfigured(
+        'The production profile needs a cache shared by the processes '
+        '(BLOGICUM_CACHE_BACKEND) for cached sessions, users and rate '
+        'limits, or BLOGICUM_SESSION_ENGINE='
+        'django.contrib.sessions.backends.db, BLOGICUM_USER_CACHE=0 '
+        'and BLOGICUM_RATE_LIMITS=0.'
+    )
@@ -0,0 +1,232 @@
+import gzip
+import logging
+import mimetypes
+import os
+import re
+import stat
+from functools import lru_cache
+
+from django.conf import settings
+from django.contrib.staticfiles.storage import (
+    ManifestStaticFilesStorage, staticfiles_storage
+)
+from django.core.exceptions import SuspiciousFileOperation
+from django.core.files.base import ContentFile
+from django.http import (
+    FileResponse, HttpResponse, HttpResponseNotFound, HttpResponseNotModified
+)
+from django.utils._os import safe_join
+from django.utils.http import http_date
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+# Files worth compressing, images other than icons are compressed already.
+COMPRESSIBLE = ('.css', '.js', '.map', '.svg', '.ico', '.txt', '.json', '.xml')
+
+# A compressed sibling smaller than this share of the file is kept.
+MIN_RATIO = 0.95
+
+# Content-Encoding by the suffix of the sibling, in order of preference.
+ENCODINGS = (('br', '.br'), ('gzip', '.gz'))
+
+IMMUTABLE = 'public, max-age=31536000, immutable'
+
+RANGE = re.compile(r'^bytes=(\d*)-(\d*)$')
+
+logger = logging.getLogger(__name__)
+
+
+def compress(data: bytes) -> dict:
+    """Returns the gzip and, if brotli is installed, brotli bodies."""
+
+    bodies = {'.gz': gzip.compress(data, compresslevel=9, mtime=0)}
+    if brotli is not None:
+        bodies['.br'] = brotli.compress(data, quality=11)
+    return bodies
+
+
+class CompressedManifestStaticFilesStorage(ManifestStaticFilesStorage):
+    """
+    ManifestStaticFilesStorage that also writes .gz and .br siblings
+    of the hashed text files, so servers send them without compressing
+    on every request.
+    """
+
+    def post_process(self, paths, dry_run=False, **options):
+        yield from super().post_process(paths, dry_run, **options)
+        if dry_run:
+            return
+        if brotli is None:
+            logger.warning(
+                'Brotli is not installed, only .gz files are written. '
+                'Install the requirements to serve .br files.'
+            )
+        for name in sorted(set(self.hashed_files.values())):
+            if not name.endswith(COMPRESSIBLE):
+                continue
+            with self.open(name) as file:
+                data = file.read()
+            for suffix, body in compress(data).items():
+                if len(body) >= len(data) * MIN_RATIO:
+                    continue
+                if self.exists(name + suffix):
+                    self.delete(name + suffix)
+                self._save(name + suffix, ContentFile(body))
+                yield name, name + suffix, True
+
+
+@lru_cache(maxsize=1)
+def get_hashed_names(storage) -> frozenset:
+    """Names of the manifest, they change with the file content."""
+
+    return frozenset(getattr(storage, 'hashed_files', {}).values())
+
+
+def get_accepted(request) -> set:
+    return {
+        coding.split(';')[0].strip()
+        for coding in request.META.get('HTTP_ACCEPT_ENCODING', '').split(',')
+    }
+
+
+def parse_range(header: str, size: int):
+    """
+    Returns (start, stop) of a single byte range of a file of the size,
+    None for a header to ignore, () for an unsatisfiable range.
+    """
+
+    match = RANGE.match(header.replace(' ', ''))
+    if match is None:
+        return None
+    start, end = match.groups()
+    if not start:
+        if not end:
+            return None
+        if not int(end) or not size:
+            return ()
+        return max(size - int(end), 0), size
+    start = int(start)
+    if end and int(end) < start:
+        return None
+    if start >= size:
+        return ()
+    return start, min(int(end) + 1, size) if end else size
+
+
+class FileRange:
+    """Reads a part of a file, from its current position to stop."""
+
+    def __init__(self, file, start: int, stop: int):
+        self.file = file
+        self.file.seek(start)
+        self.remaining = stop - start
+
+    def read(self, size: int = -1) -> bytes:
+        if size < 0 or size > self.remaining:
+            size = self.remaining
+        data = self.file.read(size)
+        self.remaining -= len(data)
+        return data
+
+    def close(self):
+        self.file.close()
+
+
+def set_headers(response, headers: dict):
+    for name, value in headers.items():
+        response[name] = value
+    return response
+
+
+def find_file(full_path: str, accepted: set):
+    """
+    Returns (path, Content-Encoding, os.stat_result) of the best
+    sibling of the file the client accepts, None if there is no file.
+    """
+
+    for encoding, suffix in (*ENCODINGS, (None, '')):
+        if encoding is not None and encoding not in accepted:
+            continue
+        try:
+            file_stat = os.stat(full_path + suffix)
+        except OSError:
+            continue
+        if stat.S_ISREG(file_stat.st_mode):
+            return full_path + suffix, encoding, file_stat
+    return None
+
+
+def get_body(request, path: str, start: int, stop: int, size: int):
+    """FileResponse of the bytes start to stop of the file path."""
+
+    if request.method == 'HEAD':
+        return HttpResponse()
+    if (start, stop) != (0, size):
+        return FileResponse(FileRange(open(path, 'rb'), start, stop))
+    # A whole file object, WSGI servers send it with wsgi.file_wrapper,
+    # e.g. with sendfile(2).
+    response = FileResponse(open(path, 'rb'))
+    del response['Content-Disposition']
+    return response
+
+
+def serve(request, path: str):
+    """
+    Answers a GET or HEAD request for the file path of STATIC_ROOT:
+    the .br or .gz sibling if the client accepts it, a single byte
+    range if asked for, 304 to a matching If-None-Match. Hashed names
+    are cached for a year, the others for settings.STATIC_MAX_AGE.
+    """
+
+    try:
+        full_path = safe_join(settings.STATIC_ROOT, path)
+    except SuspiciousFileOperation:
+        return HttpResponseNotFound()
+    range_header = request.META.get('HTTP_RANGE')
+    # Ranges are served from the file itself, not from a sibling.
+    found = find_file(
+        full_path, set() if range_header else get_accepted(request)
+    )
+    if found is None:
+        return HttpResponseNotFound()
+    file_path, encoding, file_stat = found
+    size = file_stat.st_size
+    etag = f'"{int(file_stat.st_mtime):x}-{size:x}"'
+    headers = {
+        'Cache-Control': (
+            IMMUTABLE if path in get_hashed_names(staticfiles_storage)
+            else f'public, max-age={settings.STATIC_MAX_AGE}'
+        ),
+        'Vary': 'Accept-Encoding',
+        'ETag': etag,
+        'Last-Modified': http_date(file_stat.st_mtime),
+    }
+    if_none_match = request.META.get('HTTP_IF_NONE_MATCH', '')
+    if {etag, '*'} & {tag.strip() for tag in if_none_match.split(',')}:
+        return set_headers(HttpResponseNotModified(), headers)
+
+    byte_range = None
+    if range_header and request.META.get('HTTP_IF_RANGE', etag) == etag:
+        byte_range = parse_range(range_header, size)
+    if byte_range == ():
+        response = HttpResponse(status=416)
+        response['Content-Range'] = f'bytes */{size}'
+        return response
+    start, stop = byte_range or (0, size)
+    response = get_body(request, file_path, start, stop, size)
+    if byte_range:
+        response.status_code = 206
+        headers['Content-Range'] = f'bytes {start}-{stop - 1}/{size}'
+    if encoding:
+        headers['Content-Encoding'] = encoding
+    headers.update({
+        'Content-Type': (
+            mimetypes.guess_type(full_path)[0] or 'application/octet-stream'
+        ),
+        'Content-Length': stop - start,
+        'Accept-Ranges': 'bytes',
+    })
+    return set_headers(response, headers)
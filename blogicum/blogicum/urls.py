@@ -5,6 +5,8 @@ from django.contrib.auth.forms import UserCreationForm
 from django.urls import path, include, reverse_lazy
 from django.views.generic.edit import CreateView
 
+from blogicum import views
+
 
 urlpatterns = [
     path('', include('blog.urls', namespace='blog')),
@@ -22,10 +24,22 @@ urlpatterns = [
     ),
 ] + static(settings.MEDIA_URL, document_root=settings.MEDIA_ROOT)
 
+if settings.METRICS:
+    urlpatterns += (path('metrics/', views.export_metrics, name='metrics'),)
+
+if settings.PROFILER:
+    urlpatterns += (
+        path('profiler/', views.profile_list, name='profiler_list'),
+        path(
+            'profiler/<str:name>/', views.profile_detail,
+            name='profiler_detail'
+        ),
+    )
+
 handler404 = 'pages.views.page_not_found'
 
 handler500 = 'pages.views.server_error'
 
-if settings.DEBUG:
+if settings.DEBUG_TOOLBAR:
     import debug_toolbar
     urlpatterns += (path('__debug__/', include(debug_toolbar.urls)),)
@@ -0,0 +1,38 @@
+from django.contrib.admin.views.decorators import staff_member_required
+from django.http import Http404, HttpResponse
+from django.shortcuts import render
+
+from blogicum import metrics, profiler
+
+PROMETHEUS_CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+
+@staff_member_required
+def export_metrics(request):
+    """Returns the metrics of this process in the Prometheus format."""
+
+    return HttpResponse(
+        metrics.expose(), content_type=PROMETHEUS_CONTENT_TYPE
+    )
+
+
+@staff_member_required
+def profile_list(request):
+    """Displays the stored request profiles on 'profiler/list.html'."""
+
+    return render(request, 'profiler/list.html', {
+        'profiles': [path.name for path in profiler.list_profiles()],
+    })
+
+
+@staff_member_required
+def profile_detail(request, name):
+    """Displays a stored request profile on 'profiler/detail.html'."""
+
+    try:
+        profile = profiler.load_profile(name)
+    except FileNotFoundError:
+        raise Http404
+    return render(request, 'profiler/detail.html', {
+        'name': name, 'profile': profile,
+    })
@@ -0,0 +1,56 @@
+import logging
+import queue
+import threading
+
+from django.db import close_old_connections
+
+logger = logging.getLogger(__name__)
+
+
+class Worker:
+    """
+    Background thread that runs the submitted jobs one after another,
+    so requests do not wait for work that may happen after them.
+    Jobs still queued when the process is killed are lost.
+    """
+
+    def __init__(self, name: str):
+        self.name = name
+        self.jobs = queue.Queue()
+        self.thread = threading.Thread(
+            target=self.run, name=name, daemon=True
+        )
+        self.thread.start()
+
+    def submit(self, job):
+        self.jobs.put(job)
+
+    def join(self):
+        """Waits until every submitted job has run."""
+
+        self.jobs.join()
+
+    def run(self):
+        while True:
+            job = self.jobs.get()
+            try:
+                job()
+            except Exception:
+                logger.exception('Job of the %s worker failed', self.name)
+            finally:
+                close_old_connections()
+                self.jobs.task_done()
+
+
+_workers = {}
+
+_lock = threading.Lock()
+
+
+def get_worker(name: str) -> Worker:
+    """Returns the process-wide worker of the name, started on first use."""
+
+    with _lock:
+        if name not in _workers:
+            _workers[name] = Worker(name)
+        return _workers[name]
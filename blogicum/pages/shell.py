@@ -0,0 +1,66 @@
+import hashlib
+
+from django.conf import settings
+from django.template.loader import render_to_string
+from django.utils.html import conditional_escape
+from django.utils.safestring import mark_safe
+from django.utils.translation import get_language
+
+HEADER_TEMPLATE = 'includes/header.html'
+
+HEADER_PLACEHOLDER = mark_safe('<!-- blogicum:header -->')
+
+_shells = {}
+
+
+def get_placeholder(slot: str) -> str:
+    """Returns the marker of a per-request value in a shell."""
+
+    return mark_safe(f'<!-- blogicum:slot:{slot} -->')
+
+
+def get_shell(template_name: str, slots=()) -> str:
+    """
+    Returns the page template rendered without a request, with
+    HEADER_PLACEHOLDER instead of the user dependent header and
+    a placeholder in every context variable named in slots.
+    The result is kept for the life of the process unless DEBUG is on,
+    so the page template is rendered once instead of on every hit.
+    """
+
+    key = (template_name, get_language())
+    shell = _shells.get(key)
+    if shell is None:
+        context = {slot: get_placeholder(slot) for slot in slots}
+        context['header_placeholder'] = HEADER_PLACEHOLDER
+        shell = render_to_string(template_name, context)
+        if not settings.DEBUG:
+            _shells[key] = shell
+    return shell
+
+
+def render_shell(request, shell: str, **values) -> str:
+    """
+    Returns the shell with the header rendered for the request
+    and the slots filled with the escaped values.
+    """
+
+    header = render_to_string(HEADER_TEMPLATE, request=request)
+    content = shell.replace(HEADER_PLACEHOLDER, header, 1)
+    for slot, value in values.items():
+        content = content.replace(
+            get_placeholder(slot), conditional_escape(value)
+        )
+    return content
+
+
+def get_etag(content: str) -> str:
+    """Returns a quoted strong ETag of the content."""
+
+    return '"%s"' % hashlib.md5(content.encode()).hexdigest()
+
+
+def clear_shells():
+    """Drops the rendered shells, e.g. after the templates changed."""
+
+    _shells.clear()
@@ -1,10 +1,12 @@
 from django.urls import path
 
+from blogicum.gateway import as_view
+
 from . import views
 
 app_name = 'pages'
 
 urlpatterns = [
-    path('about/', views.About.as_view(), name='about'),
-    path('rules/', views.Rules.as_view(), name='rules'),
+    path('about/', as_view(views.About), name='about'),
+    path('rules/', as_view(views.Rules), name='rules'),
 ]
@@ -1,32 +1,72 @@
-from django.shortcuts import render
+from django.http import HttpResponse
+from django.utils.cache import get_conditional_response
 from django.views.generic import TemplateView
 
+from blogicum import edge
 
-class About(TemplateView):
+from .shell import get_etag, get_shell, render_shell
+
+
+class CachedTemplateView(TemplateView):
+    """
+    TemplateView for pages without per-request content.
+    The page is rendered once per process into a shell, only the
+    user dependent header is rendered on every request.
+    Responses carry an ETag, so revalidations get 304, and
+    anonymous ones may be stored by shared caches.
+    """
+
+    def get(self, request, *args, **kwargs):
+        content = render_shell(request, get_shell(self.template_name))
+        etag = get_etag(content)
+        response = get_conditional_response(request, etag=etag)
+        if response is None:
+            response = HttpResponse(content)
+        response['ETag'] = etag
+        return edge.patch_edge_cache(request, response, [edge.PAGES])
+
+
+class About(CachedTemplateView):
     """CBV that displays about page on 'about.html'."""
 
     template_name = 'pages/about.html'
 
 
-class Rules(TemplateView):
+class Rules(CachedTemplateView):
     """CBV that displays rules page on 'rules.html'."""
 
     template_name = 'pages/rules.html'
 
 
+def render_error_page(request, template_name, status, **values):
+    """
+    Returns the error page from its prerendered shell, only the header
+    and the values of the slots are rendered per request, so storms of
+    errors do not render base.html every time.
+    """
+
+    shell = get_shell(template_name, slots=values)
+    return HttpResponse(
+        render_shell(request, shell, **values), status=status
+    )
+
+
 def page_not_found(request, exception):
     """Returns a custom 404 error page for this error"""
 
-    return render(request, 'pages/404.html', status=404)
+    return render_error_page(
+        request, 'pages/404.html', 404,
+        page_url=request.build_absolute_uri()
+    )
 
 
 def csrf_failure(request, reason=''):
     """Returns a custom 403 error page for this error"""
 
-    return render(request, 'pages/403csrf.html', status=403)
+    return render_error_page(request, 'pages/403csrf.html', 403)
 
 
 def server_error(request):
     """Returns a custom 500 error page for this error"""
 
-    return render(request, 'pages/500.html', status=500)
+    return render_error_page(request, 'pages/500.html', 500)
@@ -37,10 +37,92 @@ TitledUrlRepr = TypeVar("TitledUrlRepr", bound=Tuple[UrlRepr, str])
 
 @pytest.fixture(autouse=True)
 def enable_debug_false():
-    with override_settings(DEBUG=False):
+    # Visibility changes propagate inline, a background thread would
+    # write to the test database while the next test runs.
+    with override_settings(DEBUG=False, VISIBILITY_BACKGROUND=False):
         yield
 
 
+@pytest.fixture(autouse=True)
+def clear_caches():
+    from django.core.cache import caches
+    from blog import membership
+    from pages.shell import clear_shells
+
+    for cache in caches.all():
+        cache.clear()
+    clear_shells()
+    membership.reset()
+    yield
+
+
+# Query budgets of views: a test fails if a request of a view runs
+# more queries or repeats a query NPLUSONE_THRESHOLD times (N+1).
+QUERY_BUDGETS = {
+    "blog:index": 4,
+    "blog:category_posts": 7,
+    "blog:profile": 7,
+    "blog:post_detail": 5,
+}
+
+
+def pytest_addoption(parser):
+    parser.addoption(
+        "--no-query-budget",
+        action="store_true",
+        help="do not check query budgets and repeated queries of views",
+    )
+
+
+def pytest_configure(config):
+    config.addinivalue_line(
+        "markers", "query_budget(queries): query budget of the test views"
+    )
+
+
+@pytest.fixture(autouse=True)
+def query_reports(request, settings):
+    if request.config.getoption("--no-query-budget"):
+        yield []
+        return
+    from blogicum.nplusone import query_report_ready
+
+    reports = []
+
+    def collect(sender, view_name, report, **kwargs):
+        reports.append((view_name, report))
+
+    settings.MIDDLEWARE = [
+        "blogicum.middleware.QueryReportMiddleware", *settings.MIDDLEWARE
+    ]
+    request.node.query_reports = reports
+    query_report_ready.connect(collect)
+    yield reports
+    query_report_ready.disconnect(collect)
+
+
+@pytest.hookimpl(hookwrapper=True)
+def pytest_runtest_call(item):
+    outcome = yield
+    reports = getattr(item, "query_reports", ())
+    if outcome.excinfo is not None or not reports:
+        return
+    from django.conf import settings
+
+    marker = item.get_closest_marker("query_budget")
+    for view_name, report in reports:
+        repeated = report.format(settings.NPLUSONE_THRESHOLD)
+        assert not repeated, (
+            f"Во view `{view_name}` повторяются однотипные запросы к базе"
+            f" данных (N+1):\n{repeated}"
+        )
+        budget = marker.args[0] if marker else QUERY_BUDGETS.get(view_name)
+        assert budget is None or report.queries <= budget, (
+            f"Во view `{view_name}` выполняется {report.queries} запросов"
+            f" к базе данных, допустимо не больше {budget}."
+        )
+
+
 class SafeImportFromContextManager:
     def __init__(
             self,
@@ -0,0 +1,98 @@
+import datetime as dt
+
+import pytest
+from django.core.management import call_command
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from blog import archive
+from blog.models import ArchivedComment, ArchivedPost, Comment, Post
+
+
+@pytest.fixture
+def old_and_new_posts(mixer, user, another_user, published_category):
+    now = timezone.now()
+    old = mixer.cycle(12).blend(
+        "blog.Post", author=user, category=published_category,
+        is_published=True,
+        pub_date=(now - dt.timedelta(days=400 + day) for day in range(12)),
+    )
+    new = mixer.cycle(3).blend(
+        "blog.Post", author=user, category=published_category,
+        is_published=True,
+        pub_date=(now - dt.timedelta(days=day) for day in range(1, 4)),
+    )
+    for post in old[:2]:
+        mixer.blend(
+            "blog.Comment", post=post, author=another_user,
+            text=f"Комментарий к посту {post.id}",
+        )
+    return old, new
+
+
+@pytest.mark.django_db
+def test_archiving_is_incremental(old_and_new_posts):
+    old, new = old_and_new_posts
+    cutoff = archive.get_cutoff(365)
+    assert archive.archive_posts(cutoff, batch_size=5, limit=7) == 7
+    assert ArchivedPost.objects.count() == 7
+    call_command("archive_posts", "--days", "365", "--batch-size", "5")
+    assert set(Post.objects.values_list("pk", flat=True)) == {
+        post.pk for post in new
+    }, "Убедитесь, что в архив переносятся только старые публикации."
+    assert ArchivedPost.objects.count() == 12
+    assert not Comment.objects.exists()
+    assert ArchivedComment.objects.count() == 2
+    archived = ArchivedPost.objects.get(pk=old[0].pk)
+    assert (archived.title, archived.pub_date, archived.author_id) == (
+        old[0].title, old[0].pub_date, old[0].author_id
+    )
+    assert archive.archive_posts(cutoff) == 0
+
+
+@pytest.mark.django_db
+def test_archived_posts_stay_readable(client, old_and_new_posts):
+    old, new = old_and_new_posts
+    client.get(f"/posts/{new[0].id}/")
+    archive.archive_posts(archive.get_cutoff(365))
+
+    response = client.get(f"/posts/{old[0].id}/")
+    assert response.status_code == 200, (
+        "Убедитесь, что страница архивной публикации доступна по её id."
+    )
+    content = response.content.decode()
+    assert old[0].title in content
+    assert f"Комментарий к посту {old[0].id}" in content
+
+    with CaptureQueriesContext(connection) as captured:
+        response = client.get("/")
+    assert len(response.context["page_obj"]) == 3
+    assert not any(
+        "archived" in query["sql"] for query in captured.captured_queries
+    ), "Убедитесь, что лента читает только таблицы живых публикаций."
+
+    username = old[0].author.username
+    page = client.get(f"/profile/{username}/").context["page_obj"]
+    assert page.paginator.count == 15
+    assert [post.pk for post in page] == [
+        post.pk for post in (*new, *old[:7])
+    ], "Убедитесь, что архивные публикации идут в профиле после живых."
+    page = client.get(f"/profile/{username}/?page=2").context["page_obj"]
+    assert [post.pk for post in page] == [post.pk for post in old[7:]]
+    assert page[0].comment_count == 0
+
+
+@pytest.mark.django_db
+def test_archiving_does_not_count_per_row(old_and_new_posts):
+    old, new = old_and_new_posts
+    with CaptureQueriesContext(connection) as captured:
+        archive.archive_posts(archive.get_cutoff(365), batch_size=6)
+    updates = [
+        query["sql"] for query in captured.captured_queries
+        if query["sql"].startswith("UPDATE")
+    ]
+    assert len(updates) == 2, (
+        "Убедитесь, что счётчики пересчитываются один раз на пачку постов, "
+        "а не на каждую удалённую строку."
+    )
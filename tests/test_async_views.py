@@ -0,0 +1,108 @@
+import asyncio
+import time
+
+import pytest
+from asgiref.sync import SyncToAsync, async_to_sync
+from django.conf import settings
+from django.contrib.auth.models import AnonymousUser
+from django.core.handlers.asgi import ASGIHandler
+from django.test import AsyncClient, RequestFactory, override_settings
+from django.utils.module_loading import import_string
+
+from blog.views import PostDetailView
+from blogicum import metrics
+from blogicum.gateway import ORMGateway, async_view, reset_gateway
+from pages.views import About
+
+
+@pytest.fixture
+def gateway():
+    yield
+    reset_gateway()
+
+
+def test_async_view_keeps_view_class(gateway):
+    handler = async_view(About)
+    assert asyncio.iscoroutinefunction(handler)
+    assert handler.view_class is About
+
+
+@pytest.mark.django_db(transaction=True)
+def test_async_post_detail(gateway, post_with_published_location):
+    post = post_with_published_location
+    request = RequestFactory().get(f"/posts/{post.id}/")
+    request.user = AnonymousUser()
+    response = async_to_sync(async_view(PostDetailView))(
+        request, post_pk=post.id
+    )
+    assert response.status_code == 200
+    assert post.title in response.content.decode("utf-8"), (
+        "Убедитесь, что асинхронная страница поста отображает пост."
+    )
+
+
+def test_gateway_bounds_concurrency():
+    gateway = ORMGateway(max_workers=2)
+    running = []
+    peak = []
+
+    def work():
+        running.append(1)
+        peak.append(len(running))
+        time.sleep(0.01)
+        running.pop()
+
+    async def run_many():
+        await asyncio.gather(*(gateway.run(work) for _ in range(10)))
+
+    async_to_sync(run_many)()
+    gateway.executor.shutdown()
+    assert max(peak) <= 2
+
+
+AUTHENTICATION = "django.contrib.auth.middleware.AuthenticationMiddleware"
+
+
+@pytest.mark.django_db(transaction=True)
+@pytest.mark.parametrize("extra, after", [
+    (None, None),
+    # Added with BLOGICUM_DB_REPLICAS.
+    ("blogicum.middleware.ReplicaRoutingMiddleware", AUTHENTICATION),
+    # Added first with BLOGICUM_STATIC_SERVE.
+    ("blogicum.middleware.StaticFilesMiddleware", None),
+])
+def test_asgi_middleware_chain_is_async(caplog, extra, after):
+    # The default chain, without the debug and test-only middleware.
+    middleware = [
+        name for name in settings.MIDDLEWARE
+        if "debug_toolbar" not in name and "QueryReport" not in name
+    ]
+    assert "blogicum.middleware.MetricsMiddleware" in middleware
+    if extra:
+        middleware.insert(
+            middleware.index(after) + 1 if after else 0, extra
+        )
+    with override_settings(MIDDLEWARE=middleware):
+        with caplog.at_level("DEBUG", logger="django.request"):
+            handler = ASGIHandler()
+            chain = handler._middleware_chain
+        assert not isinstance(chain, SyncToAsync)
+        assert asyncio.iscoroutinefunction(chain)
+        native = {
+            type(method.__self__) for method in handler._view_middleware
+            if not isinstance(method, SyncToAsync)
+        }
+        if extra and hasattr(import_string(extra), "process_view"):
+            assert import_string(extra) in native, (
+                "Убедитесь, что process_view не выполняется в потоке "
+                "под ASGI."
+            )
+        assert "adapted" not in caplog.text, (
+            "Убедитесь, что middleware проекта работают без перехода "
+            "в поток под ASGI."
+        )
+        metrics.reset()
+        response = async_to_sync(AsyncClient().get)("/pages/about/")
+    assert response.status_code == 200
+    assert metrics.REQUESTS.values
+    metrics.reset()
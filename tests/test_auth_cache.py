@@ -0,0 +1,38 @@
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+
+def count_queries(client, url):
+    with CaptureQueriesContext(connection) as captured:
+        assert client.get(url).status_code == 200
+    return len(captured.captured_queries)
+
+
+@pytest.mark.django_db
+def test_authenticated_views_do_not_load_session_and_user(
+    client, user_client, post_with_published_location
+):
+    url = f"/posts/{post_with_published_location.id}/"
+    client.get(url)
+    anonymous = count_queries(client, url)
+    user_client.get(url)
+    assert count_queries(user_client, url) == anonymous, (
+        "Убедитесь, что сессия и пользователь авторизованного запроса"
+        " берутся из кеша, без запросов к базе данных."
+    )
+
+
+@pytest.mark.django_db
+def test_changed_user_is_not_served_from_cache(user, user_client):
+    user_client.get("/")
+    user.first_name = "Изменённое"
+    user.save()
+    response = user_client.get(f"/profile/{user.username}/")
+    assert response.context["user"].first_name == "Изменённое", (
+        "Убедитесь, что после изменения пользователя кеш сбрасывается."
+    )
+    user.is_active = False
+    user.save()
+    response = user_client.get("/")
+    assert not response.context["user"].is_authenticated
@@ -0,0 +1,43 @@
+import json
+
+import pytest
+from django.core.management import call_command
+
+from blog import benchmark
+from blog.models import Comment, Post
+
+pytestmark = [pytest.mark.django_db]
+
+
+def test_percentile():
+    samples = [i / 1000 for i in range(1, 101)]
+    assert benchmark.percentile(samples, 50) == 0.05
+    assert benchmark.percentile(samples, 99) == 0.099
+    assert benchmark.summarize(samples)["p90_ms"] == 90.0
+
+
+def test_generate_data_and_benchmark(tmp_path):
+    call_command(
+        "generate_data", "--users", "5", "--categories", "2",
+        "--locations", "3", "--posts", "40", "--comments", "100",
+        "--unpublished", "0", "--future", "0",
+    )
+    assert Post.objects.count() == 40
+    assert Comment.objects.count() == 100
+
+    call_command(
+        "benchmark_views", "--repeat", "2", "--warmup", "0",
+        "--output-dir", str(tmp_path),
+    )
+    results_file, = tmp_path.iterdir()
+    results = json.loads(results_file.read_text())["results"]
+    names = {result["name"] for result in results}
+    assert {"blog:index", "blog:post_detail", "pages:about"} <= names, (
+        "Убедитесь, что бенчмарк измеряет все страницы блога."
+    )
+    for result in results:
+        assert result["queries"] >= 0 and result["p50_ms"] > 0
+    index, = (result for result in results if result["name"] == "blog:index")
+    assert {"blog/index.html", "includes/post_card.html"} <= {
+        timing["template"] for timing in index["templates"]
+    }, "Убедитесь, что бенчмарк измеряет время рендера каждого шаблона."
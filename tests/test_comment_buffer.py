@@ -0,0 +1,99 @@
+import datetime as dt
+
+import pytest
+from django.db import connection
+from django.test import override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from blog import archive, comment_buffer
+from blog.models import Comment
+
+
+@pytest.fixture
+def buffered_comments():
+    comment_buffer.reset()
+    with override_settings(
+        COMMENT_BUFFER=True, COMMENT_BUFFER_SIZE=3, COMMENT_BUFFER_INTERVAL=0
+    ):
+        yield comment_buffer
+    comment_buffer.reset()
+
+
+@pytest.mark.django_db
+def test_queued_comment_is_seen_by_its_author(
+    buffered_comments, user_client, another_user_client,
+    post_with_published_location
+):
+    post = post_with_published_location
+    url = f"/posts/{post.id}/"
+    user_client.get(url)
+    with CaptureQueriesContext(connection) as captured:
+        response = user_client.post(
+            f"{url}comment/", {"text": "Комментарий из очереди"}
+        )
+    assert response.status_code == 302
+    assert not any(
+        "blog_comment" in query["sql"] or "blog_post" in query["sql"]
+        for query in captured.captured_queries
+    ), "Убедитесь, что комментарий в очереди не требует запросов к постам."
+    assert not Comment.objects.exists()
+
+    assert "Комментарий из очереди" in user_client.get(url).content.decode(), (
+        "Убедитесь, что автор видит свой комментарий до записи в базу."
+    )
+    assert "Комментарий из очереди" not in (
+        another_user_client.get(url).content.decode()
+    )
+
+    assert buffered_comments.get_buffer().flush() == 1
+    content = user_client.get(url).content.decode()
+    assert content.count("Комментарий из очереди") == 1, (
+        "Убедитесь, что записанный комментарий показан автору один раз."
+    )
+    assert not user_client.session[comment_buffer.PENDING_SESSION_KEY]
+
+
+@pytest.mark.django_db
+def test_comments_are_written_in_batches(
+    buffered_comments, user_client, post_with_published_location, mixer, user
+):
+    post = post_with_published_location
+    deleted = mixer.blend("blog.Post", author=user)
+    user_client.post(f"/posts/{deleted.id}/comment/", {"text": "Удалённый"})
+    deleted.delete()
+    for index in range(2):
+        assert not Comment.objects.exists()
+        user_client.post(f"/posts/{post.id}/comment/", {"text": index})
+    assert Comment.objects.count() == 2, (
+        "Убедитесь, что полная пачка комментариев записывается сразу,"
+        " а комментарии к удалённым постам пропускаются."
+    )
+
+    buffer = buffered_comments.get_buffer()
+    buffer.append(Comment(post=deleted, author=user, text="Поздний"))
+    assert buffer.flush() == 0
+    assert not buffer.comments
+
+
+@pytest.mark.django_db
+# An archived post is looked up in the live table first.
+@pytest.mark.query_budget(6)
+def test_pending_comment_of_archived_post_is_dropped(
+    buffered_comments, user_client, mixer, user, published_category
+):
+    post = mixer.blend(
+        "blog.Post", author=user, category=published_category,
+        is_published=True, pub_date=timezone.now() - dt.timedelta(days=400),
+    )
+    url = f"/posts/{post.id}/"
+    user_client.post(f"{url}comment/", {"text": "Комментарий из очереди"})
+    assert archive.archive_posts(archive.get_cutoff(365)) == 1
+    assert user_client.get(url).status_code == 200, (
+        "Убедитесь, что страница архивного поста открывается с комментарием "
+        "в очереди."
+    )
+    assert not user_client.session[comment_buffer.PENDING_SESSION_KEY]
+    assert buffered_comments.get_buffer().flush() == 0, (
+        "Убедитесь, что комментарий архивного поста не записывается."
+    )
@@ -0,0 +1,34 @@
+import pytest
+from django.db import connection
+
+from blogicum.db import apply_sqlite_pragmas
+
+
+@pytest.mark.django_db
+def test_sqlite_pragmas_applied_on_connect():
+    if connection.vendor != "sqlite":
+        pytest.skip("SQLite only")
+    with connection.cursor() as cursor:
+        cursor.execute("PRAGMA synchronous")
+        synchronous, = cursor.fetchone()
+        cursor.execute("PRAGMA busy_timeout")
+        busy_timeout, = cursor.fetchone()
+    assert synchronous == 1, "Ожидается synchronous=NORMAL."
+    assert busy_timeout == 5000
+
+
+@pytest.mark.django_db
+def test_sqlite_pragmas_are_validated():
+    if connection.vendor != "sqlite":
+        pytest.skip("SQLite only")
+    settings_dict = connection.settings_dict
+    pragmas = settings_dict.get("PRAGMAS")
+    try:
+        settings_dict["PRAGMAS"] = {"synchronous": "OFF; DROP TABLE x"}
+        with pytest.raises(ValueError):
+            apply_sqlite_pragmas(sender=None, connection=connection)
+        settings_dict["PRAGMAS"] = {"user_version": "1"}
+        with pytest.raises(ValueError):
+            apply_sqlite_pragmas(sender=None, connection=connection)
+    finally:
+        settings_dict["PRAGMAS"] = pragmas
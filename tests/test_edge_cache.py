@@ -0,0 +1,110 @@
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, HTTPServer
+
+import pytest
+from django.test import override_settings
+
+from blogicum import edge, workers
+
+
+@pytest.fixture
+def purge_receiver():
+    """Local stand-in of the purge endpoint of a CDN."""
+
+    received = []
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_POST(self):
+            length = int(self.headers["Content-Length"])
+            received.append(json.loads(self.rfile.read(length)))
+            self.send_response(204)
+            self.end_headers()
+
+        def log_message(self, *args):
+            pass
+
+    server = HTTPServer(("127.0.0.1", 0), Handler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    with override_settings(
+        EDGE_PURGE_URL=f"http://127.0.0.1:{server.server_port}/purge"
+    ):
+        yield received
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.mark.django_db
+def test_anonymous_pages_are_cacheable_with_surrogate_keys(
+    client, post_with_published_location
+):
+    post = post_with_published_location
+    response = client.get("/")
+    cache_control = response["Cache-Control"]
+    for directive in ("public", "s-maxage=60", "stale-while-revalidate=300"):
+        assert directive in cache_control, (
+            "Убедитесь, что страницы для анонимных пользователей можно"
+            f" хранить в общем кеше: нет `{directive}` в Cache-Control."
+        )
+    keys = response["Surrogate-Key"].split()
+    assert {
+        "feed", f"post-{post.id}", f"category-{post.category_id}",
+        f"author-{post.author_id}", f"location-{post.location_id}",
+    } <= set(keys), "Убедитесь, что ответ перечисляет ключи своих объектов."
+
+    keys = client.get(f"/posts/{post.id}/")["Surrogate-Key"].split()
+    assert f"post-{post.id}" in keys and "feed" not in keys
+    assert "pages" in client.get("/pages/about/")["Surrogate-Key"]
+
+
+@pytest.mark.django_db
+def test_session_pages_are_private(user_client):
+    response = user_client.get("/")
+    assert "private" in response["Cache-Control"]
+    assert "Surrogate-Key" not in response
+
+
+@pytest.mark.django_db
+def test_changes_purge_their_keys(
+    purge_receiver, django_capture_on_commit_callbacks,
+    post_with_published_location, mixer, user
+):
+    post = post_with_published_location
+    with django_capture_on_commit_callbacks(execute=True):
+        post.title = "Новый заголовок"
+        post.save()
+    workers.get_worker(edge.WORKER).join()
+    keys = set(purge_receiver.pop()["keys"])
+    assert {
+        "feed", f"post-{post.id}", f"category-{post.category_id}",
+        f"author-{post.author_id}",
+    } <= keys, "Убедитесь, что изменение поста сбрасывает его ключи."
+
+    with django_capture_on_commit_callbacks(execute=True):
+        mixer.blend("blog.Comment", post=post, author=user)
+    workers.get_worker(edge.WORKER).join()
+    assert purge_receiver.pop()["keys"] == [f"post-{post.id}"]
+
+
+@pytest.mark.django_db
+def test_purges_are_sent_in_background(
+    purge_receiver, django_capture_on_commit_callbacks,
+    post_with_published_location, monkeypatch
+):
+    threads = []
+    send_purge = edge.send_purge
+
+    def record_thread(keys):
+        threads.append(threading.current_thread())
+        send_purge(keys)
+
+    monkeypatch.setattr(edge, "send_purge", record_thread)
+    with django_capture_on_commit_callbacks(execute=True):
+        post_with_published_location.save()
+    workers.get_worker(edge.WORKER).join()
+    assert threads and threading.current_thread() not in threads, (
+        "Убедитесь, что сброс кеша отправляется фоновым потоком, "
+        "а не потоком запроса."
+    )
+    assert purge_receiver
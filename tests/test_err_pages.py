@@ -7,8 +7,13 @@ from importlib import import_module
 import pytest
 from django.conf import settings
 from django.http import HttpRequest
+from django.test import override_settings
 from pytest_django.asserts import assertTemplateUsed
 
+from blog import negative_cache
+from blog.views import PostDetailView
+from blogicum.routers import use_replicas
+
 
 def test_csrf_failure_view():
     csrf_failure_view_setting = getattr(settings, "CSRF_FAILURE_VIEW", "")
@@ -114,3 +119,57 @@ def test_custom_err_handlers(client, user_client):
     )
 
     settings.DEBUG = debug
+
+
+@pytest.mark.django_db
+def test_missing_post_is_negatively_cached(
+    client, django_assert_num_queries, post_with_published_location
+):
+    missing_id = post_with_published_location.id + 1000
+    response = client.get(f"/posts/{missing_id}/")
+    assert response.status_code == 404
+    assert f"/posts/{missing_id}/" in response.content.decode("utf-8")
+
+    with django_assert_num_queries(0):
+        response = client.get(f"/posts/{missing_id}/")
+    assert response.status_code == 404, (
+        "Убедитесь, что повторный запрос несуществующего поста не обращается"
+        " к базе данных."
+    )
+    assert [t.name for t in response.templates] == ["includes/header.html"]
+
+
+@pytest.mark.django_db
+def test_created_post_leaves_negative_cache(
+    client, mixer, user, published_category
+):
+    missing_id = 424242
+    assert client.get(f"/posts/{missing_id}/").status_code == 404
+    mixer.blend(
+        "blog.Post", id=missing_id, author=user, category=published_category
+    )
+    assert client.get(f"/posts/{missing_id}/").status_code == 200
+
+
+@pytest.mark.django_db
+def test_replica_miss_is_confirmed_on_primary(
+    client, mixer, user, published_category, monkeypatch
+):
+    post = mixer.blend(
+        "blog.Post", author=user, category=published_category,
+        is_published=True,
+    )
+    get_post = PostDetailView.get_post
+
+    def get_post_from_lagging_replica(self, model, pk, using=None):
+        return get_post(self, model, pk, using) if using else None
+
+    monkeypatch.setattr(
+        PostDetailView, "get_post", get_post_from_lagging_replica
+    )
+    with override_settings(REPLICA_DATABASES=["replica1"]), use_replicas():
+        assert client.get(f"/posts/{post.id}/").status_code == 200, (
+            "Убедитесь, что пост, которого ещё нет на реплике, "
+            "ищется на основной базе."
+        )
+    assert not negative_cache.is_missing(negative_cache.POST, post.id)
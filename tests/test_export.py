@@ -0,0 +1,67 @@
+import csv
+import io
+import json
+
+import pytest
+from django.core.management import call_command
+from django.test import Client
+
+pytestmark = [pytest.mark.django_db]
+
+
+@pytest.fixture
+def staff_client(mixer):
+    staff = mixer.blend("auth.User", is_staff=True)
+    client = Client()
+    client.force_login(staff)
+    return client
+
+
+def test_export_view_is_staff_only(user_client, unlogged_client):
+    assert user_client.get("/export/posts/").status_code == 403, (
+        "Убедитесь, что выгрузка недоступна обычным пользователям."
+    )
+    assert unlogged_client.get("/export/posts/").status_code == 302
+
+
+def test_export_view_streams_csv_and_resumes(
+    staff_client, many_posts_with_published_locations
+):
+    posts = sorted(many_posts_with_published_locations, key=lambda p: p.id)
+    response = staff_client.get("/export/posts/")
+    assert response.status_code == 200
+    assert response.streaming, "Убедитесь, что выгрузка отдаётся потоком."
+    content = b"".join(response.streaming_content).decode("utf-8")
+    rows = list(csv.DictReader(io.StringIO(content)))
+    assert [int(row["id"]) for row in rows] == [post.id for post in posts]
+
+    checkpoint = posts[4].id
+    response = staff_client.get(
+        f"/export/posts/?format=jsonl&after={checkpoint}"
+    )
+    lines = b"".join(response.streaming_content).decode("utf-8").splitlines()
+    exported = [json.loads(line)["id"] for line in lines]
+    assert exported == [post.id for post in posts[5:]], (
+        "Убедитесь, что выгрузка продолжается с указанной контрольной точки."
+    )
+
+
+def test_export_command_checkpoint(tmp_path, mixer):
+    categories = mixer.cycle(5).blend("blog.Category")
+    output = tmp_path / "categories.jsonl"
+    checkpoint = tmp_path / "categories.checkpoint"
+    call_command(
+        "export_data", "categories", "--format", "jsonl",
+        "--output", str(output), "--checkpoint", str(checkpoint),
+        "--chunk-size", "2",
+    )
+    assert checkpoint.read_text() == str(categories[-1].id)
+
+    more = mixer.cycle(2).blend("blog.Category")
+    call_command(
+        "export_data", "categories", "--format", "jsonl",
+        "--output", str(output), "--checkpoint", str(checkpoint),
+    )
+    ids = [json.loads(line)["id"] for line in output.read_text().split("\n")
+           if line]
+    assert ids == [category.id for category in categories + more]
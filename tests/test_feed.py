@@ -0,0 +1,112 @@
+import datetime as dt
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from blog import feed
+from blog.models import FeedEntry, Post
+
+
+def get_cards():
+    return {
+        entry.post_id: (
+            entry.title, entry.author_username, entry.category_slug,
+            entry.location_name, entry.comment_count,
+        )
+        for entry in FeedEntry.objects.all()
+    }
+
+
+@pytest.mark.django_db
+def test_feed_is_read_from_one_table(
+    client, post_with_published_location, mixer, user
+):
+    post = post_with_published_location
+    mixer.cycle(2).blend("blog.Comment", post=post, author=user)
+    client.get("/")
+    with CaptureQueriesContext(connection) as captured:
+        response = client.get("/")
+    assert not any(
+        "blog_post" in query["sql"] for query in captured.captured_queries
+    ), "Убедитесь, что лента читает карточки без JOIN с публикациями."
+    card = response.context["page_obj"][0]
+    assert isinstance(card, Post)
+    assert (card.pk, card.title, card.author.username, card.comment_count) == (
+        post.pk, post.title, user.username, 2
+    )
+    assert post.location.name in response.content.decode()
+
+    response = client.get(f"/category/{post.category.slug}/")
+    assert [card.pk for card in response.context["page_obj"]] == [post.pk]
+
+
+@pytest.mark.django_db
+def test_cards_follow_changes(
+    post_with_published_location, mixer, user, published_category,
+    django_capture_on_commit_callbacks,
+):
+    post = post_with_published_location
+    future = mixer.blend(
+        "blog.Post", author=user, category=published_category,
+        is_published=True,
+        pub_date=timezone.now() + dt.timedelta(days=1),
+    )
+    assert set(get_cards()) == {post.pk, future.pk}
+    assert future.pk not in feed.get_entries().values_list(
+        "post_id", flat=True
+    ), "Убедитесь, что отложенные публикации не видны в ленте до даты."
+
+    comment = mixer.blend("blog.Comment", post=post, author=user)
+    post.location.name = "Новое место"
+    with django_capture_on_commit_callbacks(execute=True):
+        post.location.save()
+    user.username = "renamed"
+    user.save()
+    assert get_cards()[post.pk] == (
+        post.title, "renamed", post.category.slug, "Новое место", 1
+    )
+    comment.delete()
+    assert get_cards()[post.pk][-1] == 0
+
+    post.category.is_published = False
+    with django_capture_on_commit_callbacks(execute=True):
+        post.category.save()
+    assert post.pk not in get_cards(), (
+        "Убедитесь, что карточки постов скрытой категории удаляются."
+    )
+    post.category.is_published = True
+    with django_capture_on_commit_callbacks(execute=True):
+        post.category.save()
+    post.is_published = False
+    post.save()
+    assert post.pk not in get_cards()
+
+    cards = get_cards()
+    assert feed.rebuild() == len(cards)
+    assert get_cards() == cards
+
+
+@pytest.mark.django_db
+def test_deleted_post_comments_are_not_uncounted(
+    mixer, user, published_category
+):
+    deleted, kept = mixer.cycle(2).blend(
+        "blog.Post", author=user, category=published_category,
+        is_published=True,
+    )
+    mixer.cycle(3).blend("blog.Comment", post=deleted, author=user)
+    with CaptureQueriesContext(connection) as captured:
+        deleted.delete()
+    assert not any(
+        query["sql"].startswith('UPDATE "blog_feedentry"')
+        for query in captured.captured_queries
+    ), "Убедитесь, что карточка удаляемого поста не обновляется по строкам."
+
+    comment = mixer.blend("blog.Comment", post=kept, author=user)
+    FeedEntry.objects.filter(post=kept).update(comment_count=0)
+    comment.delete()
+    assert get_cards()[kept.pk][-1] == 0, (
+        "Убедитесь, что счётчик комментариев не становится отрицательным."
+    )
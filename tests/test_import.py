@@ -0,0 +1,201 @@
+import json
+
+import pytest
+from django.core.management import CommandError, call_command
+from django.db import IntegrityError
+
+from blog.models import Category, Comment, Post
+from blog.signals import posts_bulk_changed
+
+pytestmark = [pytest.mark.django_db]
+
+
+def write_jsonl(path, records):
+    path.write_text(
+        "\n".join(json.dumps(record) for record in records),
+        encoding="utf-8",
+    )
+
+
+def test_import_posts_and_comments(tmp_path, user, published_category):
+    posts_file = tmp_path / "posts.jsonl"
+    write_jsonl(posts_file, [
+        {
+            "title": f"Пост {i}",
+            "text": "Текст",
+            "pub_date": "2023-01-01T10:00:00+00:00",
+            "author": user.username if i % 2 else "new_author",
+            "category": published_category.slug if i % 2 else "new-slug",
+            "location": "Москва",
+        }
+        for i in range(5)
+    ])
+    received = []
+
+    def receiver(sender, pks, action, **kwargs):
+        received.append(pks)
+
+    posts_bulk_changed.connect(receiver)
+    try:
+        call_command(
+            "import_posts", str(posts_file), "--batch-size", "2",
+            "--create-missing",
+        )
+    finally:
+        posts_bulk_changed.disconnect(receiver)
+    assert Post.objects.count() == 5
+    assert Category.objects.filter(slug="new-slug").exists(), (
+        "Убедитесь, что импорт создаёт недостающие категории."
+    )
+    assert len(received) == 1 and len(received[0]) == 5, (
+        "Убедитесь, что после импорта сигнал отправляется один раз."
+    )
+
+    post = Post.objects.first()
+    comments_file = tmp_path / "comments.jsonl"
+    write_jsonl(comments_file, [
+        {"post": post.id, "author": user.username, "text": f"К {i}"}
+        for i in range(3)
+    ])
+    call_command("import_posts", str(comments_file), "--kind", "comments")
+    assert post.comments.count() == 3
+
+
+def test_import_resumes_from_checkpoint(tmp_path, user, published_category):
+    posts_file = tmp_path / "posts.jsonl"
+    write_jsonl(posts_file, [
+        {
+            "title": f"Пост {i}",
+            "text": "Текст",
+            "pub_date": "2023-01-01T10:00:00+00:00",
+            "author": user.username,
+            "category": published_category.slug,
+        }
+        for i in range(4)
+    ])
+    checkpoint = tmp_path / "import.checkpoint"
+    checkpoint.write_text("3")
+    call_command(
+        "import_posts", str(posts_file), "--checkpoint", str(checkpoint)
+    )
+    assert list(Post.objects.values_list("title", flat=True)) == ["Пост 3"], (
+        "Убедитесь, что импорт пропускает записи до контрольной точки."
+    )
+    assert checkpoint.read_text() == "4"
+    assert not Comment.objects.exists()
+
+
+@pytest.mark.parametrize("field, value, error", [
+    ("author", "nobody", "Record 3: author 'nobody' does not exist"),
+    ("pub_date", "01.01.2023", "Record 3: pub_date '01.01.2023' is not"),
+    ("pub_date", "2023-13-01T10:00:00", "Record 3: pub_date"),
+    ("title", "", "Record 3: title is missing"),
+])
+def test_invalid_record_is_reported(
+    tmp_path, user, published_category, field, value, error
+):
+    records = [
+        {
+            "title": f"Пост {i}",
+            "text": "Текст",
+            "pub_date": "2023-01-01T10:00:00+00:00",
+            "author": user.username,
+            "category": published_category.slug,
+        }
+        for i in range(4)
+    ]
+    records[2][field] = value
+    posts_file = tmp_path / "posts.jsonl"
+    write_jsonl(posts_file, records)
+    with pytest.raises(CommandError, match=error):
+        call_command("import_posts", str(posts_file), "--batch-size", "2")
+    assert Post.objects.count() == 2, (
+        "Убедитесь, что импорт останавливается на некорректной записи, "
+        "сохранив предыдущие пачки."
+    )
+
+
+def test_comment_of_unknown_post_is_reported(tmp_path, user):
+    comments_file = tmp_path / "comments.jsonl"
+    write_jsonl(comments_file, [
+        {"post": 424242, "author": user.username, "text": "Комментарий"}
+    ])
+    with pytest.raises(CommandError, match="Record 1: post 424242"):
+        call_command(
+            "import_posts", str(comments_file), "--kind", "comments"
+        )
+    assert not Comment.objects.exists()
+
+
+@pytest.mark.parametrize("line, error", [
+    ('{"title": "a"', "Record 3: Expecting"),
+    ("[1, 2]", "Record 3: not a JSON object"),
+])
+def test_malformed_line_is_reported(
+    tmp_path, user, published_category, line, error
+):
+    records = [
+        json.dumps({
+            "title": f"Пост {i}",
+            "text": "Текст",
+            "pub_date": "2023-01-01T10:00:00+00:00",
+            "author": user.username,
+            "category": published_category.slug,
+        })
+        for i in range(2)
+    ]
+    posts_file = tmp_path / "posts.jsonl"
+    posts_file.write_text("\n".join([*records, line]), encoding="utf-8")
+    received = []
+
+    def receiver(sender, pks, action, **kwargs):
+        received.extend(pks)
+
+    posts_bulk_changed.connect(receiver)
+    try:
+        with pytest.raises(CommandError, match=error):
+            call_command(
+                "import_posts", str(posts_file), "--batch-size", "2"
+            )
+    finally:
+        posts_bulk_changed.disconnect(receiver)
+    assert sorted(received) == sorted(
+        Post.objects.values_list("pk", flat=True)
+    ) and len(received) == 2, (
+        "Убедитесь, что после ошибки импорта сигнал отправляется "
+        "для уже сохранённых пачек."
+    )
+
+
+def test_failed_insert_still_finishes_import(
+    tmp_path, user, published_category
+):
+    posts_file = tmp_path / "posts.jsonl"
+    write_jsonl(posts_file, [
+        {
+            "id": 9000 + i % 3,
+            "title": f"Пост {i}",
+            "text": "Текст",
+            "pub_date": "2023-01-01T10:00:00+00:00",
+            "author": user.username,
+            "category": published_category.slug,
+        }
+        for i in range(4)
+    ])
+    received = []
+
+    def receiver(sender, pks, action, **kwargs):
+        received.extend(pks)
+
+    posts_bulk_changed.connect(receiver)
+    try:
+        with pytest.raises(IntegrityError):
+            call_command(
+                "import_posts", str(posts_file), "--batch-size", "2"
+            )
+    finally:
+        posts_bulk_changed.disconnect(receiver)
+    assert sorted(received) == [9000, 9001], (
+        "Убедитесь, что после ошибки импорта сигнал отправляется "
+        "для уже сохранённых пачек."
+    )
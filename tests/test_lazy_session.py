@@ -0,0 +1,33 @@
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize("url", ["/", "/pages/about/", "detail"])
+def test_anonymous_pages_do_not_vary_on_cookie(
+    client, url, post_with_published_location
+):
+    if url == "detail":
+        url = f"/posts/{post_with_published_location.id}/"
+    with CaptureQueriesContext(connection) as captured:
+        response = client.get(url)
+    assert response.status_code == 200
+    assert "Cookie" not in response.get("Vary", ""), (
+        "Убедитесь, что ответы анонимным пользователям без cookie сессии"
+        " не содержат `Vary: Cookie`."
+    )
+    assert not response.cookies
+    assert not any(
+        "django_session" in query["sql"]
+        for query in captured.captured_queries
+    )
+
+
+@pytest.mark.django_db
+def test_pages_of_session_vary_on_cookie(user_client):
+    response = user_client.get("/")
+    assert "Cookie" in response["Vary"], (
+        "Убедитесь, что ответы запросам с cookie сессии содержат"
+        " `Vary: Cookie`."
+    )
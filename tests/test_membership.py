@@ -0,0 +1,116 @@
+import pytest
+from django.test import override_settings
+
+from blog import membership
+from blog.models import Category
+from blogicum.routers import ReplicaRouter
+
+
+def test_id_bitmap_reports_only_definite_misses():
+    bitmap = membership.IdBitmap(membership.POST, lambda: [1, 3, 10])
+    bitmap.refresh()
+    assert bitmap.contains(3)
+    assert not bitmap.contains(2), (
+        "Убедитесь, что id без поста ниже максимального считается"
+        " отсутствующим."
+    )
+    assert bitmap.contains(11), (
+        "Убедитесь, что id выше максимального на момент построения"
+        " не считается отсутствующим: его мог создать другой процесс."
+    )
+    bitmap.discard(3)
+    assert not bitmap.contains(3)
+    bitmap.add(2)
+    assert bitmap.contains(2)
+
+
+@pytest.mark.django_db
+def test_filter_is_rebuilt_when_shared_version_changes():
+    keys = ["first"]
+    key_set = membership.KeySet(membership.CATEGORY, lambda: keys)
+    assert not key_set.may_exist("second")
+    keys.append("second")
+    membership.bump_version(membership.CATEGORY)
+    key_set.checked_at = 0.0
+    assert key_set.may_exist("second"), (
+        "Убедитесь, что фильтр перестраивается после изменения версии"
+        " в общем кэше."
+    )
+
+
+@pytest.mark.django_db
+def test_deleted_post_is_answered_without_query(
+    client, django_assert_num_queries, mixer, user, published_category
+):
+    deleted, kept = mixer.cycle(2).blend(
+        "blog.Post", author=user, category=published_category
+    )
+    assert client.get(f"/posts/{kept.id}/").status_code == 200
+    deleted.delete()
+    with django_assert_num_queries(0):
+        response = client.get(f"/posts/{deleted.id}/")
+    assert response.status_code == 404, (
+        "Убедитесь, что запрос удалённого поста отвечает 404 без обращения"
+        " к базе данных."
+    )
+
+
+@pytest.mark.django_db
+def test_unknown_category_and_profile_are_answered_without_query(
+    client, django_assert_num_queries, mixer, user, published_category
+):
+    category_url = f"/category/{published_category.slug}/"
+    profile_url = f"/profile/{user.username}/"
+    assert client.get(category_url).status_code == 200
+    assert client.get(profile_url).status_code == 200
+    with django_assert_num_queries(0):
+        assert client.get("/category/no-such-category/").status_code == 404
+        assert client.get("/profile/no-such-user/").status_code == 404
+
+    category = mixer.blend("blog.Category", is_published=True)
+    new_user = mixer.blend("auth.User")
+    assert client.get(f"/category/{category.slug}/").status_code == 200, (
+        "Убедитесь, что созданная категория сразу попадает в фильтр."
+    )
+    assert client.get(f"/profile/{new_user.username}/").status_code == 200
+
+
+@pytest.mark.django_db
+@override_settings(MEMBERSHIP_FILTERS=False)
+def test_filters_can_be_disabled(client, django_assert_num_queries):
+    with django_assert_num_queries(1):
+        assert client.get("/category/no-such-category/").status_code == 404
+
+
+@pytest.mark.django_db
+def test_filters_are_loaded_from_primary(monkeypatch, published_category):
+    monkeypatch.setattr(
+        ReplicaRouter, "db_for_read", lambda self, model, **hints: "replica1"
+    )
+    assert list(membership.load(Category, "slug")()) == [
+        published_category.slug
+    ], "Убедитесь, что фильтры строятся по основной базе, а не по реплике."
+
+
+@pytest.mark.django_db
+def test_login_does_not_rebuild_user_filters(
+    client, user, django_capture_on_commit_callbacks
+):
+    cache = membership.get_cache()
+    key = membership.get_version_key(membership.USER)
+    version = cache.get(key)
+    user.set_password("password")
+    with django_capture_on_commit_callbacks(execute=True):
+        user.save()
+        client.login(username=user.username, password="password")
+    assert cache.get(key) == version, (
+        "Убедитесь, что вход пользователя не заставляет процессы "
+        "перестраивать фильтр имён пользователей."
+    )
+    old_username = user.username
+    user.username = "renamed"
+    with django_capture_on_commit_callbacks(execute=True):
+        user.save()
+    assert cache.get(key) != version
+    assert not membership.may_exist(membership.USER, old_username)
+    assert membership.may_exist(membership.USER, "renamed")
@@ -0,0 +1,88 @@
+import pytest
+from django.test import override_settings
+
+from blogicum import metrics
+
+
+@pytest.fixture
+def clean_metrics():
+    metrics.reset()
+    yield
+    metrics.reset()
+
+
+def test_histogram_is_exposed_in_prometheus_format():
+    histogram = metrics.Histogram("test_seconds", "Test.", (0.1, 1))
+    histogram.observe(0.05, view='blog:"index"')
+    histogram.observe(5, view='blog:"index"')
+    text = metrics.expose([histogram])
+    assert "# TYPE test_seconds histogram" in text
+    assert 'test_seconds_bucket{view="blog:\\"index\\"",le="0.1"} 1' in text
+    assert 'test_seconds_bucket{view="blog:\\"index\\"",le="+Inf"} 2' in text
+    assert 'test_seconds_count{view="blog:\\"index\\""} 2' in text
+
+
+@pytest.mark.django_db
+def test_request_is_measured_per_view(
+    client, admin_client, clean_metrics, post_with_published_location
+):
+    assert client.get("/").status_code == 200
+    response = admin_client.get("/metrics/")
+    assert response.status_code == 200
+    text = response.content.decode("utf-8")
+    assert 'blogicum_requests_total{status="200",view="blog:index"} 1' in (
+        text
+    ), "Убедитесь, что запросы учитываются по имени view и статусу."
+    for name in (
+        "blogicum_request_duration_seconds",
+        "blogicum_db_queries",
+        "blogicum_db_duration_seconds",
+        "blogicum_template_duration_seconds",
+    ):
+        assert f'{name}_count{{view="blog:index"}} 1' in text, (
+            f"Убедитесь, что метрика `{name}` записывается для каждой view."
+        )
+    assert 'blogicum_db_queries_bucket{view="blog:index",le="0"} 0' in text, (
+        "Убедитесь, что учитываются SQL-запросы запроса."
+    )
+    assert metrics.TEMPLATE_DURATION.values[(("view", "blog:index"),)][1] > 0
+
+
+@pytest.mark.django_db
+@override_settings(METRICS_SAMPLE_RATE=0)
+def test_unsampled_requests_are_only_counted(client, clean_metrics):
+    client.get("/")
+    assert metrics.REQUESTS.values
+    assert not metrics.REQUEST_DURATION.values
+
+
+@pytest.mark.django_db
+def test_metrics_are_staff_only(user_client):
+    response = user_client.get("/metrics/")
+    assert response.status_code != 200, (
+        "Убедитесь, что метрики доступны только сотрудникам."
+    )
+
+
+@pytest.mark.django_db
+def test_templates_and_includes_are_timed(
+    client, admin_client, clean_metrics, post_with_published_location
+):
+    client.get("/")
+    key = (
+        ("parent", "blog/index.html"),
+        ("template", "includes/post_card.html"),
+    )
+    assert metrics.TEMPLATE_RENDERS.values[key] == 1, (
+        "Убедитесь, что учитываются рендеры каждого подключаемого шаблона."
+    )
+    assert metrics.TEMPLATE_SECONDS.values[key] > 0
+    top = (("parent", ""), ("template", "blog/index.html"))
+    assert metrics.TEMPLATE_SECONDS.values[top] >= (
+        metrics.TEMPLATE_SELF_SECONDS.values[top]
+    )
+    text = admin_client.get("/metrics/").content.decode("utf-8")
+    assert (
+        "blogicum_template_renders_total{parent=\"blog/index.html\","
+        "template=\"includes/post_card.html\"} 1"
+    ) in text
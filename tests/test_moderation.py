@@ -0,0 +1,109 @@
+import pytest
+from django.contrib.auth.models import Permission
+from django.core.management import call_command
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from blog import moderation
+from blog.models import AuthorStats, Comment, Post
+from blog.signals import posts_bulk_changed
+
+pytestmark = [pytest.mark.django_db]
+
+
+def test_bulk_actions_are_batched(
+    mixer, user, published_category, another_category,
+    django_assert_num_queries
+):
+    posts = mixer.cycle(5).blend(
+        "blog.Post", author=user, category=published_category
+    )
+    received = []
+
+    def receiver(sender, pks, action, **kwargs):
+        received.append((action, sorted(pks)))
+
+    posts_bulk_changed.connect(receiver)
+    try:
+        # 3 pk pages (2 + 2 + 1), 3 UPDATE statements, 1 empty pk page,
+        # then the feed refresh: visible posts and DELETE of their cards,
+        # and the author stats: authors of the posts and their UPDATE.
+        with django_assert_num_queries(11):
+            count = moderation.unpublish_posts(
+                Post.objects.all(), batch_size=2
+            )
+        assert count == len(posts)
+        assert not Post.objects.filter(is_published=True).exists(), (
+            "Убедитесь, что действие снимает с публикации все выбранные посты."
+        )
+        moderation.move_posts(Post.objects.all(), another_category)
+        assert set(
+            Post.objects.values_list("category", flat=True)
+        ) == {another_category.id}
+    finally:
+        posts_bulk_changed.disconnect(receiver)
+    assert [action for action, _ in received] == [
+        moderation.UNPUBLISH, moderation.MOVE
+    ], "Сигнал должен отправляться один раз на всю операцию."
+
+
+def test_moderate_posts_command(mixer, user, published_category):
+    posts = mixer.cycle(3).blend(
+        "blog.Post", author=user, category=published_category,
+        is_published=False
+    )
+    mixer.blend("blog.Comment", post=posts[0], author=user)
+
+    call_command("moderate_posts", "publish", "--author", user.username)
+    assert Post.objects.filter(is_published=True).count() == 3
+
+    call_command("moderate_posts", "delete", "--ids", str(posts[0].id))
+    assert not Post.objects.filter(pk=posts[0].id).exists()
+    assert not Comment.objects.exists(), (
+        "Убедитесь, что комментарии удаляются вместе с публикацией."
+    )
+
+
+def test_delete_does_not_count_per_row(mixer, user, another_user,
+                                       published_category):
+    posts = mixer.cycle(200).blend(
+        "blog.Post", author=user, category=published_category,
+        is_published=True,
+    )
+    Comment.objects.bulk_create(
+        Comment(post=post, author=another_user, text="Комментарий")
+        for post in posts for _ in range(3)
+    )
+    with CaptureQueriesContext(connection) as captured:
+        moderation.delete_posts(Post.objects.all())
+    assert len(captured) < 20, (
+        "Убедитесь, что удаление постов с комментариями не обновляет "
+        "счётчики отдельным запросом на каждую строку."
+    )
+    assert not Comment.objects.exists()
+    assert AuthorStats.objects.get(author=user).post_count == 0
+
+
+def test_admin_actions_require_change_permission(
+    client, mixer, user, published_category
+):
+    post = mixer.blend(
+        "blog.Post", author=user, category=published_category,
+        is_published=True,
+    )
+    staff = mixer.blend("auth.User", is_staff=True)
+    staff.user_permissions.add(Permission.objects.get(codename="view_post"))
+    client.force_login(staff)
+    for action in ("publish_posts", "unpublish_posts", "move_posts"):
+        client.post("/admin/blog/post/", {
+            "action": action, "_selected_action": [post.pk],
+            "category": published_category.pk,
+        })
+    post.refresh_from_db()
+    assert post.is_published, (
+        "Убедитесь, что массовые действия доступны только с правом "
+        "на изменение публикаций."
+    )
+    response = client.get("/admin/blog/post/")
+    assert response.status_code == 200
+    assert "unpublish_posts" not in response.content.decode()
@@ -0,0 +1,38 @@
+import pytest
+from django.template import Context, Template
+
+from blog.models import Post
+from blogicum.nplusone import collect_queries, fingerprint
+
+
+def test_fingerprint_ignores_parameters():
+    assert fingerprint(
+        "SELECT * FROM blog_post WHERE id = %s AND title = 'a''b'"
+    ) == fingerprint("SELECT * FROM blog_post WHERE id = 42 AND title = 'c'")
+    assert fingerprint("WHERE id IN (%s, %s, %s)") == fingerprint(
+        "WHERE id IN (%s, %s)"
+    )
+
+
+@pytest.mark.django_db
+def test_lazy_access_in_template_is_reported(
+    mixer, user, published_category
+):
+    mixer.cycle(3).blend(
+        "blog.Post", author=user, category=published_category
+    )
+    template = Template(
+        "{% for post in posts %}\n{{ post.comments.count }}{% endfor %}"
+    )
+    with collect_queries() as report:
+        template.render(Context({"posts": Post.objects.all()}))
+    repeated = report.repeated(3)
+    assert len(repeated) == 1, (
+        "Убедитесь, что повторяющийся в цикле запрос обнаруживается."
+    )
+    query, count, origin = repeated[0]
+    assert count == 3
+    assert "blog_comment" in query
+    assert origin.endswith(":2"), (
+        "Убедитесь, что для запроса из шаблона указывается строка шаблона."
+    )
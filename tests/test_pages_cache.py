@@ -0,0 +1,30 @@
+import pytest
+
+
+@pytest.mark.django_db
+def test_static_page_renders_only_header_per_request(
+    user, user_client, unlogged_client
+):
+    first = unlogged_client.get("/pages/about/")
+    assert "pages/about.html" in [t.name for t in first.templates]
+
+    second = user_client.get("/pages/about/")
+    templates = [t.name for t in second.templates]
+    assert "pages/about.html" not in templates, (
+        "Убедитесь, что статическая страница не рендерится заново."
+    )
+    assert templates == ["includes/header.html"]
+    content = second.content.decode("utf-8")
+    assert user.username in content, (
+        "Убедитесь, что шапка страницы отображается для пользователя."
+    )
+    assert "Войти" not in content
+    assert "О проекте" in content
+
+
+@pytest.mark.django_db
+def test_static_page_etag(unlogged_client):
+    response = unlogged_client.get("/pages/rules/")
+    etag = response["ETag"]
+    cached = unlogged_client.get("/pages/rules/", HTTP_IF_NONE_MATCH=etag)
+    assert cached.status_code == 304
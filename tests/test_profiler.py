@@ -0,0 +1,84 @@
+import importlib
+import time
+
+import pytest
+from django.conf import settings
+from django.http import HttpResponse
+from django.test import RequestFactory, override_settings
+from django.urls import clear_url_caches
+
+from blog.models import Post
+from blogicum import profiler
+from blogicum.middleware import ProfilingMiddleware
+
+
+@pytest.fixture
+def profiler_urls():
+    """Mounts the profiler pages, they exist only with PROFILER."""
+
+    urls = importlib.import_module(settings.ROOT_URLCONF)
+    with override_settings(PROFILER=True):
+        importlib.reload(urls)
+        clear_url_caches()
+        yield
+    importlib.reload(urls)
+    clear_url_caches()
+
+
+def slow_view(request):
+    list(Post.objects.all())
+    time.sleep(0.1)
+    return HttpResponse("ok")
+
+
+@pytest.mark.django_db
+def test_sampled_and_slow_requests_are_profiled(
+    tmp_path, admin_client, profiler_urls
+):
+    with override_settings(
+        PROFILER_DIR=tmp_path, PROFILER_SAMPLE_RATE=1, PROFILER_THRESHOLD=60
+    ):
+        ProfilingMiddleware(slow_view)(RequestFactory().get("/fast/"))
+    with override_settings(
+        PROFILER_DIR=tmp_path, PROFILER_SAMPLE_RATE=0,
+        PROFILER_THRESHOLD=0.02
+    ):
+        ProfilingMiddleware(slow_view)(RequestFactory().get("/slow/"))
+        ProfilingMiddleware(lambda request: HttpResponse())(
+            RequestFactory().get("/skipped/")
+        )
+        paths = profiler.list_profiles()
+        assert len(paths) == 2, (
+            "Убедитесь, что сохраняются профили выбранных и медленных"
+            " запросов, и только они."
+        )
+        slow, sampled = (profiler.load_profile(path.name) for path in paths)
+        assert sampled["path"] == "/fast/" and sampled["profile"], (
+            "Убедитесь, что выбранный запрос профилируется cProfile."
+        )
+        assert sampled["sql"] and "blog_post" in sampled["sql"][0]["sql"]
+        assert slow["path"] == "/slow/" and not slow["profile"]
+        assert any("slow_view" in stack for stack, _ in slow["stacks"]), (
+            "Убедитесь, что у медленного запроса снимаются стеки."
+        )
+
+        response = admin_client.get("/profiler/")
+        assert paths[0].name in response.content.decode("utf-8")
+        response = admin_client.get(f"/profiler/{paths[0].name}/")
+        assert response.status_code == 200
+        assert admin_client.get("/profiler/..%2Fmanage.py/").status_code == 404
+
+
+@override_settings(PROFILER_KEEP=2)
+def test_old_profiles_are_rotated(tmp_path):
+    with override_settings(PROFILER_DIR=tmp_path):
+        for _ in range(3):
+            profiler.save_profile({"view": "blog:index", "duration_ms": 1})
+        assert len(profiler.list_profiles()) == 2, (
+            "Убедитесь, что хранятся только последние профили."
+        )
+
+
+@pytest.mark.django_db
+def test_profiles_are_staff_only(user_client):
+    assert user_client.get("/profiler/").status_code != 200
@@ -0,0 +1,55 @@
+import pytest
+from django.db import connection
+from django.test import override_settings
+from django.test.utils import CaptureQueriesContext
+
+from blog.models import Comment
+from blogicum import ratelimit
+
+
+def test_parse_rate():
+    assert ratelimit.parse_rate("10/m") == (10, 60)
+    assert ratelimit.parse_rate("5/30s") == (5, 30)
+    assert ratelimit.parse_rate("100/3600") == (100, 3600)
+    with pytest.raises(ValueError):
+        ratelimit.parse_rate("10 per minute")
+
+
+def test_token_bucket():
+    def allowed(now):
+        return not ratelimit.consume("ratelimit:test", 3, 60, now=now)
+
+    now = 1_000_000.0
+    assert [allowed(now) for _ in range(4)] == [True, True, True, False]
+    assert ratelimit.consume("ratelimit:test", 3, 60, now=now) == (
+        pytest.approx(20)
+    ), "Убедитесь, что лимитер сообщает время до следующего токена."
+    assert allowed(now + 20) and not allowed(now + 20)
+
+    now += 3600
+    assert [allowed(now) for _ in range(4)] == [True, True, True, False], (
+        "Убедитесь, что за время простоя в корзине копится не больше"
+        " токенов, чем её ёмкость."
+    )
+
+
+@pytest.mark.django_db
+def test_comments_over_limit_get_429(
+    user_client, post_with_published_location
+):
+    url = f"/posts/{post_with_published_location.id}/comment/"
+    with override_settings(
+        RATE_LIMITS={"comment": {"user": "2/m", "ip": "10/m"}}
+    ):
+        for _ in range(2):
+            assert user_client.post(url, {"text": "Текст"}).status_code == 302
+        with CaptureQueriesContext(connection) as captured:
+            response = user_client.post(url, {"text": "Текст"})
+    assert response.status_code == 429, (
+        "Убедитесь, что запросы сверх лимита получают ответ 429."
+    )
+    assert int(response["Retry-After"]) == 30
+    assert not any(
+        "blog_" in query["sql"] for query in captured.captured_queries
+    ), "Убедитесь, что ответ 429 не требует запросов к таблицам блога."
+    assert Comment.objects.count() == 2
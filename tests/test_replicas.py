@@ -0,0 +1,95 @@
+import time
+
+import pytest
+from asgiref.sync import async_to_sync
+from django.contrib.auth.models import AnonymousUser
+from django.contrib.sessions.backends.cache import SessionStore
+from django.test import RequestFactory, override_settings
+
+from blog.models import Post
+from blog.views import HomepageListView, PostCreateView
+from blogicum.middleware import (
+    PRIMARY_UNTIL_SESSION_KEY,
+    ReplicaRoutingMiddleware,
+)
+from blogicum.routers import (
+    PRIMARY, ReplicaRouter, replica_reads, use_replicas
+)
+
+
+@override_settings(REPLICA_DATABASES=["replica1"])
+def test_router_reads_from_replica_only_in_read_views():
+    router = ReplicaRouter()
+    assert router.db_for_read(Post) == PRIMARY
+    with use_replicas():
+        assert router.db_for_read(Post) == "replica1"
+        assert router.db_for_write(Post) == PRIMARY
+    assert router.db_for_read(Post) == PRIMARY
+
+
+def route_request(request, view_class, user):
+    request.user = user
+    seen = {}
+
+    def view(request):
+        with override_settings(REPLICA_DATABASES=["replica1"]):
+            seen["db"] = ReplicaRouter().db_for_read(Post)
+        return None
+
+    def get_response(request):
+        middleware.process_view(request, view, (), {})
+        return view(request)
+
+    view.view_class = view_class
+    middleware = ReplicaRoutingMiddleware(get_response)
+    middleware(request)
+    return seen["db"]
+
+
+@pytest.mark.django_db
+def test_middleware_pins_session_after_write(user):
+    factory = RequestFactory()
+    session = SessionStore()
+    session.create()
+
+    request = factory.get("/")
+    request.session = session
+    assert route_request(request, HomepageListView, user) == "replica1"
+
+    request = factory.get("/posts/create/")
+    request.session = session
+    assert route_request(request, PostCreateView, user) == PRIMARY, (
+        "Формы должны всегда читать с основной базы."
+    )
+
+    request = factory.post("/posts/create/")
+    request.session = session
+    route_request(request, PostCreateView, user)
+    assert session[PRIMARY_UNTIL_SESSION_KEY] > time.time()
+
+    request = factory.get("/")
+    request.session = session
+    assert route_request(request, HomepageListView, user) == PRIMARY, (
+        "После записи автор должен читать с основной базы."
+    )
+
+
+def test_async_middleware_routes_read_views():
+    seen = {}
+
+    async def view(request):
+        seen["replica_reads"] = replica_reads.get()
+
+    async def get_response(request):
+        await middleware.process_view(request, view, (), {})
+        return await view(request)
+
+    view.view_class = HomepageListView
+    middleware = ReplicaRoutingMiddleware(get_response)
+    request = RequestFactory().get("/")
+    request.user = AnonymousUser()
+    async_to_sync(middleware)(request)
+    assert seen["replica_reads"] is True, (
+        "Убедитесь, что под ASGI чтения страниц идут с реплик."
+    )
+    assert replica_reads.get() is False
@@ -0,0 +1,75 @@
+import importlib.util
+
+import pytest
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+
+
+def load_settings(monkeypatch, **env):
+    for name, value in env.items():
+        monkeypatch.setenv(f"BLOGICUM_{name}", value)
+    spec = importlib.util.spec_from_file_location(
+        "blogicum_settings_under_test",
+        settings.BASE_DIR / "blogicum" / "settings.py",
+    )
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+PRODUCTION = {
+    "PROFILE": "production",
+    "SECRET_KEY": "secret",
+    "CACHE_BACKEND": "django.core.cache.backends.memcached.PyMemcacheCache",
+    "CACHE_LOCATION": "127.0.0.1:11211",
+}
+
+
+def test_production_profile(monkeypatch):
+    production = load_settings(monkeypatch, **PRODUCTION)
+    assert production.DEBUG is False
+    assert "debug_toolbar" not in production.INSTALLED_APPS
+    assert not [m for m in production.MIDDLEWARE if "debug_toolbar" in m]
+    assert production.DATABASES["default"]["CONN_MAX_AGE"] > 0
+    loaders = production.TEMPLATES[0]["OPTIONS"]["loaders"]
+    assert loaders[0][0] == "django.template.loaders.cached.Loader"
+
+
+@pytest.mark.parametrize("env", [
+    {"DEBUG": "1"},
+    {"DEBUG_TOOLBAR": "1"},
+    {"SECRET_KEY": ""},
+    {"CACHE_BACKEND": "django.core.cache.backends.locmem.LocMemCache"},
+    {
+        "CACHE_BACKEND": "django.core.cache.backends.dummy.DummyCache",
+        "SESSION_ENGINE": "django.contrib.sessions.backends.db",
+    },
+    {
+        "CACHE_BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+        "SESSION_ENGINE": "django.contrib.sessions.backends.db",
+        "USER_CACHE": "0",
+    },
+])
+def test_production_profile_refuses_debug(monkeypatch, env):
+    env = {**PRODUCTION, **env}
+    with pytest.raises(ImproperlyConfigured):
+        load_settings(monkeypatch, **env)
+
+
+def test_production_profile_without_shared_cache(monkeypatch):
+    production = load_settings(
+        monkeypatch, **{
+            **PRODUCTION,
+            "CACHE_BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+            "SESSION_ENGINE": "django.contrib.sessions.backends.db",
+            "USER_CACHE": "0",
+            "RATE_LIMITS": "0",
+        }
+    )
+    assert production.AUTHENTICATION_BACKENDS == [
+        "django.contrib.auth.backends.ModelBackend"
+    ], (
+        "Убедитесь, что без общего кеша сессии и пользователи "
+        "читаются из базы данных."
+    )
+    assert production.RATE_LIMITS == {}
@@ -0,0 +1,100 @@
+import gzip
+
+import pytest
+from asgiref.sync import async_to_sync
+from django.contrib.staticfiles.storage import staticfiles_storage
+from django.core.management import call_command
+from django.test import AsyncClient, override_settings
+
+from blogicum import staticfiles
+
+
+@pytest.fixture
+def collected(tmp_path, settings):
+    with override_settings(
+        STATIC_ROOT=tmp_path,
+        STATICFILES_STORAGE=(
+            "blogicum.staticfiles.CompressedManifestStaticFilesStorage"
+        ),
+        MIDDLEWARE=[
+            "blogicum.middleware.StaticFilesMiddleware", *settings.MIDDLEWARE
+        ],
+    ):
+        call_command("collectstatic", interactive=False, verbosity=0)
+        yield tmp_path
+
+
+def test_collected_files_are_hashed_and_compressed(collected, caplog):
+    css = staticfiles_storage.stored_name("css/bootstrap.min.css")
+    assert css != "css/bootstrap.min.css", (
+        "Убедитесь, что имена статических файлов содержат хеш содержимого."
+    )
+    assert gzip.decompress((collected / f"{css}.gz").read_bytes()) == (
+        collected / css
+    ).read_bytes()
+    assert (collected / f"{css}.br").exists() == (
+        staticfiles.brotli is not None
+    )
+    assert any(
+        "Brotli is not installed" in record.getMessage()
+        for record in caplog.get_records("setup")
+    ) == (staticfiles.brotli is None), (
+        "Убедитесь, что сборка без Brotli предупреждает об этом."
+    )
+    logo = staticfiles_storage.stored_name("img/logo.png")
+    assert not (collected / f"{logo}.gz").exists(), (
+        "Убедитесь, что сжатые форматы изображений не сжимаются повторно."
+    )
+
+
+@pytest.mark.django_db
+def test_static_files_are_served(client, collected):
+    css = staticfiles_storage.stored_name("css/bootstrap.min.css")
+    body = (collected / css).read_bytes()
+    url = f"/static/{css}"
+
+    response = client.get(url, HTTP_ACCEPT_ENCODING="gzip, deflate")
+    assert response.status_code == 200
+    assert response["Content-Encoding"] == "gzip"
+    assert response["Content-Type"] == "text/css"
+    assert response["Cache-Control"] == staticfiles.IMMUTABLE, (
+        "Убедитесь, что файлы с хешем в имени кешируются навсегда."
+    )
+    assert gzip.decompress(b"".join(response.streaming_content)) == body
+
+    response = client.get(
+        url, HTTP_ACCEPT_ENCODING="gzip", HTTP_IF_NONE_MATCH=response["ETag"]
+    )
+    assert response.status_code == 304
+
+    response = client.get(url, HTTP_RANGE="bytes=10-19")
+    assert response.status_code == 206
+    assert response["Content-Range"] == f"bytes 10-19/{len(body)}"
+    assert b"".join(response.streaming_content) == body[10:20]
+    response = client.get(url, HTTP_RANGE=f"bytes={len(body)}-")
+    assert response.status_code == 416
+
+    response = client.get("/static/css/bootstrap.min.css")
+    assert "immutable" not in response["Cache-Control"]
+    assert "Content-Encoding" not in response
+    response.close()
+    assert client.get("/static/../manage.py").status_code == 404
+    assert client.get("/static/css/missing.css").status_code == 404
+
+
+def test_parse_range():
+    assert staticfiles.parse_range("bytes=0-99", 50) == (0, 50)
+    assert staticfiles.parse_range("bytes=-10", 50) == (40, 50)
+    assert staticfiles.parse_range("bytes=60-", 50) == ()
+    assert staticfiles.parse_range("bytes=0-1,5-6", 50) is None
+    assert staticfiles.parse_range("bytes=9-1", 50) is None
+
+
+@pytest.mark.django_db
+def test_static_files_are_served_under_asgi(collected):
+    css = staticfiles_storage.stored_name("css/bootstrap.min.css")
+    response = async_to_sync(AsyncClient().get)(f"/static/{css}")
+    assert response.status_code == 200
+    assert b"".join(response.streaming_content) == (
+        collected / css
+    ).read_bytes(), "Убедитесь, что статика раздаётся и под ASGI."
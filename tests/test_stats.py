@@ -0,0 +1,177 @@
+import datetime as dt
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from blog import archive, moderation, stats
+from blog.models import AuthorStats, Post
+
+pytestmark = [pytest.mark.django_db]
+
+FIELDS = (
+    "post_count", "published_post_count", "archived_post_count",
+    "archived_published_post_count", "comment_count", "last_post_date",
+)
+
+
+def get_stats(user):
+    return AuthorStats.objects.values(*FIELDS).get(author=user)
+
+
+def test_stats_follow_writes(mixer, user, another_user, published_category):
+    now = timezone.now()
+    old, hidden, *new = mixer.cycle(4).blend(
+        "blog.Post", author=user, category=published_category,
+        is_published=True,
+        pub_date=(now - dt.timedelta(days=days) for days in (400, 3, 2, 1)),
+    )
+    comments = mixer.cycle(3).blend(
+        "blog.Comment", post=(post for post in (old, new[0], new[0])),
+        author=another_user,
+    )
+    comments[-1].delete()
+    hidden.is_published = False
+    hidden.save()
+    assert get_stats(user) == {
+        "post_count": 4, "published_post_count": 3,
+        "archived_post_count": 0, "archived_published_post_count": 0,
+        "comment_count": 2, "last_post_date": new[-1].pub_date,
+    }, "Убедитесь, что статистика автора обновляется при записи постов."
+
+    archive.archive_posts(archive.get_cutoff(365))
+    moderation.delete_posts(Post.objects.filter(pk=new[-1].pk))
+    expected = {
+        "post_count": 2, "published_post_count": 1,
+        "archived_post_count": 1, "archived_published_post_count": 1,
+        "comment_count": 2, "last_post_date": new[0].pub_date,
+    }
+    assert get_stats(user) == expected
+    assert stats.rebuild() == 1
+    assert get_stats(user) == expected, (
+        "Убедитесь, что статистика совпадает с пересчитанной заново."
+    )
+    assert not AuthorStats.objects.filter(author=another_user).exists()
+
+
+def test_profile_is_paginated_without_counting(
+    client, mixer, user, published_category
+):
+    now = timezone.now()
+    posts = mixer.cycle(12).blend(
+        "blog.Post", author=user, category=published_category,
+        is_published=True,
+        pub_date=(now - dt.timedelta(days=day) for day in range(1, 13)),
+    )
+    mixer.blend("blog.Comment", post=posts[0], author=user)
+    url = f"/profile/{user.username}/"
+    with CaptureQueriesContext(connection) as captured:
+        response = client.get(url)
+    assert response.context["page_obj"].paginator.count == 12
+    assert not any(
+        "COUNT(*)" in query["sql"] for query in captured.captured_queries
+    ), "Убедитесь, что профиль берёт число публикаций из статистики."
+    content = response.content.decode()
+    assert "Публикаций: 12" in content
+    assert "Комментариев к публикациям: 1" in content
+
+    mixer.blend(
+        "blog.Post", author=user, category=published_category,
+        is_published=True, pub_date=now + dt.timedelta(days=1),
+    )
+    response = client.get(url)
+    assert response.context["page_obj"].paginator.count == 12, (
+        "Убедитесь, что отложенные публикации не учитываются в профиле."
+    )
+
+
+def test_large_batches_are_chunked(mixer, user, published_category):
+    post = mixer.blend(
+        "blog.Post", author=user, category=published_category,
+        is_published=True,
+    )
+    AuthorStats.objects.filter(author=user).update(post_count=0)
+    stats.recount_posts([post.pk, *range(10 ** 6, 10 ** 6 + 300000)])
+    assert get_stats(user)["post_count"] == 1, (
+        "Убедитесь, что большие наборы постов пересчитываются частями."
+    )
+
+
+def test_post_writes_apply_deltas(mixer, user, published_category):
+    now = timezone.now()
+    post = mixer.blend(
+        "blog.Post", author=user, category=published_category,
+        is_published=True, pub_date=now - dt.timedelta(days=1),
+    )
+    post.title = "Другой заголовок"
+    with CaptureQueriesContext(connection) as captured:
+        post.save()
+    assert not any(
+        "blog_authorstats" in query["sql"]
+        for query in captured.captured_queries
+    ), "Убедитесь, что сохранение поста без изменений не трогает статистику."
+
+    post.is_published = False
+    with CaptureQueriesContext(connection) as captured:
+        post.save()
+    assert not any(
+        "COUNT(" in query["sql"] for query in captured.captured_queries
+        if query["sql"].startswith('UPDATE "blog_authorstats"')
+    ), "Убедитесь, что снятие поста с публикации не пересчитывает статистику."
+    assert get_stats(user)["published_post_count"] == 0
+    assert get_stats(user)["last_post_date"] is None
+
+    post.is_published = True
+    post.save()
+    expected = get_stats(user)
+    assert expected["published_post_count"] == 1
+    assert expected["last_post_date"] == post.pub_date
+    stats.rebuild()
+    assert get_stats(user) == expected, (
+        "Убедитесь, что статистика совпадает с пересчитанной заново."
+    )
+
+
+def test_deleted_post_is_recounted_once(mixer, user, another_user,
+                                        published_category):
+    kept, deleted = mixer.cycle(2).blend(
+        "blog.Post", author=user, category=published_category,
+        is_published=True,
+    )
+    mixer.cycle(4).blend(
+        "blog.Comment", post=(post for post in (kept, *[deleted] * 3)),
+        author=another_user,
+    )
+    with CaptureQueriesContext(connection) as captured:
+        deleted.delete()
+    assert len([
+        query for query in captured.captured_queries
+        if query["sql"].startswith('UPDATE "blog_authorstats"')
+    ]) == 1, (
+        "Убедитесь, что комментарии удалённого поста не вычитаются по одному."
+    )
+    assert get_stats(user)["post_count"] == 1
+    assert get_stats(user)["comment_count"] == 1
+
+
+def test_archived_stats_follow_category_after_commit(
+    mixer, user, published_category, django_capture_on_commit_callbacks
+):
+    mixer.blend(
+        "blog.Post", author=user, category=published_category,
+        is_published=True, pub_date=timezone.now() - dt.timedelta(days=400),
+    )
+    archive.archive_posts(archive.get_cutoff(365))
+    published_category.is_published = False
+    with django_capture_on_commit_callbacks(execute=True):
+        with CaptureQueriesContext(connection) as captured:
+            published_category.save()
+        assert not any(
+            "blog_authorstats" in query["sql"]
+            for query in captured.captured_queries
+        ), "Убедитесь, что сохранение категории не пересчитывает статистику."
+    assert get_stats(user)["archived_published_post_count"] == 0, (
+        "Убедитесь, что статистика архивных постов пересчитывается "
+        "после скрытия категории."
+    )
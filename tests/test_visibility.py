@@ -0,0 +1,73 @@
+import pytest
+from django.test import override_settings
+
+from blog import visibility
+from blog.models import FeedEntry, Post
+from blog.signals import posts_bulk_changed
+from blogicum import workers
+
+
+@pytest.fixture
+def sent_batches():
+    batches = []
+
+    def collect(sender, pks, action, **kwargs):
+        if action == visibility.VISIBILITY:
+            batches.append(sorted(pks))
+
+    posts_bulk_changed.connect(collect, sender=Post)
+    yield batches
+    posts_bulk_changed.disconnect(collect, sender=Post)
+
+
+@pytest.mark.django_db
+def test_unchanged_save_schedules_nothing(
+    published_category, django_capture_on_commit_callbacks, sent_batches
+):
+    published_category.description = "Другое описание"
+    with django_capture_on_commit_callbacks(execute=True):
+        published_category.save()
+    assert not sent_batches, (
+        "Убедитесь, что сохранение категории без изменения публикации, "
+        "адреса и названия не обновляет её посты."
+    )
+
+
+@pytest.mark.django_db
+def test_category_change_is_propagated_in_batches(
+    mixer, user, published_category, django_capture_on_commit_callbacks,
+    sent_batches, monkeypatch
+):
+    posts = mixer.cycle(5).blend(
+        "blog.Post", author=user, category=published_category,
+        is_published=True,
+    )
+    monkeypatch.setattr(visibility, "BATCH_SIZE", 2)
+    published_category.is_published = False
+    with django_capture_on_commit_callbacks(execute=True):
+        published_category.save()
+        assert not sent_batches, (
+            "Убедитесь, что посты обновляются после фиксации транзакции."
+        )
+    assert [len(batch) for batch in sent_batches] == [2, 2, 1], (
+        "Убедитесь, что посты категории обновляются пачками."
+    )
+    assert sorted(sum(sent_batches, [])) == sorted(post.pk for post in posts)
+    assert not FeedEntry.objects.filter(
+        category=published_category
+    ).exists()
+
+
+@pytest.mark.django_db(transaction=True)
+@override_settings(VISIBILITY_BACKGROUND=True)
+def test_location_change_runs_in_background(post_with_published_location):
+    location = post_with_published_location.location
+    location.is_published = False
+    location.save()
+    workers.get_worker(visibility.WORKER).join()
+    assert FeedEntry.objects.get(
+        post=post_with_published_location
+    ).location_name is None, (
+        "Убедитесь, что карточки постов скрытого местоположения "
+        "не показывают его."
+    )
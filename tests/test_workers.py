@@ -0,0 +1,16 @@
+from blogicum import workers
+
+
+def test_worker_runs_jobs_after_a_failure(caplog):
+    worker = workers.get_worker("test")
+    assert workers.get_worker("test") is worker
+    done = []
+
+    def fail():
+        raise RuntimeError("Ошибка")
+
+    worker.submit(fail)
+    worker.submit(lambda: done.append(True))
+    worker.join()
+    assert done, "Убедитесь, что ошибка задачи не останавливает поток."
+    assert "Job of the test worker failed" in caplog.text